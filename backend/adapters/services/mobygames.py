@@ -1,4 +1,3 @@
-import asyncio
 import http
 import json
 from collections.abc import Collection
@@ -8,10 +7,19 @@ import aiohttp
 import yarl
 from adapters.services.mobygames_types import MobyGame, MobyGameBrief, MobyOutputFormat
 from aiohttp.client import ClientTimeout
-from config import MOBYGAMES_API_KEY
+from config import (
+    MOBYGAMES_API_KEY,
+    MOBYGAMES_MAX_CONCURRENT_REQUESTS,
+    MOBYGAMES_REQUESTS_PER_SECOND,
+)
 from fastapi import HTTPException, status
 from logger.logger import log
 from utils.context import ctx_aiohttp_session
+from utils.rate_limiter import (
+    RedisConcurrencyLimit,
+    RedisTokenBucket,
+    retry_after_seconds,
+)
 
 
 async def auth_middleware(
@@ -33,6 +41,10 @@ class MobyGamesService:
         base_url: str | None = None,
     ) -> None:
         self.url = yarl.URL(base_url or "https://api.mobygames.com/v1")
+        self.rate_limiter = RedisTokenBucket("mobygames", MOBYGAMES_REQUESTS_PER_SECOND)
+        self.concurrency_limit = RedisConcurrencyLimit(
+            "mobygames", MOBYGAMES_MAX_CONCURRENT_REQUESTS
+        )
 
     async def _request(self, url: str, request_timeout: int = 120) -> dict:
         aiohttp_session = ctx_aiohttp_session.get()
@@ -43,13 +55,15 @@ class MobyGamesService:
         )
 
         try:
-            res = await aiohttp_session.get(
-                url,
-                middlewares=(auth_middleware,),
-                timeout=ClientTimeout(total=request_timeout),
-            )
-            res.raise_for_status()
-            return await res.json()
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await aiohttp_session.get(
+                    url,
+                    middlewares=(auth_middleware,),
+                    timeout=ClientTimeout(total=request_timeout),
+                )
+                res.raise_for_status()
+                return await res.json()
         except aiohttp.ServerTimeoutError:
             # Retry the request once if it times out
             log.debug("Request to URL=%s timed out. Retrying...", url)
@@ -65,8 +79,8 @@ class MobyGamesService:
                 log.error(exc)
                 return {}
             elif exc.status == http.HTTPStatus.TOO_MANY_REQUESTS:
-                # Retry after 2 seconds if rate limit hit
-                await asyncio.sleep(2)
+                # Hold back every caller for as long as the provider asks
+                await self.rate_limiter.backoff(retry_after_seconds(exc.headers))
             else:
                 # Log the error and return an empty dict if the request fails with a different code
                 log.error(exc)
@@ -82,13 +96,15 @@ class MobyGamesService:
                 url,
                 request_timeout,
             )
-            res = await aiohttp_session.get(
-                url,
-                middlewares=(auth_middleware,),
-                timeout=ClientTimeout(total=request_timeout),
-            )
-            res.raise_for_status()
-            return await res.json()
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await aiohttp_session.get(
+                    url,
+                    middlewares=(auth_middleware,),
+                    timeout=ClientTimeout(total=request_timeout),
+                )
+                res.raise_for_status()
+                return await res.json()
         except (aiohttp.ClientResponseError, aiohttp.ServerTimeoutError) as exc:
             if (
                 isinstance(exc, aiohttp.ClientResponseError)
@@ -1,12 +1,22 @@
 import asyncio
 import re
+import weakref
+from typing import Final
 
+from config import SCAN_RAHASHER_TIMEOUT, SCAN_RAHASHER_WORKERS
 from logger.formatter import LIGHTMAGENTA
 from logger.formatter import highlight as hl
 from logger.logger import log
 
 RAHASHER_VALID_HASH_REGEX = re.compile(r"[0-9a-f]{32}")
 
+# RetroAchievements console IDs whose hash is the MD5 of the whole rom file, as long
+# as it's no bigger than the 64 MiB RAHasher reads
+RA_WHOLE_FILE_MD5_PLATFORM_IDS: Final = frozenset(
+    {1, 4, 5, 6, 10, 11, 14, 15, 23, 24, 25, 28, 33, 44, 45, 46, 53, 63, 69, 72, 80}
+)
+RA_WHOLE_FILE_MD5_MAX_SIZE: Final = 64 * 1024 * 1024
+
 # TODO: Centralize standarized platform slugs using StrEnum.
 PLATFORM_SLUG_TO_RETROACHIEVEMENTS_ID: dict[str, int] = {
     "3do": 43,
@@ -93,9 +103,36 @@ class RAHasherError(Exception): ...
 
 
 class RAHasherService:
-    """Service to calculate RetroAchievements hashes using RAHasher."""
+    """Service to calculate RetroAchievements hashes using RAHasher.
+
+    At most `workers` RAHasher processes run at once, and any that runs longer than
+    `timeout` seconds is killed.
+    """
+
+    def __init__(
+        self,
+        workers: int = SCAN_RAHASHER_WORKERS,
+        timeout: float = SCAN_RAHASHER_TIMEOUT,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        # asyncio primitives are bound to a loop, so keep a semaphore for each
+        self._slots: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, asyncio.Semaphore
+        ] = weakref.WeakKeyDictionary()
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        slots = self._slots.get(loop)
+        if slots is None:
+            slots = self._slots[loop] = asyncio.Semaphore(self.workers)
+        return slots
 
     async def calculate_hash(self, platform_id: int, file_path: str) -> str:
+        async with self._get_slots():
+            return await self._calculate_hash(platform_id, file_path)
+
+    async def _calculate_hash(self, platform_id: int, file_path: str) -> str:
         from handler.metadata.ra_handler import RA_ID_TO_SLUG
 
         log.debug(
@@ -114,20 +151,26 @@ class RAHasherService:
             log.error("RAHasher executable not found in PATH")
             return ""
 
-        return_code = await proc.wait()
-        if return_code != 1:
-            if proc.stderr is not None:
-                stderr = (await proc.stderr.read()).decode("utf-8")
-            else:
-                stderr = None
-            log.error(f"RAHasher failed with code {return_code}. {stderr=}")
+        try:
+            stdout, stderr = await asyncio.wait_for(
+                proc.communicate(), timeout=self.timeout
+            )
+        except TimeoutError:
+            proc.kill()
+            await proc.wait()
+            log.error(
+                f"RAHasher timed out after {self.timeout}s for file {file_path} (platform ID: {platform_id})"
+            )
             return ""
 
-        if proc.stdout is None:
-            log.error("RAHasher did not return a hash.")
+        return_code = proc.returncode
+        if return_code != 1:
+            log.error(
+                f"RAHasher failed with code {return_code}. stderr={stderr.decode('utf-8')!r}"
+            )
             return ""
 
-        file_hash = (await proc.stdout.read()).decode("utf-8").strip()
+        file_hash = stdout.decode("utf-8").strip()
         if not file_hash:
             log.error(
                 f"RAHasher returned an empty hash for file {file_path} (platform ID: {platform_id})"
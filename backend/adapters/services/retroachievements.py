@@ -1,4 +1,3 @@
-import asyncio
 import http
 import json
 from collections.abc import AsyncIterator
@@ -14,10 +13,19 @@ from adapters.services.retroachievements_types import (
     RAUserCompletionProgressResult,
 )
 from aiohttp.client import ClientTimeout
-from config import RETROACHIEVEMENTS_API_KEY
+from config import (
+    RETROACHIEVEMENTS_API_KEY,
+    RETROACHIEVEMENTS_MAX_CONCURRENT_REQUESTS,
+    RETROACHIEVEMENTS_REQUESTS_PER_SECOND,
+)
 from fastapi import HTTPException, status
 from logger.logger import log
 from utils.context import ctx_aiohttp_session
+from utils.rate_limiter import (
+    RedisConcurrencyLimit,
+    RedisTokenBucket,
+    retry_after_seconds,
+)
 
 
 async def auth_middleware(
@@ -42,6 +50,12 @@ class RetroAchievementsService:
         base_url: str | None = None,
     ) -> None:
         self.url = yarl.URL(base_url or "https://retroachievements.org/API")
+        self.rate_limiter = RedisTokenBucket(
+            "retroachievements", RETROACHIEVEMENTS_REQUESTS_PER_SECOND
+        )
+        self.concurrency_limit = RedisConcurrencyLimit(
+            "retroachievements", RETROACHIEVEMENTS_MAX_CONCURRENT_REQUESTS
+        )
 
     async def _request(self, url: str, request_timeout: int = 120) -> dict:
         aiohttp_session = ctx_aiohttp_session.get()
@@ -51,13 +65,15 @@ class RetroAchievementsService:
             request_timeout,
         )
         try:
-            res = await aiohttp_session.get(
-                url,
-                middlewares=(auth_middleware,),
-                timeout=ClientTimeout(total=request_timeout),
-            )
-            res.raise_for_status()
-            return await res.json()
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await aiohttp_session.get(
+                    url,
+                    middlewares=(auth_middleware,),
+                    timeout=ClientTimeout(total=request_timeout),
+                )
+                res.raise_for_status()
+                return await res.json()
         except aiohttp.ServerTimeoutError:
             # Retry the request once if it times out
             pass
@@ -71,8 +87,8 @@ class RetroAchievementsService:
             ) from exc
         except aiohttp.ClientResponseError as err:
             if err.status == http.HTTPStatus.TOO_MANY_REQUESTS:
-                # Retry after 2 seconds if rate limit hit
-                await asyncio.sleep(2)
+                # Hold back every caller for as long as the provider asks
+                await self.rate_limiter.backoff(retry_after_seconds(err.headers))
             else:
                 # Log the error and return an empty dict if the request fails with a different code
                 log.error(err)
@@ -87,13 +103,15 @@ class RetroAchievementsService:
                 url,
                 request_timeout,
             )
-            res = await aiohttp_session.get(
-                url,
-                middlewares=(auth_middleware,),
-                timeout=ClientTimeout(total=request_timeout),
-            )
-            res.raise_for_status()
-            return await res.json()
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await aiohttp_session.get(
+                    url,
+                    middlewares=(auth_middleware,),
+                    timeout=ClientTimeout(total=request_timeout),
+                )
+                res.raise_for_status()
+                return await res.json()
         except (aiohttp.ClientResponseError, aiohttp.ServerTimeoutError) as err:
             if (
                 isinstance(err, aiohttp.ClientResponseError)
@@ -1,4 +1,3 @@
-import asyncio
 import base64
 import http
 import json
@@ -8,10 +7,20 @@ import aiohttp
 import yarl
 from adapters.services.screenscraper_types import SSGame
 from aiohttp.client import ClientTimeout
-from config import SCREENSCRAPER_PASSWORD, SCREENSCRAPER_USER
+from config import (
+    SCREENSCRAPER_MAX_CONCURRENT_REQUESTS,
+    SCREENSCRAPER_PASSWORD,
+    SCREENSCRAPER_REQUESTS_PER_SECOND,
+    SCREENSCRAPER_USER,
+)
 from fastapi import HTTPException, status
 from logger.logger import log
 from utils.context import ctx_aiohttp_session
+from utils.rate_limiter import (
+    RedisConcurrencyLimit,
+    RedisTokenBucket,
+    retry_after_seconds,
+)
 
 SS_DEV_ID: Final = base64.b64decode("enVyZGkxNQ==").decode()
 SS_DEV_PASSWORD: Final = base64.b64decode("eFRKd29PRmpPUUc=").decode()
@@ -46,6 +55,12 @@ class ScreenScraperService:
         base_url: str | None = None,
     ) -> None:
         self.url = yarl.URL(base_url or "https://api.screenscraper.fr/api2")
+        self.rate_limiter = RedisTokenBucket(
+            "screenscraper", SCREENSCRAPER_REQUESTS_PER_SECOND
+        )
+        self.concurrency_limit = RedisConcurrencyLimit(
+            "screenscraper", SCREENSCRAPER_MAX_CONCURRENT_REQUESTS
+        )
 
     async def _request(self, url: str, request_timeout: int = 120) -> dict:
         aiohttp_session = ctx_aiohttp_session.get()
@@ -55,20 +70,22 @@ class ScreenScraperService:
             request_timeout,
         )
         try:
-            res = await aiohttp_session.get(
-                url,
-                middlewares=(auth_middleware,),
-                timeout=ClientTimeout(total=request_timeout),
-            )
-            res.raise_for_status()
-            res_text = await res.text()
-            if LOGIN_ERROR_CHECK in res_text:
-                log.error("Invalid ScreenScraper credentials")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid ScreenScraper credentials",
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await aiohttp_session.get(
+                    url,
+                    middlewares=(auth_middleware,),
+                    timeout=ClientTimeout(total=request_timeout),
                 )
-            return await res.json()
+                res.raise_for_status()
+                res_text = await res.text()
+                if LOGIN_ERROR_CHECK in res_text:
+                    log.error("Invalid ScreenScraper credentials")
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Invalid ScreenScraper credentials",
+                    )
+                return await res.json()
         except aiohttp.ServerTimeoutError:
             # Retry the request once if it times out
             pass
@@ -82,8 +99,8 @@ class ScreenScraperService:
             ) from exc
         except aiohttp.ClientResponseError as err:
             if err.status == http.HTTPStatus.TOO_MANY_REQUESTS:
-                # Retry after 2 seconds if rate limit hit
-                await asyncio.sleep(2)
+                # Hold back every caller for as long as the provider asks
+                await self.rate_limiter.backoff(retry_after_seconds(err.headers))
             else:
                 # Log the error and return an empty dict if the request fails with a different code
                 log.error(err)
@@ -98,20 +115,22 @@ class ScreenScraperService:
                 url,
                 request_timeout,
             )
-            res = await aiohttp_session.get(
-                url,
-                middlewares=(auth_middleware,),
-                timeout=ClientTimeout(total=request_timeout),
-            )
-            res.raise_for_status()
-            res_text = await res.text()
-            if LOGIN_ERROR_CHECK in res_text:
-                log.error("Invalid ScreenScraper credentials")
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Invalid ScreenScraper credentials",
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await aiohttp_session.get(
+                    url,
+                    middlewares=(auth_middleware,),
+                    timeout=ClientTimeout(total=request_timeout),
                 )
-            return await res.json()
+                res.raise_for_status()
+                res_text = await res.text()
+                if LOGIN_ERROR_CHECK in res_text:
+                    log.error("Invalid ScreenScraper credentials")
+                    raise HTTPException(
+                        status_code=status.HTTP_401_UNAUTHORIZED,
+                        detail="Invalid ScreenScraper credentials",
+                    )
+                return await res.json()
         except (aiohttp.ClientResponseError, aiohttp.ServerTimeoutError) as err:
             if (
                 isinstance(err, aiohttp.ClientResponseError)
@@ -17,10 +17,15 @@ from adapters.services.steamgriddb_types import (
     SGDBType,
 )
 from aiohttp.client import ClientTimeout
-from config import STEAMGRIDDB_API_KEY
+from config import (
+    STEAMGRIDDB_API_KEY,
+    STEAMGRIDDB_MAX_CONCURRENT_REQUESTS,
+    STEAMGRIDDB_REQUESTS_PER_SECOND,
+)
 from exceptions.endpoint_exceptions import SGDBInvalidAPIKeyException
 from logger.logger import log
 from utils.context import ctx_aiohttp_session
+from utils.rate_limiter import RedisConcurrencyLimit, RedisTokenBucket
 
 
 async def auth_middleware(
@@ -42,6 +47,12 @@ class SteamGridDBService:
         base_url: str | None = None,
     ) -> None:
         self.url = yarl.URL(base_url or "https://steamgriddb.com/api/v2")
+        self.rate_limiter = RedisTokenBucket(
+            "steamgriddb", STEAMGRIDDB_REQUESTS_PER_SECOND
+        )
+        self.concurrency_limit = RedisConcurrencyLimit(
+            "steamgriddb", STEAMGRIDDB_MAX_CONCURRENT_REQUESTS
+        )
 
     async def _request(self, url: str, request_timeout: int = 120) -> dict:
         aiohttp_session = ctx_aiohttp_session.get()
@@ -51,13 +62,15 @@ class SteamGridDBService:
             request_timeout,
         )
         try:
-            res = await aiohttp_session.get(
-                url,
-                middlewares=(auth_middleware,),
-                timeout=ClientTimeout(total=request_timeout),
-            )
-            res.raise_for_status()
-            return await res.json()
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await aiohttp_session.get(
+                    url,
+                    middlewares=(auth_middleware,),
+                    timeout=ClientTimeout(total=request_timeout),
+                )
+                res.raise_for_status()
+                return await res.json()
         except aiohttp.ClientResponseError as exc:
             if exc.status == http.HTTPStatus.UNAUTHORIZED:
                 raise SGDBInvalidAPIKeyException from exc
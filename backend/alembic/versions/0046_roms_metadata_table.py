@@ -0,0 +1,119 @@
+"""Materialize the roms_metadata view into a table
+
+Revision ID: 0046_roms_metadata_table
+Revises: 0045_roms_metadata_update
+Create Date: 2025-07-01 00:00:00.000000
+
+"""
+
+import importlib.util
+import os
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+from utils.database import is_postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0046_roms_metadata_table"
+down_revision = "0045_roms_metadata_update"
+branch_labels = None
+depends_on = None
+
+JSON_COLUMNS = (
+    "genres",
+    "franchises",
+    "collections",
+    "companies",
+    "game_modes",
+    "age_ratings",
+)
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    json_type = sa.JSON().with_variant(
+        postgresql.JSONB(astext_type=sa.Text()), "postgresql"
+    )
+    op.create_table(
+        "roms_metadata_table",
+        sa.Column("rom_id", sa.Integer(), nullable=False),
+        *(sa.Column(column, json_type, nullable=True) for column in JSON_COLUMNS),
+        sa.Column("first_release_date", sa.BigInteger(), nullable=True),
+        sa.Column("average_rating", sa.Float(), nullable=True),
+        sa.Column(
+            "created_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.Column(
+            "updated_at",
+            sa.TIMESTAMP(timezone=True),
+            server_default=sa.text("now()"),
+            nullable=False,
+        ),
+        sa.ForeignKeyConstraint(["rom_id"], ["roms.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("rom_id"),
+    )
+
+    # Backfill from the view before replacing it
+    columns = ", ".join(
+        ("rom_id", *JSON_COLUMNS, "first_release_date", "average_rating")
+    )
+    connection.execute(
+        sa.text(
+            f"INSERT INTO roms_metadata_table ({columns}) "  # nosec B608
+            f"SELECT {columns} FROM roms_metadata"
+        )
+    )
+    connection.execute(sa.text("DROP VIEW IF EXISTS roms_metadata"))
+    op.rename_table("roms_metadata_table", "roms_metadata")
+
+    with op.batch_alter_table("roms_metadata", schema=None) as batch_op:
+        batch_op.create_index(
+            "idx_roms_metadata_average_rating", ["average_rating"], unique=False
+        )
+        batch_op.create_index(
+            "idx_roms_metadata_first_release_date",
+            ["first_release_date"],
+            unique=False,
+        )
+
+    # MariaDB can't index JSON arrays, but PostgreSQL can serve the
+    # containment (@>) filters on these columns from GIN indexes
+    if is_postgresql(connection):
+        for column in (
+            "genres",
+            "franchises",
+            "collections",
+            "companies",
+            "age_ratings",
+        ):
+            op.create_index(
+                f"idx_roms_metadata_{column}",
+                "roms_metadata",
+                [column],
+                postgresql_using="gin",
+            )
+        op.create_index("idx_roms_regions", "roms", ["regions"], postgresql_using="gin")
+
+
+def downgrade() -> None:
+    connection = op.get_bind()
+
+    if is_postgresql(connection):
+        op.drop_index("idx_roms_regions", table_name="roms")
+
+    op.drop_table("roms_metadata")
+
+    # Recreate the view as defined by the previous revision
+    spec = importlib.util.spec_from_file_location(
+        "roms_metadata_update",
+        os.path.join(os.path.dirname(__file__), "0045_roms_metadata_update.py"),
+    )
+    if spec and spec.loader:
+        previous_revision = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(previous_revision)
+        previous_revision.upgrade()
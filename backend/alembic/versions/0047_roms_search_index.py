@@ -0,0 +1,118 @@
+"""Index the names and metadata of roms for searching
+
+Revision ID: 0047_roms_search_index
+Revises: 0046_roms_metadata_table
+Create Date: 2025-07-08 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+from utils.database import CustomJSON, is_postgresql
+
+# revision identifiers, used by Alembic.
+revision = "0047_roms_search_index"
+down_revision = "0046_roms_metadata_table"
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+roms_table = sa.table(
+    "roms",
+    sa.column("id", sa.Integer()),
+    sa.column("name", sa.String()),
+    sa.column("fs_name", sa.String()),
+    sa.column("igdb_metadata", CustomJSON()),
+    sa.column("moby_metadata", CustomJSON()),
+    sa.column("ss_metadata", CustomJSON()),
+)
+roms_metadata_table = sa.table(
+    "roms_metadata",
+    sa.column("rom_id", sa.Integer()),
+    sa.column("franchises", CustomJSON()),
+    sa.column("collections", CustomJSON()),
+    sa.column("companies", CustomJSON()),
+    sa.column("genres", CustomJSON()),
+    sa.column("search_text", sa.Text()),
+)
+
+
+def _search_text(row: sa.Row) -> str:
+    alternative_names = (
+        (row.igdb_metadata or {}).get("alternative_names")
+        or (row.moby_metadata or {}).get("alternate_titles")
+        or (row.ss_metadata or {}).get("alternative_names")
+        or []
+    )
+    lines = [
+        row.name,
+        row.fs_name,
+        *alternative_names,
+        *(row.franchises or []),
+        *(row.collections or []),
+        *(row.companies or []),
+        *(row.genres or []),
+    ]
+    return "\n".join(dict.fromkeys(line for line in lines if line))
+
+
+def upgrade() -> None:
+    connection = op.get_bind()
+
+    with op.batch_alter_table("roms_metadata", schema=None) as batch_op:
+        batch_op.add_column(sa.Column("search_text", sa.Text(), nullable=True))
+
+    # Backfill in batches, the metadata of large libraries doesn't fit in memory
+    last_id = 0
+    while True:
+        rows = connection.execute(
+            sa.select(
+                roms_table,
+                roms_metadata_table.c.franchises,
+                roms_metadata_table.c.collections,
+                roms_metadata_table.c.companies,
+                roms_metadata_table.c.genres,
+            )
+            .join(
+                roms_metadata_table,
+                roms_metadata_table.c.rom_id == roms_table.c.id,
+            )
+            .where(roms_table.c.id > last_id)
+            .order_by(roms_table.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+
+        connection.execute(
+            roms_metadata_table.update()
+            .where(roms_metadata_table.c.rom_id == sa.bindparam("_rom_id"))
+            .values(search_text=sa.bindparam("_search_text")),
+            [{"_rom_id": row.id, "_search_text": _search_text(row)} for row in rows],
+        )
+        last_id = rows[-1].id
+
+    if is_postgresql(connection):
+        connection.execute(sa.text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+        op.create_index(
+            "idx_roms_metadata_search_text",
+            "roms_metadata",
+            ["search_text"],
+            postgresql_using="gin",
+            postgresql_ops={"search_text": "gin_trgm_ops"},
+        )
+    else:
+        op.create_index(
+            "idx_roms_metadata_search_text",
+            "roms_metadata",
+            ["search_text"],
+            mysql_prefix="FULLTEXT",
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("idx_roms_metadata_search_text", table_name="roms_metadata")
+
+    with op.batch_alter_table("roms_metadata", schema=None) as batch_op:
+        batch_op.drop_column("search_text")
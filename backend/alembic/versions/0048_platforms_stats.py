@@ -0,0 +1,49 @@
+"""Store the rom count and size of platforms
+
+Revision ID: 0048_platforms_stats
+Revises: 0047_roms_search_index
+Create Date: 2025-07-15 00:00:00.000000
+
+"""
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "0048_platforms_stats"
+down_revision = "0047_roms_search_index"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("platforms", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column("rom_count", sa.Integer(), server_default="0", nullable=False)
+        )
+        batch_op.add_column(
+            sa.Column(
+                "fs_size_bytes", sa.BigInteger(), server_default="0", nullable=False
+            )
+        )
+
+    op.execute(
+        """
+        UPDATE platforms SET
+            rom_count = (
+                SELECT COUNT(*) FROM roms WHERE roms.platform_id = platforms.id
+            ),
+            fs_size_bytes = (
+                SELECT COALESCE(SUM(rom_files.file_size_bytes), 0)
+                FROM rom_files
+                JOIN roms ON roms.id = rom_files.rom_id
+                WHERE roms.platform_id = platforms.id
+            )
+        """
+    )
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("platforms", schema=None) as batch_op:
+        batch_op.drop_column("fs_size_bytes")
+        batch_op.drop_column("rom_count")
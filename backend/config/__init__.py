@@ -35,6 +35,25 @@ DB_USER: Final = os.environ.get("DB_USER")
 DB_PASSWD: Final = os.environ.get("DB_PASSWD")
 DB_NAME: Final = os.environ.get("DB_NAME", "romm")
 ROMM_DB_DRIVER: Final = os.environ.get("ROMM_DB_DRIVER", "mariadb")
+# Connection pool of each process, defaults depend on the process type (web, worker...)
+DB_POOL_SIZE: Final = int(os.environ.get("DB_POOL_SIZE", 0)) or None
+DB_POOL_MAX_OVERFLOW: Final = (
+    int(os.environ["DB_POOL_MAX_OVERFLOW"])
+    if os.environ.get("DB_POOL_MAX_OVERFLOW")
+    else None
+)
+DB_POOL_TIMEOUT: Final = int(os.environ.get("DB_POOL_TIMEOUT", 30))
+# Seconds after which connections are replaced, -1 to keep them open
+DB_POOL_RECYCLE: Final = int(os.environ.get("DB_POOL_RECYCLE", 3600))
+# "always" checks connections before each use, "idle" only those unused for longer
+# than DB_POOL_PRE_PING_IDLE_SECONDS, and "never" skips the check
+DB_POOL_PRE_PING: Final = os.environ.get("DB_POOL_PRE_PING", "idle").lower()
+DB_POOL_PRE_PING_IDLE_SECONDS: Final = int(
+    os.environ.get("DB_POOL_PRE_PING_IDLE_SECONDS", 30)
+)
+# "basic" matches names and filenames with LIKE, "indexed" searches names, alternative
+# names and metadata through a pg_trgm (PostgreSQL) or FULLTEXT (MariaDB/MySQL) index
+ROMM_SEARCH_MODE: Final = os.environ.get("ROMM_SEARCH_MODE", "basic").lower()
 
 # REDIS
 REDIS_HOST: Final = os.environ.get("REDIS_HOST", "127.0.0.1")
@@ -80,6 +99,12 @@ REFRESH_RETROACHIEVEMENTS_CACHE_DAYS: Final = int(
 LAUNCHBOX_API_ENABLED: Final = str_to_bool(
     os.environ.get("LAUNCHBOX_API_ENABLED", "false")
 )
+LAUNCHBOX_STREAMING_INGEST: Final = str_to_bool(
+    os.environ.get("LAUNCHBOX_STREAMING_INGEST", "false")
+)
+LAUNCHBOX_INGEST_FLUSH_SIZE: Final = int(
+    os.environ.get("LAUNCHBOX_INGEST_FLUSH_SIZE", 5000)
+)
 
 # PLAYMATCH
 PLAYMATCH_API_ENABLED: Final = str_to_bool(
@@ -94,6 +119,61 @@ HASHEOUS_API_ENABLED: Final = str_to_bool(
 # THEGAMESDB
 TGDB_API_ENABLED: Final = str_to_bool(os.environ.get("TGDB_API_ENABLED", "false"))
 
+# METADATA CACHE
+METADATA_CACHE_ENABLED: Final = str_to_bool(
+    os.environ.get("METADATA_CACHE_ENABLED", "true")
+)
+METADATA_CACHE_TTL: Final = int(
+    os.environ.get("METADATA_CACHE_TTL", 60 * 60 * 24 * 7)  # 7 days
+)
+METADATA_CACHE_MAX_ENTRIES: Final = int(
+    os.environ.get("METADATA_CACHE_MAX_ENTRIES", 20000)  # Per provider
+)
+
+# METADATA RATE LIMITS
+# Requests per second and requests in flight allowed to each provider, shared by
+# every process of the instance
+IGDB_REQUESTS_PER_SECOND: Final = float(os.environ.get("IGDB_REQUESTS_PER_SECOND", 4))
+IGDB_MAX_CONCURRENT_REQUESTS: Final = int(
+    os.environ.get("IGDB_MAX_CONCURRENT_REQUESTS", 8)
+)
+MOBYGAMES_REQUESTS_PER_SECOND: Final = float(
+    os.environ.get("MOBYGAMES_REQUESTS_PER_SECOND", 1)
+)
+MOBYGAMES_MAX_CONCURRENT_REQUESTS: Final = int(
+    os.environ.get("MOBYGAMES_MAX_CONCURRENT_REQUESTS", 2)
+)
+SCREENSCRAPER_REQUESTS_PER_SECOND: Final = float(
+    os.environ.get("SCREENSCRAPER_REQUESTS_PER_SECOND", 2)
+)
+SCREENSCRAPER_MAX_CONCURRENT_REQUESTS: Final = int(
+    os.environ.get("SCREENSCRAPER_MAX_CONCURRENT_REQUESTS", 1)
+)
+STEAMGRIDDB_REQUESTS_PER_SECOND: Final = float(
+    os.environ.get("STEAMGRIDDB_REQUESTS_PER_SECOND", 4)
+)
+STEAMGRIDDB_MAX_CONCURRENT_REQUESTS: Final = int(
+    os.environ.get("STEAMGRIDDB_MAX_CONCURRENT_REQUESTS", 4)
+)
+RETROACHIEVEMENTS_REQUESTS_PER_SECOND: Final = float(
+    os.environ.get("RETROACHIEVEMENTS_REQUESTS_PER_SECOND", 4)
+)
+RETROACHIEVEMENTS_MAX_CONCURRENT_REQUESTS: Final = int(
+    os.environ.get("RETROACHIEVEMENTS_MAX_CONCURRENT_REQUESTS", 4)
+)
+PLAYMATCH_REQUESTS_PER_SECOND: Final = float(
+    os.environ.get("PLAYMATCH_REQUESTS_PER_SECOND", 4)
+)
+PLAYMATCH_MAX_CONCURRENT_REQUESTS: Final = int(
+    os.environ.get("PLAYMATCH_MAX_CONCURRENT_REQUESTS", 4)
+)
+HASHEOUS_REQUESTS_PER_SECOND: Final = float(
+    os.environ.get("HASHEOUS_REQUESTS_PER_SECOND", 4)
+)
+HASHEOUS_MAX_CONCURRENT_REQUESTS: Final = int(
+    os.environ.get("HASHEOUS_MAX_CONCURRENT_REQUESTS", 4)
+)
+
 # AUTH
 ROMM_AUTH_SECRET_KEY: Final = os.environ.get(
     "ROMM_AUTH_SECRET_KEY", secrets.token_hex(32)
@@ -120,6 +200,45 @@ OIDC_TLS_CACERTFILE: Final = os.environ.get("OIDC_TLS_CACERTFILE", None)
 
 # SCANS
 SCAN_TIMEOUT: Final = int(os.environ.get("SCAN_TIMEOUT", 60 * 60 * 4))  # 4 hours
+SCAN_HASH_WORKERS: Final = int(
+    os.environ.get("SCAN_HASH_WORKERS") or min(4, os.cpu_count() or 1)
+)
+SCAN_HASH_CHUNK_SIZE: Final = int(
+    os.environ.get("SCAN_HASH_CHUNK_SIZE", 1024 * 1024)  # 1 MiB
+)
+SCAN_RAHASHER_WORKERS: Final = int(
+    os.environ.get("SCAN_RAHASHER_WORKERS") or SCAN_HASH_WORKERS
+)
+SCAN_RAHASHER_TIMEOUT: Final = int(
+    os.environ.get("SCAN_RAHASHER_TIMEOUT", 60 * 5)  # 5 minutes
+)
+SCAN_BULK_WRITES_ENABLED: Final = str_to_bool(
+    os.environ.get("SCAN_BULK_WRITES_ENABLED", "false")
+)
+SCAN_BULK_WRITES_BATCH_SIZE: Final = int(
+    os.environ.get("SCAN_BULK_WRITES_BATCH_SIZE", 50)
+)
+SCAN_CHECKPOINT_TTL: Final = int(
+    os.environ.get("SCAN_CHECKPOINT_TTL", 60 * 60 * 24 * 7)  # 7 days
+)
+SCAN_DISTRIBUTED_ENABLED: Final = str_to_bool(
+    os.environ.get("SCAN_DISTRIBUTED_ENABLED", "false")
+)
+SCAN_PIPELINE_ENABLED: Final = str_to_bool(
+    os.environ.get("SCAN_PIPELINE_ENABLED", "false")
+)
+SCAN_PIPELINE_MAX_IN_FLIGHT: Final = int(
+    os.environ.get("SCAN_PIPELINE_MAX_IN_FLIGHT", 32)
+)
+SCAN_PIPELINE_HASH_CONCURRENCY: Final = int(
+    os.environ.get("SCAN_PIPELINE_HASH_CONCURRENCY") or SCAN_HASH_WORKERS
+)
+SCAN_PIPELINE_METADATA_CONCURRENCY: Final = int(
+    os.environ.get("SCAN_PIPELINE_METADATA_CONCURRENCY", 4)
+)
+SCAN_PIPELINE_RESOURCES_CONCURRENCY: Final = int(
+    os.environ.get("SCAN_PIPELINE_RESOURCES_CONCURRENCY", 4)
+)
 
 # TASKS
 ENABLE_RESCAN_ON_FILESYSTEM_CHANGE: Final = str_to_bool(
@@ -128,6 +247,9 @@ ENABLE_RESCAN_ON_FILESYSTEM_CHANGE: Final = str_to_bool(
 RESCAN_ON_FILESYSTEM_CHANGE_DELAY: Final = int(
     os.environ.get("RESCAN_ON_FILESYSTEM_CHANGE_DELAY", 5)  # 5 minutes
 )
+RESCAN_ON_FILESYSTEM_CHANGE_INCREMENTAL: Final = str_to_bool(
+    os.environ.get("RESCAN_ON_FILESYSTEM_CHANGE_INCREMENTAL", "false")
+)
 ENABLE_SCHEDULED_RESCAN: Final = str_to_bool(
     os.environ.get("ENABLE_SCHEDULED_RESCAN", "false")
 )
@@ -149,6 +271,13 @@ SCHEDULED_UPDATE_LAUNCHBOX_METADATA_CRON: Final = os.environ.get(
     "SCHEDULED_UPDATE_LAUNCHBOX_METADATA_CRON",
     "0 5 * * *",  # At 5:00 AM every day
 )
+ENABLE_SCHEDULED_RECONCILE_LIBRARY_STATS: Final = str_to_bool(
+    os.environ.get("ENABLE_SCHEDULED_RECONCILE_LIBRARY_STATS", "true")
+)
+SCHEDULED_RECONCILE_LIBRARY_STATS_CRON: Final = os.environ.get(
+    "SCHEDULED_RECONCILE_LIBRARY_STATS_CRON",
+    "0 6 * * *",  # At 6:00 AM every day
+)
 
 # EMULATION
 DISABLE_EMULATOR_JS = str_to_bool(os.environ.get("DISABLE_EMULATOR_JS", "false"))
@@ -163,6 +292,9 @@ LOGLEVEL: Final = os.environ.get("LOGLEVEL", "INFO").upper()
 FORCE_COLOR: Final = str_to_bool(os.environ.get("FORCE_COLOR", "false"))
 NO_COLOR: Final = str_to_bool(os.environ.get("NO_COLOR", "false"))
 
+# METRICS
+METRICS_ENABLED: Final = str_to_bool(os.environ.get("METRICS_ENABLED", "false"))
+
 # SENTRY
 SENTRY_DSN: Final = os.environ.get("SENTRY_DSN", None)
 
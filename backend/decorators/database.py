@@ -9,7 +9,8 @@ from sqlalchemy.exc import ProgrammingError
 def begin_session(func):
     @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        if hasattr(kwargs, "session"):
+        # Nested calls reuse the session, and connection, of their caller
+        if kwargs.get("session") is not None:
             return func(*args, **kwargs)
 
         try:
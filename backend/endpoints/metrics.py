@@ -0,0 +1,52 @@
+from config import METRICS_ENABLED
+from decorators.auth import protected_route
+from fastapi import HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+from handler.auth.constants import Scope
+from handler.redis_handler import default_queue, high_prio_queue, low_prio_queue
+from utils.metrics import REGISTRY
+from utils.router import APIRouter
+
+router = APIRouter(
+    tags=["system"],
+)
+
+
+def _queue_metrics() -> str:
+    lines = [
+        "# HELP romm_rq_queue_jobs Jobs waiting in or being run from each task queue",
+        "# TYPE romm_rq_queue_jobs gauge",
+    ]
+    for queue in (high_prio_queue, default_queue, low_prio_queue):
+        lines.append(
+            f'romm_rq_queue_jobs{{queue="{queue.name}",state="queued"}} {len(queue)}'
+        )
+        lines.append(
+            f'romm_rq_queue_jobs{{queue="{queue.name}",state="started"}} '
+            f"{queue.started_job_registry.count}"
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+@protected_route(router.get, "/metrics", [Scope.TASKS_RUN], include_in_schema=False)
+def metrics(request: Request) -> PlainTextResponse:
+    """Endpoint to expose the RomM metrics in the Prometheus text format
+
+    Scrapers authenticate as an admin, with a token or HTTP basic auth.
+
+    Args:
+        request (Request): Fastapi Request object
+    Returns:
+        PlainTextResponse: Request, query, provider, scan and queue metrics
+    """
+
+    if not METRICS_ENABLED:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Metrics are disabled"
+        )
+
+    return PlainTextResponse(
+        REGISTRY.render() + _queue_metrics(),
+        media_type="text/plain; version=0.0.4",
+    )
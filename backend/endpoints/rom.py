@@ -1,6 +1,8 @@
 import binascii
-from base64 import b64encode
+import json
+from base64 import b64encode, urlsafe_b64decode, urlsafe_b64encode
 from datetime import datetime, timezone
+from decimal import Decimal
 from io import BytesIO
 from stat import S_IFREG
 from typing import Annotated, Any
@@ -26,6 +28,7 @@ from exceptions.endpoint_exceptions import RomNotFoundInDatabaseException
 from exceptions.fs_exceptions import RomAlreadyExistsException
 from fastapi import (
     Body,
+    Depends,
     File,
     Header,
     HTTPException,
@@ -37,12 +40,15 @@ from fastapi import (
     UploadFile,
     status,
 )
-from fastapi.responses import Response
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, Response
+from fastapi_pagination.api import pagination_ctx
 from fastapi_pagination.ext.sqlalchemy import paginate
 from fastapi_pagination.limit_offset import LimitOffsetPage, LimitOffsetParams
 from handler.auth.constants import Scope
 from handler.database import db_platform_handler, db_rom_handler
 from handler.database.base_handler import sync_session
+from handler.database.roms_handler import ROM_PROJECTION_FIELDS, build_rom_projection
 from handler.filesystem import fs_resource_handler, fs_rom_handler
 from handler.filesystem.base_handler import CoverSize
 from handler.metadata import (
@@ -55,7 +61,8 @@ from logger.formatter import BLUE
 from logger.formatter import highlight as hl
 from logger.logger import log
 from models.rom import RomFile
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+from sqlalchemy import func, select
 from starlette.requests import ClientDisconnect
 from starlette.responses import FileResponse
 from streaming_form_data import StreamingFormDataParser
@@ -159,12 +166,79 @@ class CustomLimitOffsetParams(LimitOffsetParams):
 
 class CustomLimitOffsetPage[T: BaseModel](LimitOffsetPage[T]):
     char_index: dict[str, int]
+    next_cursor: str | None = None
     __params_type__ = CustomLimitOffsetParams
 
 
-@protected_route(router.get, "", [Scope.ROMS_READ])
+class RomProjectionPage(BaseModel):
+    items: list[dict[str, Any]]
+    total: int
+    limit: int
+    offset: int
+    char_index: dict[str, int]
+    next_cursor: str | None = None
+
+
+def _encode_roms_cursor(
+    sort_key: Any, rom_id: int, total: int, order_by: str, order_dir: str
+) -> str:
+    if isinstance(sort_key, datetime):
+        sort_key = {"dt": sort_key.isoformat()}
+    elif isinstance(sort_key, Decimal):
+        sort_key = (
+            int(sort_key) if sort_key == sort_key.to_integral() else float(sort_key)
+        )
+
+    # The total is counted for the first page only, and carried over to the next ones.
+    # The order is kept to check that the next pages are requested with the same one
+    payload = json.dumps(
+        [order_by, order_dir, sort_key, rom_id, total], separators=(",", ":")
+    )
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def _decode_roms_cursor(
+    cursor: str, order_by: str, order_dir: str
+) -> tuple[Any, int, int]:
+    try:
+        payload = urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order_by, cursor_order_dir, sort_key, rom_id, total = json.loads(payload)
+        if isinstance(sort_key, dict):
+            sort_key = datetime.fromisoformat(sort_key["dt"])
+        if not isinstance(rom_id, int) or not isinstance(total, int):
+            raise ValueError("Invalid rom id or total")
+    except (binascii.Error, KeyError, TypeError, ValueError) as exc:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+        ) from exc
+
+    # The sort key of the cursor can only be compared with the same order
+    if (cursor_order_by, cursor_order_dir) != (order_by, order_dir):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor was issued for a different order_by or order_dir",
+        )
+
+    return sort_key, rom_id, total
+
+
+@protected_route(
+    router.get,
+    "",
+    [Scope.ROMS_READ],
+    # Projected pages only carry the requested fields, so they can't be described
+    # by the rom schema; the full page is tried first
+    response_model=Annotated[
+        CustomLimitOffsetPage[SimpleRomSchema] | RomProjectionPage,
+        Field(union_mode="left_to_right"),
+    ],
+)
 def get_roms(
     request: Request,
+    params: Annotated[
+        CustomLimitOffsetParams,
+        Depends(pagination_ctx(CustomLimitOffsetPage[SimpleRomSchema])),
+    ],
     search_term: Annotated[
         str | None,
         Query(description="Search term to filter roms."),
@@ -251,20 +325,50 @@ def get_roms(
     ] = None,
     order_by: Annotated[
         str,
-        Query(description="Field to order results by."),
+        Query(
+            description=(
+                "Field to order results by. `relevance` ranks the results of "
+                "`search_term` when the indexed search is enabled."
+            )
+        ),
     ] = "name",
     order_dir: Annotated[
         str,
         Query(description="Order direction, either 'asc' or 'desc'."),
     ] = "asc",
-) -> CustomLimitOffsetPage[SimpleRomSchema]:
+    fields: Annotated[
+        str | None,
+        Query(
+            description=(
+                "Comma-separated list of fields to return for each rom, "
+                "e.g. `id,name,path_cover_small,platform_id`. "
+                "Only those columns are read from the database."
+            )
+        ),
+    ] = None,
+    cursor: Annotated[
+        str | None,
+        Query(
+            description=(
+                "Keyset pagination cursor, taken from the `next_cursor` of the previous page. "
+                "Pass an empty value to request the first page; the offset is ignored. "
+                "The total is counted for the first page and kept by the cursor, "
+                "and later pages must use the same `order_by` and `order_dir`."
+            )
+        ),
+    ] = None,
+) -> CustomLimitOffsetPage[SimpleRomSchema] | Response:
     """Retrieve roms."""
 
+    keyset = cursor is not None
+
     # Get the base roms query
     query = db_rom_handler.get_roms_query(
         user_id=request.user.id,
         order_by=order_by.lower(),
         order_dir=order_dir.lower(),
+        keyset=keyset,
+        search_term=search_term,
     )
 
     # Filter down the query
@@ -293,6 +397,23 @@ def get_roms(
         group_by_meta_id=group_by_meta_id,
     )
 
+    projected_fields = _parse_roms_fields(fields) if fields else None
+    if keyset or projected_fields:
+        return _get_roms_page(
+            request,
+            query,
+            params,
+            fields=projected_fields,
+            keyset=keyset,
+            order_by=order_by.lower(),
+            order_dir=order_dir.lower(),
+            cursor=(
+                _decode_roms_cursor(cursor, order_by.lower(), order_dir.lower())
+                if cursor
+                else None
+            ),
+        )
+
     # Get the char index for the roms
     char_index = db_rom_handler.get_char_index(query=query)
     char_index_dict = {char: index for (char, index) in char_index}
@@ -308,6 +429,97 @@ def get_roms(
         )
 
 
+def _parse_roms_fields(fields: str) -> list[str]:
+    projected_fields = list(
+        dict.fromkeys(field.strip() for field in fields.split(",") if field.strip())
+    )
+    unknown_fields = [f for f in projected_fields if f not in ROM_PROJECTION_FIELDS]
+    if unknown_fields:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown_fields)}",
+        )
+
+    return projected_fields
+
+
+def _get_roms_page(
+    request: Request,
+    query: Any,
+    params: CustomLimitOffsetParams,
+    fields: list[str] | None,
+    keyset: bool,
+    order_by: str,
+    order_dir: str,
+    cursor: tuple[Any, int, int] | None,
+) -> CustomLimitOffsetPage[SimpleRomSchema] | Response:
+    # The char index needs the position of every row, which defeats the point of
+    # seeking, so keyset pages are returned without one
+    char_index = (
+        {}
+        if keyset
+        else {char: index for (char, index) in db_rom_handler.get_char_index(query)}
+    )
+
+    if fields:
+        query = db_rom_handler.project_roms(query, fields)
+
+    with sync_session.begin() as session:
+        if cursor is None:
+            total = (
+                session.scalar(
+                    select(func.count()).select_from(query.order_by(None).subquery())
+                )
+                or 0
+            )
+        else:
+            # Counting every matching row would undo the point of seeking
+            sort_key, rom_id, total = cursor
+            query = db_rom_handler.seek_roms(
+                query, order_dir=order_dir, after=(sort_key, rom_id)
+            )
+        if keyset:
+            rows = session.execute(query.limit(params.limit + 1)).all()
+        else:
+            rows = session.execute(
+                query.limit(params.limit).offset(params.offset)
+            ).all()
+
+        next_cursor = None
+        if keyset and len(rows) > params.limit:
+            rows = rows[: params.limit]
+            last_id = rows[-1].id if fields else rows[-1][0].id
+            next_cursor = _encode_roms_cursor(
+                rows[-1].sort_key, last_id, total, order_by, order_dir
+            )
+
+        page: dict[str, Any] = {
+            "total": total,
+            "limit": params.limit,
+            "offset": 0 if keyset else params.offset,
+            "char_index": char_index,
+            "next_cursor": next_cursor,
+        }
+
+        # Projected rows skip the schema entirely, so only the requested fields are sent
+        if fields:
+            return JSONResponse(
+                jsonable_encoder(
+                    RomProjectionPage(
+                        items=[build_rom_projection(row, fields) for row in rows],
+                        **page,
+                    )
+                )
+            )
+
+        return CustomLimitOffsetPage[SimpleRomSchema](
+            items=[
+                SimpleRomSchema.from_orm_with_request(row[0], request) for row in rows
+            ],
+            **page,
+        )
+
+
 @protected_route(
     router.get,
     "/{id}",
@@ -1,12 +1,29 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import hashlib
+import json
+import time
+from collections import Counter
+from dataclasses import dataclass, field
 from itertools import batched
-from typing import Any, Final
+from typing import Any, Final, cast
 
 import emoji
 import socketio  # type: ignore
-from config import DEV_MODE, REDIS_URL, SCAN_TIMEOUT
+from config import (
+    DEV_MODE,
+    REDIS_URL,
+    SCAN_BULK_WRITES_BATCH_SIZE,
+    SCAN_BULK_WRITES_ENABLED,
+    SCAN_CHECKPOINT_TTL,
+    SCAN_DISTRIBUTED_ENABLED,
+    SCAN_PIPELINE_ENABLED,
+    SCAN_PIPELINE_HASH_CONCURRENCY,
+    SCAN_PIPELINE_MAX_IN_FLIGHT,
+    SCAN_PIPELINE_METADATA_CONCURRENCY,
+    SCAN_PIPELINE_RESOURCES_CONCURRENCY,
+    SCAN_TIMEOUT,
+)
 from endpoints.responses.platform import PlatformSchema
 from endpoints.responses.rom import SimpleRomSchema
 from exceptions.fs_exceptions import (
@@ -16,15 +33,21 @@ from exceptions.fs_exceptions import (
 )
 from exceptions.socket_exceptions import ScanStoppedException
 from handler.database import db_firmware_handler, db_platform_handler, db_rom_handler
+from handler.database.roms_handler import RomsBulkWriter
 from handler.filesystem import (
     fs_firmware_handler,
     fs_platform_handler,
     fs_resource_handler,
     fs_rom_handler,
 )
+from handler.filesystem.hashing_engine import HashingStats
+from handler.filesystem.resources_handler import CoverStats
 from handler.filesystem.roms_handler import FSRom
-from handler.redis_handler import high_prio_queue, redis_client
+from handler.metadata import meta_hasheous_handler
+from handler.metadata.hasheous_handler import HasheousGameLookups
+from handler.redis_handler import high_prio_queue, redis_client, sync_cache
 from handler.scan_handler import (
+    MetadataSource,
     ScanType,
     scan_firmware,
     scan_platform,
@@ -36,12 +59,16 @@ from logger.formatter import highlight as hl
 from logger.logger import log
 from models.platform import Platform
 from models.rom import Rom, RomFile
-from rq import Worker
-from rq.job import Job
+from rq import Worker, get_current_job
+from rq.job import Dependency, Job
 from sqlalchemy.inspection import inspect
 from utils.context import initialize_context
+from utils.metrics import SCANNED_ROMS
+from utils.pipeline import PipelineStage, run_pipeline
+from utils.rate_limiter import rate_limit_waits
 
 STOP_SCAN_FLAG: Final = "scan:stop"
+SCAN_CHECKPOINT_KEY: Final = "romm:scan_checkpoint"
 
 
 @dataclass
@@ -54,6 +81,8 @@ class ScanStats:
     metadata_roms: int = 0
     scanned_firmware: int = 0
     added_firmware: int = 0
+    cover_bytes_downloaded: int = 0
+    cover_resize_seconds: float = 0.0
 
     def __add__(self, other: Any) -> ScanStats:
         if not isinstance(other, ScanStats):
@@ -70,7 +99,77 @@ class ScanStats:
             metadata_roms=self.metadata_roms + other.metadata_roms,
             scanned_firmware=self.scanned_firmware + other.scanned_firmware,
             added_firmware=self.added_firmware + other.added_firmware,
+            cover_bytes_downloaded=self.cover_bytes_downloaded
+            + other.cover_bytes_downloaded,
+            cover_resize_seconds=self.cover_resize_seconds + other.cover_resize_seconds,
+        )
+
+
+class ScanCheckpoint:
+    """Progress of a scan, saved in Redis so an interrupted scan can be resumed.
+
+    It records the platforms that were fully scanned, and the last rom stored for the
+    others. Roms are scanned in filesystem name order, so every rom up to that one is
+    done too.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+
+    @classmethod
+    def for_scan(
+        cls,
+        scan_type: ScanType,
+        platform_ids: list[int],
+        roms_ids: list[str],
+        metadata_sources: list[str],
+    ) -> ScanCheckpoint:
+        """Checkpoint shared by every run of the same scan request"""
+        scan_request = json.dumps(
+            [
+                scan_type.value,
+                sorted(platform_ids),
+                sorted(roms_ids),
+                sorted(metadata_sources),
+            ]
         )
+        fingerprint = hashlib.sha1(
+            scan_request.encode(), usedforsecurity=False
+        ).hexdigest()
+        return cls(f"{SCAN_CHECKPOINT_KEY}:{fingerprint}")
+
+    @property
+    def _platforms_key(self) -> str:
+        return f"{self.key}:platforms"
+
+    @property
+    def _roms_key(self) -> str:
+        return f"{self.key}:roms"
+
+    def is_platform_done(self, platform_slug: str) -> bool:
+        return bool(sync_cache.sismember(self._platforms_key, platform_slug))
+
+    def last_rom(self, platform_slug: str) -> str | None:
+        """Filesystem name of the last rom stored for the platform, if any"""
+        # The sync client never returns an awaitable
+        fs_name = cast(str | None, sync_cache.hget(self._roms_key, platform_slug))
+        return json.loads(fs_name) if fs_name else None
+
+    def rom_done(self, platform_slug: str, fs_name: str) -> None:
+        with sync_cache.pipeline() as pipe:
+            pipe.hset(self._roms_key, platform_slug, json.dumps(fs_name))
+            pipe.expire(self._roms_key, SCAN_CHECKPOINT_TTL)
+            pipe.execute()
+
+    def platform_done(self, platform_slug: str) -> None:
+        with sync_cache.pipeline() as pipe:
+            pipe.sadd(self._platforms_key, platform_slug)
+            pipe.hdel(self._roms_key, platform_slug)
+            pipe.expire(self._platforms_key, SCAN_CHECKPOINT_TTL)
+            pipe.execute()
+
+    def clear(self) -> None:
+        sync_cache.delete(self._platforms_key, self._roms_key)
 
 
 def _get_socket_manager() -> socketio.AsyncRedisManager:
@@ -129,28 +228,64 @@ def _should_scan_rom(scan_type: ScanType, rom: Rom | None, roms_ids: list[str])
     )
 
 
-# There's an order of operations here that is important:
-# 1. Read the list of roms from the filesystem
-# 2. Check if ROM should be scanned based on the scan type
-# 3. Create a new ROM entry if it doesn't exist
-# 4. Build the ROM files and calculate the hashes
-# 4. Scan the ROM and update its metadata
-async def _identify_rom(
-    platform: Platform,
-    fs_rom: FSRom,
-    rom: Rom | None,
-    scan_type: ScanType,
-    roms_ids: list[str],
-    metadata_sources: list[str],
-    socket_manager: socketio.AsyncRedisManager,
-) -> ScanStats:
-    scan_stats = ScanStats()
+@dataclass
+class RomScanTask:
+    """State of a rom while it moves through the scan stages"""
+
+    platform: Platform
+    fs_rom: FSRom
+    rom: Rom | None
+    scan_type: ScanType
+    roms_ids: list[str]
+    metadata_sources: list[str]
+    socket_manager: socketio.AsyncRedisManager
+    # Entry added for a new rom along with the rest of its batch
+    new_rom: Rom | None = None
+    scan_stats: ScanStats = field(default_factory=ScanStats)
+    newly_added: bool = False
+    scanned_rom: Rom | None = None
+    rom_files: list[RomFile] = field(default_factory=list)
+    bulk_writer: RomsBulkWriter | None = None
+    hasheous_games: HasheousGameLookups | None = None
+    checkpoint: ScanCheckpoint | None = None
+    done: bool = False
+
+
+def _build_new_rom(platform: Platform, fs_rom: FSRom) -> Rom:
+    """Build the entry of a rom found on the filesystem, with the properties that
+    don't require metadata"""
+    fs_regions, fs_revisions, fs_languages, fs_other_tags = fs_rom_handler.parse_tags(
+        fs_rom["fs_name"]
+    )
+    return Rom(
+        fs_name=fs_rom["fs_name"],
+        fs_path=fs_rom_handler.get_roms_fs_structure(platform.fs_slug),
+        fs_name_no_tags=fs_rom_handler.get_file_name_with_no_tags(fs_rom["fs_name"]),
+        fs_name_no_ext=fs_rom_handler.get_file_name_with_no_extension(
+            fs_rom["fs_name"]
+        ),
+        fs_extension=fs_rom_handler.parse_file_extension(fs_rom["fs_name"]),
+        regions=fs_regions,
+        revision=fs_revisions,
+        languages=fs_languages,
+        tags=fs_other_tags,
+        platform_id=platform.id,
+        name=fs_rom["fs_name"],
+        multi=fs_rom["multi"],
+        url_cover="",
+        url_manual="",
+        url_screenshots=[],
+    )
+
 
+async def _prepare_rom(task: RomScanTask) -> RomScanTask:
     # Break early if the flag is set
     if redis_client.get(STOP_SCAN_FLAG):
-        return scan_stats
+        task.done = True
+        return task
 
-    if not _should_scan_rom(scan_type=scan_type, rom=rom, roms_ids=roms_ids):
+    rom, fs_rom = task.rom, task.fs_rom
+    if not _should_scan_rom(scan_type=task.scan_type, rom=rom, roms_ids=task.roms_ids):
         if rom:
             if rom.fs_name != fs_rom["fs_name"]:
                 # Just to update the filesystem data
@@ -160,50 +295,33 @@ async def _identify_rom(
             if rom.missing_from_fs:
                 db_rom_handler.update_rom(rom.id, {"missing_from_fs": False})
 
-        return scan_stats
+        task.done = True
+        return task
 
-    # Update properties that don't require metadata
-    fs_regions, fs_revisions, fs_languages, fs_other_tags = fs_rom_handler.parse_tags(
-        fs_rom["fs_name"]
-    )
-    roms_path = fs_rom_handler.get_roms_fs_structure(platform.fs_slug)
-
-    # Create the entry early so we have the ID
-    newly_added: bool = rom is None
+    # Create the entry early so we have the ID, unless the scan already added it
+    task.newly_added = rom is None
     if not rom:
-        rom = db_rom_handler.add_rom(
-            Rom(
-                fs_name=fs_rom["fs_name"],
-                fs_path=roms_path,
-                fs_name_no_tags=fs_rom_handler.get_file_name_with_no_tags(
-                    fs_rom["fs_name"]
-                ),
-                fs_name_no_ext=fs_rom_handler.get_file_name_with_no_extension(
-                    fs_rom["fs_name"]
-                ),
-                fs_extension=fs_rom_handler.parse_file_extension(fs_rom["fs_name"]),
-                regions=fs_regions,
-                revision=fs_revisions,
-                languages=fs_languages,
-                tags=fs_other_tags,
-                platform_id=platform.id,
-                name=fs_rom["fs_name"],
-                multi=fs_rom["multi"],
-                url_cover="",
-                url_manual="",
-                url_screenshots=[],
-            )
+        task.rom = task.new_rom or db_rom_handler.add_rom(
+            _build_new_rom(task.platform, fs_rom)
         )
 
     # Silly checks to make the type checker happy
-    if not rom:
-        return scan_stats
+    if not task.rom:
+        task.done = True
+
+    return task
+
+
+async def _hash_rom(task: RomScanTask) -> RomScanTask:
+    if task.done or not task.rom:
+        return task
 
     # Build rom files object before scanning
     rom_files, rom_crc_c, rom_md5_h, rom_sha1_h, rom_ra_h = (
-        await fs_rom_handler.get_rom_files(rom)
+        await fs_rom_handler.get_rom_files(task.rom)
     )
-    fs_rom.update(
+    task.rom_files = rom_files
+    task.fs_rom.update(
         {
             "files": rom_files,
             "crc_hash": rom_crc_c,
@@ -212,24 +330,43 @@ async def _identify_rom(
             "ra_hash": rom_ra_h,
         }
     )
+    return task
 
-    scanned_rom = await scan_rom(
-        scan_type=scan_type,
-        platform=platform,
-        rom=rom,
-        fs_rom=fs_rom,
-        metadata_sources=metadata_sources,
-        newly_added=newly_added,
+
+async def _fetch_rom_metadata(task: RomScanTask) -> RomScanTask:
+    if task.done or not task.rom:
+        return task
+
+    task.scanned_rom = await scan_rom(
+        scan_type=task.scan_type,
+        platform=task.platform,
+        rom=task.rom,
+        fs_rom=task.fs_rom,
+        metadata_sources=task.metadata_sources,
+        newly_added=task.newly_added,
+        hasheous_games=task.hasheous_games,
     )
 
-    scan_stats.scanned_roms += 1
-    scan_stats.added_roms += 1 if not rom else 0
-    scan_stats.metadata_roms += 1 if scanned_rom.is_identified else 0
+    task.scan_stats.scanned_roms += 1
+    SCANNED_ROMS.inc()
+    task.scan_stats.added_roms += 1 if task.newly_added else 0
+    task.scan_stats.metadata_roms += 1 if task.scanned_rom.is_identified else 0
+    return task
 
-    _added_rom = db_rom_handler.add_rom(scanned_rom)
 
-    # Delete the existing rom files in the DB
-    db_rom_handler.purge_rom_files(_added_rom.id)
+async def _store_rom(task: RomScanTask) -> RomScanTask:
+    if task.done or not task.scanned_rom:
+        return task
+
+    if task.bulk_writer is not None:
+        # The database write is deferred to the bulk writer, so build the
+        # stored state of the rom in memory
+        _added_rom = _merge_scanned_rom(task)
+    else:
+        _added_rom = db_rom_handler.add_rom(task.scanned_rom)
+
+        # Delete the existing rom files in the DB
+        db_rom_handler.purge_rom_files(_added_rom.id)
 
     # Create each file entry for the rom
     new_rom_files = [
@@ -245,13 +382,39 @@ async def _identify_rom(
             sha1_hash=file.sha1_hash,
             ra_hash=file.ra_hash,
         )
-        for file in rom_files
+        for file in task.rom_files
     ]
-    for new_rom_file in new_rom_files:
-        db_rom_handler.add_rom_file(new_rom_file)
+    if task.bulk_writer is not None:
+        _added_rom.files = new_rom_files
+    else:
+        for new_rom_file in new_rom_files:
+            db_rom_handler.add_rom_file(new_rom_file)
 
+    task.rom = _added_rom
+    return task
+
+
+def _merge_scanned_rom(task: RomScanTask) -> Rom:
+    """Overlay the scanned attributes on the stored rom, like `Session.merge` would"""
+    assert task.rom and task.scanned_rom  # nosec B101
+    scanned_state = inspect(task.scanned_rom).dict
+    return Rom(
+        **{
+            c: scanned_state[c] if c in scanned_state else getattr(task.rom, c)
+            for c in inspect(task.rom).mapper.column_attrs.keys()
+        }
+    )
+
+
+async def _store_rom_resources(task: RomScanTask) -> RomScanTask:
+    if task.done or not task.rom:
+        return task
+
+    _added_rom = task.rom
     if _added_rom.ra_metadata:
-        await fs_resource_handler.create_ra_resources_path(platform.id, _added_rom.id)
+        await fs_resource_handler.create_ra_resources_path(
+            task.platform.id, _added_rom.id
+        )
 
         # Store the achievements badges
         for ach in _added_rom.ra_metadata.get("achievements", []):
@@ -267,11 +430,15 @@ async def _identify_rom(
             if badge_url and badge_path:
                 await fs_resource_handler.store_ra_badge(badge_url, badge_path)
 
+    cover_stats = CoverStats()
     path_cover_s, path_cover_l = await fs_resource_handler.get_cover(
         entity=_added_rom,
         overwrite=True,
         url_cover=_added_rom.url_cover,
+        cover_stats=cover_stats,
     )
+    task.scan_stats.cover_bytes_downloaded += cover_stats.downloaded_bytes
+    task.scan_stats.cover_resize_seconds += cover_stats.resize_seconds
 
     path_manual = await fs_resource_handler.get_manual(
         rom=_added_rom,
@@ -288,6 +455,25 @@ async def _identify_rom(
     _added_rom.path_cover_l = path_cover_l
     _added_rom.path_screenshots = path_screenshots
     _added_rom.path_manual = path_manual
+    return task
+
+
+async def _finish_rom(task: RomScanTask) -> RomScanTask:
+    if task.done or not task.rom:
+        return task
+
+    _added_rom = task.rom
+    if task.bulk_writer is not None:
+        # The rom is announced once its batch is written
+        task.bulk_writer.add(_added_rom)
+        if task.bulk_writer.is_full:
+            await _flush_roms(
+                task.bulk_writer, task.platform, task.socket_manager, task.checkpoint
+            )
+
+        task.done = True
+        return task
+
     # Update the scanned rom with the cover and screenshots paths and update database
     db_rom_handler.update_rom(
         _added_rom.id,
@@ -296,21 +482,100 @@ async def _identify_rom(
             for c in inspect(_added_rom).mapper.column_attrs.keys()
         },
     )
+    await _emit_scanned_rom(task.socket_manager, task.platform, _added_rom)
+    if task.checkpoint is not None:
+        task.checkpoint.rom_done(task.platform.fs_slug, _added_rom.fs_name)
+
+    task.done = True
+    return task
 
+
+async def _emit_scanned_rom(
+    socket_manager: socketio.AsyncRedisManager, platform: Platform, rom: Rom
+) -> None:
     await socket_manager.emit(
         "scan:scanning_rom",
         {
             "platform_name": platform.name,
             "platform_slug": platform.slug,
             "platform_fs_slug": platform.fs_slug,
-            **SimpleRomSchema.from_orm_with_factory(_added_rom).model_dump(
+            **SimpleRomSchema.from_orm_with_factory(rom).model_dump(
                 exclude={"created_at", "updated_at", "rom_user"}
             ),
         },
     )
     await socket_manager.emit("", None)
 
-    return scan_stats
+
+async def _flush_roms(
+    bulk_writer: RomsBulkWriter,
+    platform: Platform,
+    socket_manager: socketio.AsyncRedisManager,
+    checkpoint: ScanCheckpoint | None = None,
+) -> None:
+    roms = bulk_writer.flush()
+    for rom in roms:
+        await _emit_scanned_rom(socket_manager, platform, rom)
+
+    if checkpoint is not None and roms:
+        checkpoint.rom_done(platform.fs_slug, roms[-1].fs_name)
+
+
+# There's an order of operations here that is important:
+# 1. Read the list of roms from the filesystem
+# 2. Check if ROM should be scanned based on the scan type
+# 3. Create a new ROM entry if it doesn't exist
+# 4. Build the ROM files and calculate the hashes
+# 5. Scan the ROM and update its metadata
+# 6. Store the ROM and its files, then download its resources
+ROM_SCAN_STAGES: Final = (
+    PipelineStage("prepare", _prepare_rom, ordered=True),
+    PipelineStage("hash", _hash_rom, concurrency=SCAN_PIPELINE_HASH_CONCURRENCY),
+    PipelineStage(
+        "metadata",
+        _fetch_rom_metadata,
+        concurrency=SCAN_PIPELINE_METADATA_CONCURRENCY,
+    ),
+    PipelineStage("store", _store_rom, ordered=True),
+    PipelineStage(
+        "resources",
+        _store_rom_resources,
+        concurrency=SCAN_PIPELINE_RESOURCES_CONCURRENCY,
+    ),
+    PipelineStage("finish", _finish_rom, ordered=True),
+)
+
+
+async def _identify_rom(
+    platform: Platform,
+    fs_rom: FSRom,
+    rom: Rom | None,
+    scan_type: ScanType,
+    roms_ids: list[str],
+    metadata_sources: list[str],
+    socket_manager: socketio.AsyncRedisManager,
+    new_rom: Rom | None = None,
+    bulk_writer: RomsBulkWriter | None = None,
+    hasheous_games: HasheousGameLookups | None = None,
+    checkpoint: ScanCheckpoint | None = None,
+) -> ScanStats:
+    task = RomScanTask(
+        platform=platform,
+        fs_rom=fs_rom,
+        rom=rom,
+        scan_type=scan_type,
+        roms_ids=roms_ids,
+        metadata_sources=metadata_sources,
+        socket_manager=socket_manager,
+        new_rom=new_rom,
+        bulk_writer=bulk_writer,
+        hasheous_games=hasheous_games,
+        checkpoint=checkpoint,
+    )
+    for stage in ROM_SCAN_STAGES:
+        task = await stage.func(task)
+
+    return task.scan_stats
 
 
 async def _identify_platform(
@@ -320,6 +585,7 @@ async def _identify_platform(
     roms_ids: list[str],
     metadata_sources: list[str],
     socket_manager: socketio.AsyncRedisManager,
+    checkpoint: ScanCheckpoint | None = None,
 ) -> ScanStats:
     # Stop the scan if the flag is set
     if redis_client.get(STOP_SCAN_FLAG):
@@ -327,6 +593,10 @@ async def _identify_platform(
 
     scan_stats = ScanStats()
 
+    if checkpoint is not None and checkpoint.is_platform_done(platform_slug):
+        log.info(f"Skipping {hl(platform_slug)}, already scanned before the resume")
+        return scan_stats
+
     platform = db_platform_handler.get_platform_by_fs_slug(platform_slug)
     if platform and scan_type == ScanType.NEW_PLATFORMS:
         return scan_stats
@@ -392,23 +662,103 @@ async def _identify_platform(
     else:
         log.info(f"{hl(str(len(fs_roms)))} roms found in the file system")
 
-    for fs_roms_batch in batched(fs_roms, 200, strict=False):
-        rom_by_filename_map = db_rom_handler.get_roms_by_fs_name(
-            platform_id=platform.id,
-            fs_names={fs_rom["fs_name"] for fs_rom in fs_roms_batch},
-        )
+    # Roms up to the checkpoint were already stored by an interrupted run of the scan
+    resume_after = checkpoint.last_rom(platform.fs_slug) if checkpoint else None
+    if resume_after is not None:
+        log.info(f"Resuming {hl(platform.fs_slug)} after {hl(resume_after)}")
+    fs_roms_to_scan = [
+        fs_rom
+        for fs_rom in fs_roms
+        if resume_after is None or fs_rom["fs_name"] > resume_after
+    ]
 
-        for fs_rom in fs_roms_batch:
-            scan_stats += await _identify_rom(
-                platform=platform,
-                fs_rom=fs_rom,
-                rom=rom_by_filename_map.get(fs_rom["fs_name"]),
-                scan_type=scan_type,
-                roms_ids=roms_ids,
-                metadata_sources=metadata_sources,
-                socket_manager=socket_manager,
+    # With bulk writes enabled, scanned roms are written in batches, one
+    # transaction per batch
+    bulk_writer = (
+        RomsBulkWriter(db_rom_handler, batch_size=SCAN_BULK_WRITES_BATCH_SIZE)
+        if SCAN_BULK_WRITES_ENABLED
+        else None
+    )
+    # Roms of the platform that Hasheous matches to the same game share its IGDB
+    # and RA lookups
+    hasheous_games = (
+        HasheousGameLookups(meta_hasheous_handler)
+        if MetadataSource.HASHEOUS in metadata_sources
+        else None
+    )
+    try:
+        for fs_roms_batch in batched(fs_roms_to_scan, 200, strict=False):
+            rom_by_filename_map = db_rom_handler.get_roms_by_fs_name(
+                platform_id=platform.id,
+                fs_names={fs_rom["fs_name"] for fs_rom in fs_roms_batch},
+            )
+            # New roms are added together to get their ids, instead of one by one
+            new_rom_by_filename_map = (
+                {
+                    rom.fs_name: rom
+                    for rom in bulk_writer.add_new_roms(
+                        [
+                            _build_new_rom(platform, fs_rom)
+                            for fs_rom in fs_roms_batch
+                            if fs_rom["fs_name"] not in rom_by_filename_map
+                            and _should_scan_rom(scan_type, None, roms_ids)
+                        ]
+                    )
+                }
+                if bulk_writer is not None
+                else {}
             )
 
+            if SCAN_PIPELINE_ENABLED:
+                # Roms move through the stages concurrently, while the database writes
+                # and socket events still happen in filesystem order
+                tasks = await run_pipeline(
+                    [
+                        RomScanTask(
+                            platform=platform,
+                            fs_rom=fs_rom,
+                            rom=rom_by_filename_map.get(fs_rom["fs_name"]),
+                            scan_type=scan_type,
+                            roms_ids=roms_ids,
+                            metadata_sources=metadata_sources,
+                            socket_manager=socket_manager,
+                            new_rom=new_rom_by_filename_map.get(fs_rom["fs_name"]),
+                            bulk_writer=bulk_writer,
+                            hasheous_games=hasheous_games,
+                            checkpoint=checkpoint,
+                        )
+                        for fs_rom in fs_roms_batch
+                    ],
+                    ROM_SCAN_STAGES,
+                    max_in_flight=SCAN_PIPELINE_MAX_IN_FLIGHT,
+                )
+                for task in tasks:
+                    scan_stats += task.scan_stats
+            else:
+                for fs_rom in fs_roms_batch:
+                    scan_stats += await _identify_rom(
+                        platform=platform,
+                        fs_rom=fs_rom,
+                        rom=rom_by_filename_map.get(fs_rom["fs_name"]),
+                        scan_type=scan_type,
+                        roms_ids=roms_ids,
+                        metadata_sources=metadata_sources,
+                        socket_manager=socket_manager,
+                        new_rom=new_rom_by_filename_map.get(fs_rom["fs_name"]),
+                        bulk_writer=bulk_writer,
+                        hasheous_games=hasheous_games,
+                        checkpoint=checkpoint,
+                    )
+
+            if bulk_writer is not None:
+                await _flush_roms(bulk_writer, platform, socket_manager, checkpoint)
+    finally:
+        # Roms that finished before an error are still written, while the empty
+        # entries of the ones in flight are removed for the next scan to add again
+        if bulk_writer is not None:
+            await _flush_roms(bulk_writer, platform, socket_manager, checkpoint)
+            bulk_writer.discard_unwritten_roms()
+
     missing_roms = db_rom_handler.mark_missing_roms(
         platform.id, [rom["fs_name"] for rom in fs_roms]
     )
@@ -425,15 +775,197 @@ async def _identify_platform(
         for f in missing_firmware:
             log.warning(f" - {f}")
 
+    # A stopped scan skips the remaining roms, so the platform isn't done yet
+    if checkpoint is not None and not redis_client.get(STOP_SCAN_FLAG):
+        checkpoint.platform_done(platform.fs_slug)
+
     return scan_stats
 
 
+def _log_scan_summary(
+    scan_stats: ScanStats,
+    hashing_stats: HashingStats,
+    rate_limit_waits: dict[str, float],
+) -> None:
+    if hashing_stats.files or hashing_stats.cached_roms:
+        log.info(f"Hashed {hashing_stats.summary()}")
+    if scan_stats.cover_bytes_downloaded:
+        log.info(
+            f"Downloaded {scan_stats.cover_bytes_downloaded / 1024 / 1024:.1f} MiB "
+            f"of covers, resized in {scan_stats.cover_resize_seconds:.1f}s"
+        )
+    for provider, waited in rate_limit_waits.items():
+        if waited >= 1:
+            log.info(f"Waited {waited:.1f}s on the {hl(provider)} rate limit")
+
+
+def _rate_limit_waits_since(waits_before: dict[str, float]) -> dict[str, float]:
+    return {
+        provider: waited - waits_before.get(provider, 0.0)
+        for provider, waited in rate_limit_waits().items()
+    }
+
+
+def _mark_missing_platforms(fs_platforms: list[str]) -> None:
+    missed_platforms = db_platform_handler.mark_missing_platforms(fs_platforms)
+    if len(missed_platforms) > 0:
+        log.warning(f"{hl('Missing')} platforms from filesystem:")
+        for p in missed_platforms:
+            log.warning(f" - {p.slug}")
+
+
+def _enqueue_platform_scans(
+    platform_list: list[str],
+    scan_type: ScanType,
+    fs_platforms: list[str],
+    roms_ids: list[str],
+    metadata_sources: list[str],
+    checkpoint: ScanCheckpoint,
+    started_at: float,
+) -> Job:
+    """Enqueue a job per platform, and one that completes the scan once they're done
+
+    A stopped scan lets its platform jobs end on the stop flag rather than
+    cancelling them, as the job completing the scan only runs once the jobs it
+    depends on have finished or failed.
+
+    Returns:
+        The job completing the scan
+    """
+    platform_jobs = [
+        high_prio_queue.enqueue(
+            scan_platform_job,
+            platform_slug,
+            scan_type,
+            fs_platforms,
+            roms_ids,
+            metadata_sources,
+            checkpoint.key,
+            job_timeout=SCAN_TIMEOUT,
+            # Keep the stats around until the slowest platform is done
+            result_ttl=SCAN_TIMEOUT * len(platform_list),
+        )
+        for platform_slug in platform_list
+    ]
+
+    return high_prio_queue.enqueue(
+        finish_platform_scans,
+        [job.id for job in platform_jobs],
+        fs_platforms,
+        checkpoint.key,
+        started_at,
+        depends_on=Dependency(jobs=platform_jobs, allow_failure=True),
+    )
+
+
+@initialize_context()
+async def scan_platform_job(
+    platform_slug: str,
+    scan_type: ScanType,
+    fs_platforms: list[str],
+    roms_ids: list[str],
+    metadata_sources: list[str],
+    checkpoint_key: str | None = None,
+) -> dict[str, Any]:
+    """Scan a single platform, as part of a scan split across workers
+
+    Returns:
+        The scan, hashing and rate limit stats of the platform
+    """
+
+    sm = _get_socket_manager()
+    hashing_engine = fs_rom_handler.hashing_engine
+    hashing_stats = hashing_engine.snapshot_stats()
+    waits_before_scan = rate_limit_waits()
+
+    with hashing_engine.in_use():
+        try:
+            scan_stats = await _identify_platform(
+                platform_slug=platform_slug,
+                scan_type=scan_type,
+                fs_platforms=fs_platforms,
+                roms_ids=roms_ids,
+                metadata_sources=metadata_sources,
+                socket_manager=sm,
+                checkpoint=ScanCheckpoint(checkpoint_key) if checkpoint_key else None,
+            )
+        except ScanStoppedException:
+            scan_stats = ScanStats()
+
+    hashing_stats = hashing_engine.stats - hashing_stats
+    return {
+        "scan_stats": scan_stats.__dict__,
+        "hashing_stats": {
+            "roms": hashing_stats.roms,
+            "files": hashing_stats.files,
+            "bytes": hashing_stats.bytes,
+            "cached_roms": hashing_stats.cached_roms,
+        },
+        "rate_limit_waits": _rate_limit_waits_since(waits_before_scan),
+    }
+
+
+@initialize_context()
+async def finish_platform_scans(
+    platform_job_ids: list[str],
+    fs_platforms: list[str],
+    checkpoint_key: str | None = None,
+    started_at: float | None = None,
+) -> None:
+    """Aggregate the stats of the platform jobs of a split scan, and complete it
+
+    Args:
+        platform_job_ids (list[str]): IDs of the platform jobs
+        fs_platforms (list[str]): Platforms found in the file system
+        checkpoint_key (str, optional): Key of the scan checkpoint, cleared once every platform job succeeded
+        started_at (float, optional): Time the scan started at, as a Unix timestamp
+    """
+
+    sm = _get_socket_manager()
+
+    scan_stats = ScanStats()
+    # The platforms were hashed in parallel, so the hashing took as long as the scan
+    hashing_stats = HashingStats()
+    if started_at is not None:
+        hashing_stats.started_at -= time.time() - started_at
+    waits: Counter[str] = Counter()
+    completed = True
+    for job in Job.fetch_many(platform_job_ids, connection=redis_client):
+        if job is None:
+            continue
+
+        if job.is_finished and isinstance(result := job.return_value(), dict):
+            scan_stats += ScanStats(**result["scan_stats"])
+            for name, value in result["hashing_stats"].items():
+                setattr(hashing_stats, name, getattr(hashing_stats, name) + value)
+            waits.update(result["rate_limit_waits"])
+            job.delete()
+        else:
+            completed = False
+            log.error(f"Platform scan job {job.id} ended as {job.get_status()}")
+
+    if redis_client.get(STOP_SCAN_FLAG):
+        log.info(emoji.emojize(":stop_sign: Scan stopped manually"))
+        await sm.emit("scan:done", scan_stats.__dict__)
+        redis_client.delete(STOP_SCAN_FLAG)
+        return
+
+    _mark_missing_platforms(fs_platforms)
+    if completed and checkpoint_key:
+        ScanCheckpoint(checkpoint_key).clear()
+
+    log.info(emoji.emojize(":check_mark:  Scan completed "))
+    _log_scan_summary(scan_stats, hashing_stats, dict(waits))
+    await sm.emit("scan:done", scan_stats.__dict__)
+
+
 @initialize_context()
 async def scan_platforms(
     platform_ids: list[int],
     scan_type: ScanType = ScanType.QUICK,
     roms_ids: list[str] | None = None,
     metadata_sources: list[str] | None = None,
+    resume: bool = False,
 ):
     """Scan all the listed platforms and fetch metadata from different sources
 
@@ -442,6 +974,7 @@ async def scan_platforms(
         scan_type (str): Type of scan to be performed. Defaults to "quick".
         roms_ids (list[str], optional): List of selected roms to be scanned. Defaults to [].
         metadata_sources (list[str], optional): List of metadata sources to be used. Defaults to all sources.
+        resume (bool, optional): Skip the platforms and roms already scanned by an interrupted run of the same scan. Defaults to False.
     """
 
     if not roms_ids:
@@ -449,6 +982,9 @@ async def scan_platforms(
 
     sm = _get_socket_manager()
 
+    # A flag left by a stopped scan that never completed would stop this one
+    redis_client.delete(STOP_SCAN_FLAG)
+
     if not metadata_sources:
         log.error("No metadata sources provided")
         await sm.emit("scan:done_ko", "No metadata sources provided")
@@ -462,59 +998,166 @@ async def scan_platforms(
         return
 
     scan_stats = ScanStats()
+    started_at = time.time()
+    hashing_engine = fs_rom_handler.hashing_engine
+    hashing_stats = hashing_engine.snapshot_stats()
+    waits_before_scan = rate_limit_waits()
+
+    checkpoint = ScanCheckpoint.for_scan(
+        scan_type, platform_ids, roms_ids, metadata_sources
+    )
+    if not resume:
+        checkpoint.clear()
 
     async def stop_scan():
         log.info(emoji.emojize(":stop_sign: Scan stopped manually"))
         await sm.emit("scan:done", scan_stats.__dict__)
         redis_client.delete(STOP_SCAN_FLAG)
 
-    try:
-        platform_list = [
-            platform.fs_slug
-            for s in platform_ids
-            if (platform := db_platform_handler.get_platform(s)) is not None
-        ] or fs_platforms
-        platform_list = sorted(platform_list)
-
-        if len(platform_list) == 0:
-            log.warning(
-                emoji.emojize(
-                    f"{hl(':warning:', color=LIGHTYELLOW)}  No platforms found, verify that the folder structure is right and the volume is mounted correctly. \
-                Check https://github.com/rommapp/romm?tab=readme-ov-file#folder-structure for more details."
+    with hashing_engine.in_use():
+        try:
+            platform_list = [
+                platform.fs_slug
+                for s in platform_ids
+                if (platform := db_platform_handler.get_platform(s)) is not None
+            ] or fs_platforms
+            platform_list = sorted(platform_list)
+
+            if len(platform_list) == 0:
+                log.warning(
+                    emoji.emojize(
+                        f"{hl(':warning:', color=LIGHTYELLOW)}  No platforms found, verify that the folder structure is right and the volume is mounted correctly. \
+                    Check https://github.com/rommapp/romm?tab=readme-ov-file#folder-structure for more details."
+                    )
                 )
+            else:
+                log.info(
+                    f"Found {hl(str(len(platform_list)))} platforms in the file system"
+                )
+
+            if SCAN_DISTRIBUTED_ENABLED and platform_list and get_current_job():
+                # Let every worker pick up platforms, the last job completes the scan
+                _enqueue_platform_scans(
+                    platform_list=platform_list,
+                    scan_type=scan_type,
+                    fs_platforms=fs_platforms,
+                    roms_ids=roms_ids,
+                    metadata_sources=metadata_sources,
+                    checkpoint=checkpoint,
+                    started_at=started_at,
+                )
+                log.info(f"Scan split into {hl(str(len(platform_list)))} platform jobs")
+                return
+
+            for platform_slug in platform_list:
+                scan_stats += await _identify_platform(
+                    platform_slug=platform_slug,
+                    scan_type=scan_type,
+                    fs_platforms=fs_platforms,
+                    roms_ids=roms_ids,
+                    metadata_sources=metadata_sources,
+                    socket_manager=sm,
+                    checkpoint=checkpoint,
+                )
+
+            _mark_missing_platforms(fs_platforms)
+            checkpoint.clear()
+
+            log.info(emoji.emojize(":check_mark:  Scan completed "))
+            _log_scan_summary(
+                scan_stats,
+                hashing_engine.stats - hashing_stats,
+                _rate_limit_waits_since(waits_before_scan),
             )
-        else:
-            log.info(
-                f"Found {hl(str(len(platform_list)))} platforms in the file system"
-            )
+            await sm.emit("scan:done", scan_stats.__dict__)
+        except ScanStoppedException:
+            await stop_scan()
+            return
+        except Exception as e:
+            log.error(f"Error in scan_platform: {e}")
+            # Catch all exceptions and emit error to the client
+            await sm.emit("scan:done_ko", str(e))
+            # Re-raise the exception to be caught by the error handler
+            raise e
 
-        for platform_slug in platform_list:
-            scan_stats += await _identify_platform(
-                platform_slug=platform_slug,
-                scan_type=scan_type,
-                fs_platforms=fs_platforms,
-                roms_ids=roms_ids,
+
+@initialize_context()
+async def scan_rom_changes(
+    platform_id: int,
+    fs_names: list[str],
+    renamed_fs_names: dict[str, str],
+    metadata_sources: list[str],
+):
+    """Scan only the roms of a platform that changed on the filesystem
+
+    New roms are identified as in a quick scan, modified roms are rehashed, renamed
+    roms keep their database entry and the ones that are gone are marked as missing.
+
+    Args:
+        platform_id (int): Platform the changed roms belong to
+        fs_names (list[str]): Filesystem names of the created, modified or deleted roms
+        renamed_fs_names (dict[str, str]): Previous filesystem names of renamed roms, mapped to the new ones
+        metadata_sources (list[str]): List of metadata sources to be used
+    """
+
+    sm = _get_socket_manager()
+
+    platform = db_platform_handler.get_platform(platform_id)
+    if not platform:
+        log.warning(f"Platform {platform_id} not found, skipping changed roms")
+        return
+
+    changed_fs_names = {*fs_names, *renamed_fs_names, *renamed_fs_names.values()}
+    log.info(
+        f"Scanning {hl(str(len(changed_fs_names)))} changed roms in {hl(platform.fs_slug)}"
+    )
+
+    try:
+        fs_roms = {
+            fs_rom["fs_name"]: fs_rom
+            for fs_rom in await fs_rom_handler.get_roms(platform)
+            if fs_rom["fs_name"] in changed_fs_names
+        }
+    except RomsNotFoundException as e:
+        log.error(e)
+        return
+
+    rom_by_filename_map = db_rom_handler.get_roms_by_fs_name(
+        platform_id=platform.id, fs_names=changed_fs_names
+    )
+
+    # Pair renamed roms with their previous entry, so the scan only updates the name
+    for old_fs_name, new_fs_name in renamed_fs_names.items():
+        if (
+            old_fs_name in rom_by_filename_map
+            and old_fs_name not in fs_roms
+            and new_fs_name in fs_roms
+            and new_fs_name not in rom_by_filename_map
+        ):
+            rom_by_filename_map[new_fs_name] = rom_by_filename_map.pop(old_fs_name)
+
+    scan_stats = ScanStats()
+    with fs_rom_handler.hashing_engine.in_use():
+        for fs_name, fs_rom in sorted(fs_roms.items()):
+            rom = rom_by_filename_map.get(fs_name)
+            # A rom modified in place may hold a different dump, so rehash it
+            modified = rom is not None and fs_name in fs_names
+            scan_stats += await _identify_rom(
+                platform=platform,
+                fs_rom=fs_rom,
+                rom=rom,
+                scan_type=ScanType.HASHES if modified else ScanType.QUICK,
+                roms_ids=[str(rom.id)] if rom and modified else [],
                 metadata_sources=metadata_sources,
                 socket_manager=sm,
             )
 
-        missed_platforms = db_platform_handler.mark_missing_platforms(fs_platforms)
-        if len(missed_platforms) > 0:
-            log.warning(f"{hl('Missing')} platforms from filesystem:")
-            for p in missed_platforms:
-                log.warning(f" - {p.slug}")
+    for fs_name, rom in rom_by_filename_map.items():
+        if fs_name not in fs_roms and not rom.missing_from_fs:
+            log.warning(f"{hl('Missing')} rom from filesystem: {fs_name}")
+            db_rom_handler.update_rom(rom.id, {"missing_from_fs": True})
 
-        log.info(emoji.emojize(":check_mark:  Scan completed "))
-        await sm.emit("scan:done", scan_stats.__dict__)
-    except ScanStoppedException:
-        await stop_scan()
-        return
-    except Exception as e:
-        log.error(f"Error in scan_platform: {e}")
-        # Catch all exceptions and emit error to the client
-        await sm.emit("scan:done_ko", str(e))
-        # Re-raise the exception to be caught by the error handler
-        raise e
+    await sm.emit("scan:done", scan_stats.__dict__)
 
 
 @socket_handler.socket_server.on("scan")  # type: ignore
@@ -531,6 +1174,7 @@ async def scan_handler(_sid: str, options: dict[str, Any]):
     scan_type = ScanType[options.get("type", "quick").upper()]
     roms_ids = options.get("roms_ids", [])
     metadata_sources = options.get("apis", [])
+    resume = options.get("resume", False)
 
     if DEV_MODE:
         return await scan_platforms(
@@ -538,6 +1182,7 @@ async def scan_handler(_sid: str, options: dict[str, Any]):
             scan_type=scan_type,
             roms_ids=roms_ids,
             metadata_sources=metadata_sources,
+            resume=resume,
         )
 
     return high_prio_queue.enqueue(
@@ -546,6 +1191,7 @@ async def scan_handler(_sid: str, options: dict[str, Any]):
         scan_type,
         roms_ids,
         metadata_sources,
+        resume,
         job_timeout=SCAN_TIMEOUT,  # Timeout (default of 4 hours)
     )
 
@@ -561,6 +1207,12 @@ async def stop_scan_handler(_sid: str):
         redis_client.set(STOP_SCAN_FLAG, 1)
         log.info(emoji.emojize(":stop_button: Job found, stopping scan..."))
 
+    async def stop_platform_jobs():
+        # A cancelled platform job would keep the job completing the scan from
+        # running, so they all end on the flag instead
+        redis_client.set(STOP_SCAN_FLAG, 1)
+        log.info(emoji.emojize(":stop_button: Platform jobs found, stopping scan..."))
+
     existing_jobs = high_prio_queue.get_jobs()
     for job in existing_jobs:
         if job.func_name == "scan_platform" and job.is_started:
@@ -569,11 +1221,12 @@ async def stop_scan_handler(_sid: str):
     workers = Worker.all(connection=redis_client)
     for worker in workers:
         current_job = worker.get_current_job()
-        if (
-            current_job
-            and current_job.func_name == "endpoints.sockets.scan.scan_platforms"
-            and current_job.is_started
-        ):
+        if not current_job or not current_job.is_started:
+            continue
+
+        if current_job.func_name == "endpoints.sockets.scan.scan_platform_job":
+            return await stop_platform_jobs()
+        if current_job.func_name == "endpoints.sockets.scan.scan_platforms":
             return await cancel_job(current_job)
 
     log.info(emoji.emojize(":stop_button: No running scan to stop"))
@@ -1,9 +1,28 @@
-from unittest.mock import Mock
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
 
 import pytest
-from endpoints.sockets.scan import ScanStats, _should_scan_rom
-from handler.scan_handler import ScanType
-from models.rom import Rom
+from endpoints.sockets.scan import (
+    STOP_SCAN_FLAG,
+    ScanCheckpoint,
+    ScanStats,
+    _enqueue_platform_scans,
+    _flush_roms,
+    _identify_platform,
+    _identify_rom,
+    _should_scan_rom,
+    finish_platform_scans,
+    scan_platform_job,
+    scan_rom_changes,
+    stop_scan_handler,
+)
+from handler.database import db_rom_handler
+from handler.database.roms_handler import RomsBulkWriter
+from handler.filesystem.roms_handler import FSRom
+from handler.scan_handler import MetadataSource, ScanType
+from models.platform import Platform
+from models.rom import Rom, RomFile
+from rq.job import Job, JobStatus
 
 
 def test_scan_stats():
@@ -245,3 +264,446 @@ class TestShouldScanRom:
 
         result = _should_scan_rom(scan_type, rom, roms_ids)
         assert result is expected
+
+
+def test_scan_checkpoint():
+    checkpoint = ScanCheckpoint.for_scan(
+        ScanType.COMPLETE, [2, 1], [], [MetadataSource.SS, MetadataSource.IGDB]
+    )
+    # The same scan request always maps to the same checkpoint
+    assert (
+        checkpoint.key
+        == ScanCheckpoint.for_scan(
+            ScanType.COMPLETE, [1, 2], [], [MetadataSource.IGDB, MetadataSource.SS]
+        ).key
+    )
+    assert (
+        checkpoint.key
+        != ScanCheckpoint.for_scan(ScanType.HASHES, [1, 2], [], [MetadataSource.SS]).key
+    )
+
+    checkpoint.rom_done("n64", "Paper Mario (USA).z64")
+    assert checkpoint.last_rom("n64") == "Paper Mario (USA).z64"
+    assert not checkpoint.is_platform_done("n64")
+
+    checkpoint.platform_done("n64")
+    assert checkpoint.is_platform_done("n64")
+    assert checkpoint.last_rom("n64") is None
+
+    checkpoint.clear()
+    assert not checkpoint.is_platform_done("n64")
+
+
+def _fs_rom(fs_name: str) -> FSRom:
+    return FSRom(
+        multi=False,
+        fs_name=fs_name,
+        files=[],
+        crc_hash="",
+        md5_hash="",
+        sha1_hash="",
+        ra_hash="",
+    )
+
+
+@patch("endpoints.sockets.scan._get_socket_manager")
+@patch("endpoints.sockets.scan._identify_rom", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.fs_rom_handler.get_roms", new_callable=AsyncMock)
+async def test_scan_rom_changes(
+    get_roms_mock,
+    identify_rom_mock,
+    get_socket_manager_mock,
+    platform: Platform,
+    rom: Rom,
+):
+    get_socket_manager_mock.return_value.emit = AsyncMock()
+    identify_rom_mock.return_value = ScanStats()
+    deleted_rom = db_rom_handler.add_rom(
+        Rom(
+            platform_id=platform.id,
+            name="deleted_rom",
+            fs_name="deleted_rom.zip",
+            fs_name_no_tags="deleted_rom",
+            fs_name_no_ext="deleted_rom",
+            fs_extension="zip",
+            fs_path=f"{platform.slug}/roms",
+        )
+    )
+    modified_rom = db_rom_handler.add_rom(
+        Rom(
+            platform_id=platform.id,
+            name="modified_rom",
+            fs_name="modified_rom.zip",
+            fs_name_no_tags="modified_rom",
+            fs_name_no_ext="modified_rom",
+            fs_extension="zip",
+            fs_path=f"{platform.slug}/roms",
+        )
+    )
+    get_roms_mock.return_value = [
+        _fs_rom("added_rom.zip"),
+        _fs_rom("modified_rom.zip"),
+        _fs_rom("renamed_rom.zip"),
+        _fs_rom("unchanged_rom.zip"),
+    ]
+
+    await scan_rom_changes(
+        platform.id,
+        ["added_rom.zip", "deleted_rom.zip", "modified_rom.zip"],
+        {rom.fs_name: "renamed_rom.zip"},
+        [MetadataSource.IGDB],
+    )
+
+    scanned = {
+        call.kwargs["fs_rom"]["fs_name"]: call.kwargs
+        for call in identify_rom_mock.call_args_list
+    }
+    assert scanned.keys() == {"added_rom.zip", "modified_rom.zip", "renamed_rom.zip"}
+    assert scanned["added_rom.zip"]["rom"] is None
+    assert scanned["added_rom.zip"]["scan_type"] == ScanType.QUICK
+    assert scanned["modified_rom.zip"]["rom"].id == modified_rom.id
+    assert scanned["modified_rom.zip"]["scan_type"] == ScanType.HASHES
+    assert scanned["modified_rom.zip"]["roms_ids"] == [str(modified_rom.id)]
+    assert scanned["renamed_rom.zip"]["rom"].id == rom.id
+    assert scanned["renamed_rom.zip"]["scan_type"] == ScanType.QUICK
+
+    deleted_rom = db_rom_handler.get_rom(deleted_rom.id)
+    assert deleted_rom.missing_from_fs
+    assert not db_rom_handler.get_rom(rom.id).missing_from_fs
+
+
+@patch("endpoints.sockets.scan.SCAN_BULK_WRITES_ENABLED", False)
+@patch("endpoints.sockets.scan.SCAN_PIPELINE_ENABLED", True)
+@patch("endpoints.sockets.scan.redis_client")
+@patch("endpoints.sockets.scan.fs_resource_handler")
+@patch("endpoints.sockets.scan.scan_rom", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.scan_platform", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.fs_rom_handler.get_rom_files", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.fs_rom_handler.get_roms", new_callable=AsyncMock)
+@patch(
+    "endpoints.sockets.scan.fs_firmware_handler.get_firmware", new_callable=AsyncMock
+)
+async def test_identify_platform_pipeline(
+    get_firmware_mock,
+    get_roms_mock,
+    get_rom_files_mock,
+    scan_platform_mock,
+    scan_rom_mock,
+    fs_resource_handler_mock,
+    redis_client_mock,
+    platform: Platform,
+):
+    redis_client_mock.get.return_value = None
+    get_firmware_mock.return_value = []
+    fs_names = ["a_rom.zip", "b_rom.zip", "c_rom.zip", "d_rom.zip"]
+    get_roms_mock.return_value = [_fs_rom(fs_name) for fs_name in fs_names]
+    get_rom_files_mock.return_value = ([], "", "", "", "")
+    scan_platform_mock.return_value = Platform(
+        name=platform.name, slug=platform.slug, fs_slug=platform.fs_slug
+    )
+    fs_resource_handler_mock.get_cover = AsyncMock(return_value=("small", "large"))
+    fs_resource_handler_mock.get_manual = AsyncMock(return_value="")
+    fs_resource_handler_mock.get_rom_screenshots = AsyncMock(return_value=[])
+    socket_manager = Mock(emit=AsyncMock())
+    checkpoint = Mock(spec=ScanCheckpoint)
+    checkpoint.is_platform_done.return_value = False
+    checkpoint.last_rom.return_value = None
+
+    metadata_order = []
+    lookups_done = {fs_name: asyncio.Event() for fs_name in fs_names}
+
+    async def scan_rom(rom: Rom, **kwargs) -> Rom:
+        # Each lookup waits for the next rom's one, so they finish in reverse order
+        index = fs_names.index(rom.fs_name)
+        if index + 1 < len(fs_names):
+            await lookups_done[fs_names[index + 1]].wait()
+        metadata_order.append(rom.fs_name)
+        lookups_done[rom.fs_name].set()
+        return Rom(
+            id=rom.id,
+            platform_id=platform.id,
+            name=f"Scanned {rom.fs_name}",
+            fs_name=rom.fs_name,
+            igdb_id=None if rom.fs_name == "d_rom.zip" else 1,
+        )
+
+    scan_rom_mock.side_effect = scan_rom
+
+    with patch.object(
+        db_rom_handler, "add_rom", wraps=db_rom_handler.add_rom
+    ) as add_rom_mock:
+        scan_stats = await _identify_platform(
+            platform_slug=platform.fs_slug,
+            scan_type=ScanType.COMPLETE,
+            fs_platforms=[platform.fs_slug],
+            roms_ids=[],
+            metadata_sources=[MetadataSource.IGDB],
+            socket_manager=socket_manager,
+            checkpoint=checkpoint,
+        )
+
+    # Lookups ran concurrently, and finished out of order
+    assert metadata_order == fs_names[::-1]
+
+    assert scan_stats.scanned_platforms == 1
+    assert scan_stats.added_platforms == 0
+    assert scan_stats.scanned_roms == 4
+    assert scan_stats.added_roms == 4
+    assert scan_stats.metadata_roms == 3
+
+    # Database writes, socket events and checkpoints still follow filesystem order
+    add_rom_calls = [call.args[0] for call in add_rom_mock.call_args_list]
+    assert [r.fs_name for r in add_rom_calls if r.id is None] == fs_names
+    assert [r.fs_name for r in add_rom_calls if r.id is not None] == fs_names
+    emitted_roms = [
+        call.args[1]["fs_name"]
+        for call in socket_manager.emit.call_args_list
+        if call.args[0] == "scan:scanning_rom"
+    ]
+    assert emitted_roms == fs_names
+    assert [call.args for call in checkpoint.rom_done.call_args_list] == [
+        (platform.fs_slug, fs_name) for fs_name in fs_names
+    ]
+    checkpoint.platform_done.assert_called_once_with(platform.fs_slug)
+
+    stored_roms = db_rom_handler.get_roms_by_fs_name(
+        platform_id=platform.id, fs_names=set(fs_names)
+    )
+    assert {r.name for r in stored_roms.values()} == {
+        f"Scanned {fs_name}" for fs_name in fs_names
+    }
+
+
+@patch("endpoints.sockets.scan.redis_client")
+@patch("endpoints.sockets.scan.fs_resource_handler")
+@patch("endpoints.sockets.scan.scan_rom", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.fs_rom_handler.get_rom_files", new_callable=AsyncMock)
+async def test_identify_rom_bulk_writer(
+    get_rom_files_mock,
+    scan_rom_mock,
+    fs_resource_handler_mock,
+    redis_client_mock,
+    platform: Platform,
+    rom: Rom,
+):
+    redis_client_mock.get.return_value = None
+    rom_file = RomFile(
+        file_name=rom.fs_name,
+        file_path=rom.fs_path,
+        file_size_bytes=1024,
+        last_modified=1700000000.0,
+    )
+    get_rom_files_mock.return_value = ([rom_file], "crc", "md5", "sha1", "ra")
+    scan_rom_mock.return_value = Rom(
+        id=rom.id,
+        platform_id=platform.id,
+        name="Scanned Rom",
+        fs_name=rom.fs_name,
+        md5_hash="md5",
+        igdb_id=1,
+        igdb_metadata={"genres": ["Platform"]},
+    )
+    fs_resource_handler_mock.get_cover = AsyncMock(return_value=("small", "large"))
+    fs_resource_handler_mock.get_manual = AsyncMock(return_value="")
+    fs_resource_handler_mock.get_rom_screenshots = AsyncMock(return_value=[])
+    socket_manager = Mock(emit=AsyncMock())
+    bulk_writer = RomsBulkWriter(db_rom_handler, batch_size=10)
+    checkpoint = ScanCheckpoint("test_identify_rom_bulk_writer")
+
+    await _identify_rom(
+        platform=platform,
+        fs_rom=_fs_rom(rom.fs_name),
+        rom=rom,
+        scan_type=ScanType.COMPLETE,
+        roms_ids=[],
+        metadata_sources=[MetadataSource.IGDB],
+        socket_manager=socket_manager,
+        bulk_writer=bulk_writer,
+        checkpoint=checkpoint,
+    )
+
+    # The rom is only written and announced once the batch is flushed
+    socket_manager.emit.assert_not_called()
+    assert db_rom_handler.get_rom(rom.id).name != "Scanned Rom"
+    assert checkpoint.last_rom(platform.fs_slug) is None
+
+    await _flush_roms(bulk_writer, platform, socket_manager, checkpoint)
+    assert checkpoint.last_rom(platform.fs_slug) == rom.fs_name
+    checkpoint.clear()
+
+    emitted_rom = socket_manager.emit.call_args_list[0].args[1]
+    assert emitted_rom["name"] == "Scanned Rom"
+    assert emitted_rom["fs_size_bytes"] == 1024
+
+    stored_rom = db_rom_handler.get_rom(rom.id)
+    assert stored_rom.name == "Scanned Rom"
+    assert stored_rom.fs_path == rom.fs_path
+    assert stored_rom.path_cover_s == "small"
+    assert [f.file_size_bytes for f in stored_rom.files] == [1024]
+    assert stored_rom.metadatum.genres == ["Platform"]
+
+
+@patch("endpoints.sockets.scan.SCAN_BULK_WRITES_ENABLED", True)
+@patch("endpoints.sockets.scan.SCAN_PIPELINE_ENABLED", False)
+@patch("endpoints.sockets.scan.redis_client")
+@patch("endpoints.sockets.scan.fs_resource_handler")
+@patch("endpoints.sockets.scan.scan_rom", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.scan_platform", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.fs_rom_handler.get_rom_files", new_callable=AsyncMock)
+@patch("endpoints.sockets.scan.fs_rom_handler.get_roms", new_callable=AsyncMock)
+@patch(
+    "endpoints.sockets.scan.fs_firmware_handler.get_firmware", new_callable=AsyncMock
+)
+async def test_identify_platform_bulk_writer_error(
+    get_firmware_mock,
+    get_roms_mock,
+    get_rom_files_mock,
+    scan_platform_mock,
+    scan_rom_mock,
+    fs_resource_handler_mock,
+    redis_client_mock,
+    platform: Platform,
+):
+    redis_client_mock.get.return_value = None
+    get_firmware_mock.return_value = []
+    fs_names = ["a_rom.zip", "b_rom.zip", "c_rom.zip"]
+    get_roms_mock.return_value = [_fs_rom(fs_name) for fs_name in fs_names]
+    get_rom_files_mock.return_value = ([], "", "", "", "")
+    scan_platform_mock.return_value = Platform(
+        name=platform.name, slug=platform.slug, fs_slug=platform.fs_slug
+    )
+    fs_resource_handler_mock.get_cover = AsyncMock(return_value=("small", "large"))
+    fs_resource_handler_mock.get_manual = AsyncMock(return_value="")
+    fs_resource_handler_mock.get_rom_screenshots = AsyncMock(return_value=[])
+    socket_manager = Mock(emit=AsyncMock())
+    checkpoint = Mock(spec=ScanCheckpoint)
+    checkpoint.is_platform_done.return_value = False
+    checkpoint.last_rom.return_value = None
+
+    async def scan_rom(rom: Rom, **kwargs) -> Rom:
+        if rom.fs_name == "c_rom.zip":
+            raise TimeoutError()
+        return Rom(
+            id=rom.id,
+            platform_id=platform.id,
+            name=f"Scanned {rom.fs_name}",
+            fs_name=rom.fs_name,
+        )
+
+    scan_rom_mock.side_effect = scan_rom
+
+    with pytest.raises(TimeoutError):
+        await _identify_platform(
+            platform_slug=platform.fs_slug,
+            scan_type=ScanType.QUICK,
+            fs_platforms=[platform.fs_slug],
+            roms_ids=[],
+            metadata_sources=[MetadataSource.IGDB],
+            socket_manager=socket_manager,
+            checkpoint=checkpoint,
+        )
+
+    # The roms scanned before the error are written, and the one in flight is
+    # removed so that the next quick scan adds it again
+    stored_roms = db_rom_handler.get_roms_by_fs_name(
+        platform_id=platform.id, fs_names=set(fs_names)
+    )
+    assert {fs_name: r.name for fs_name, r in stored_roms.items()} == {
+        "a_rom.zip": "Scanned a_rom.zip",
+        "b_rom.zip": "Scanned b_rom.zip",
+    }
+    checkpoint.rom_done.assert_called_once_with(platform.fs_slug, "b_rom.zip")
+    checkpoint.platform_done.assert_not_called()
+
+
+@patch("endpoints.sockets.scan.high_prio_queue")
+def test_enqueue_platform_scans(queue_mock):
+    queue_mock.enqueue.side_effect = [
+        Mock(spec=Job, id="gb-job"),
+        Mock(spec=Job, id="snes-job"),
+        Mock(spec=Job, id="finish-job"),
+    ]
+
+    finish_job = _enqueue_platform_scans(
+        platform_list=["gb", "snes"],
+        scan_type=ScanType.QUICK,
+        fs_platforms=["gb", "snes"],
+        roms_ids=[],
+        metadata_sources=[MetadataSource.IGDB],
+        checkpoint=ScanCheckpoint("checkpoint"),
+        started_at=1000.0,
+    )
+
+    assert finish_job.id == "finish-job"
+    platform_calls = queue_mock.enqueue.call_args_list[:2]
+    assert [call.args[:2] for call in platform_calls] == [
+        (scan_platform_job, "gb"),
+        (scan_platform_job, "snes"),
+    ]
+
+    finish_call = queue_mock.enqueue.call_args_list[2]
+    assert finish_call.args == (
+        finish_platform_scans,
+        ["gb-job", "snes-job"],
+        ["gb", "snes"],
+        "checkpoint",
+        1000.0,
+    )
+    dependency = finish_call.kwargs["depends_on"]
+    assert [job.id for job in dependency.dependencies] == ["gb-job", "snes-job"]
+    assert dependency.allow_failure is True
+
+
+@patch("endpoints.sockets.scan.redis_client")
+@patch("endpoints.sockets.scan.db_platform_handler.mark_missing_platforms")
+@patch("endpoints.sockets.scan._get_socket_manager")
+@patch("endpoints.sockets.scan.Job.fetch_many")
+async def test_finish_platform_scans(
+    fetch_many_mock,
+    get_socket_manager_mock,
+    mark_missing_platforms_mock,
+    redis_client_mock,
+):
+    redis_client_mock.get.return_value = None
+    get_socket_manager_mock.return_value.emit = AsyncMock()
+    mark_missing_platforms_mock.return_value = []
+    finished_job = Mock(spec=Job, id="gb-job", is_finished=True)
+    finished_job.return_value.return_value = {
+        "scan_stats": ScanStats(scanned_platforms=1, scanned_roms=3).__dict__,
+        "hashing_stats": {"roms": 3, "files": 4, "bytes": 1024, "cached_roms": 0},
+        "rate_limit_waits": {"igdb": 2.5},
+    }
+    failed_job = Mock(spec=Job, id="snes-job", is_finished=False)
+    failed_job.get_status.return_value = JobStatus.FAILED
+    fetch_many_mock.return_value = [finished_job, failed_job, None]
+
+    await finish_platform_scans(["gb-job", "snes-job", "gone-job"], ["gb", "snes"])
+
+    mark_missing_platforms_mock.assert_called_once_with(["gb", "snes"])
+    finished_job.delete.assert_called_once()
+    failed_job.delete.assert_not_called()
+    event, stats = get_socket_manager_mock.return_value.emit.call_args.args
+    assert event == "scan:done"
+    assert stats["scanned_platforms"] == 1
+    assert stats["scanned_roms"] == 3
+
+
+@patch("endpoints.sockets.scan.Worker.all")
+@patch("endpoints.sockets.scan.high_prio_queue")
+@patch("endpoints.sockets.scan.redis_client")
+async def test_stop_scan_handler_split_scan(
+    redis_client_mock, queue_mock, workers_mock
+):
+    queue_mock.get_jobs.return_value = []
+    platform_job = Mock(
+        spec=Job,
+        func_name="endpoints.sockets.scan.scan_platform_job",
+        is_started=True,
+    )
+    workers_mock.return_value = [Mock(get_current_job=Mock(return_value=platform_job))]
+
+    await stop_scan_handler("sid")
+
+    # Platform jobs end on the flag, so that the scan still completes
+    platform_job.cancel.assert_not_called()
+    redis_client_mock.set.assert_called_once_with(STOP_SCAN_FLAG, 1)
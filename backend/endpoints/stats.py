@@ -16,11 +16,12 @@ def stats() -> StatsReturn:
         dict: Dictionary with all the stats
     """
 
-    return {
-        "PLATFORMS": db_stats_handler.get_platforms_count(),
-        "ROMS": db_stats_handler.get_roms_count(),
-        "SAVES": db_stats_handler.get_saves_count(),
-        "STATES": db_stats_handler.get_states_count(),
-        "SCREENSHOTS": db_stats_handler.get_screenshots_count(),
-        "TOTAL_FILESIZE_BYTES": db_stats_handler.get_total_filesize(),
-    }
+    stats = db_stats_handler.get_library_stats()
+    return StatsReturn(
+        PLATFORMS=stats["PLATFORMS"],
+        ROMS=stats["ROMS"],
+        SAVES=stats["SAVES"],
+        STATES=stats["STATES"],
+        SCREENSHOTS=stats["SCREENSHOTS"],
+        TOTAL_FILESIZE_BYTES=stats["TOTAL_FILESIZE_BYTES"],
+    )
@@ -2,6 +2,7 @@ from decorators.auth import protected_route
 from endpoints.responses import MessageResponse
 from fastapi import Request
 from handler.auth.constants import Scope
+from tasks.reconcile_library_stats import reconcile_library_stats_task
 from tasks.update_launchbox_metadata import update_launchbox_metadata_task
 from tasks.update_switch_titledb import update_switch_titledb_task
 from utils.router import APIRouter
@@ -24,6 +25,7 @@ async def run_tasks(request: Request) -> MessageResponse:
 
     await update_switch_titledb_task.run()
     await update_launchbox_metadata_task.run()
+    await reconcile_library_stats_task.run()
     return {"msg": "All tasks ran successfully!"}
 
 
@@ -40,6 +42,7 @@ async def run_task(request: Request, task: str) -> MessageResponse:
     tasks = {
         "switch_titledb": update_switch_titledb_task,
         "launchbox_metadata": update_launchbox_metadata_task,
+        "library_stats": reconcile_library_stats_task,
     }
 
     await tasks[task].run()
@@ -0,0 +1,57 @@
+from unittest.mock import Mock, patch
+
+import pytest
+from fastapi.testclient import TestClient
+from handler.redis_handler import sync_cache
+from main import app
+from utils.metrics import METRICS_KEY
+
+
+@pytest.fixture
+def client():
+    with TestClient(app) as client:
+        yield client
+    sync_cache.delete(METRICS_KEY)
+
+
+def test_metrics_disabled(client, access_token):
+    response = client.get(
+        "/api/metrics", headers={"Authorization": f"Bearer {access_token}"}
+    )
+    assert response.status_code == 404
+
+
+def test_metrics_unauthenticated(client):
+    with patch("endpoints.metrics.METRICS_ENABLED", True):
+        response = client.get("/api/metrics")
+    assert response.status_code == 403
+
+
+def test_metrics(client, access_token):
+    queue = Mock()
+    queue.name = "high"
+    queue.__len__ = Mock(return_value=2)
+    queue.started_job_registry.count = 1
+
+    with (
+        patch("endpoints.metrics.high_prio_queue", queue),
+        patch("endpoints.metrics.default_queue", queue),
+        patch("endpoints.metrics.low_prio_queue", queue),
+        patch("endpoints.metrics.METRICS_ENABLED", True),
+        patch("utils.metrics.METRICS_ENABLED", True),
+    ):
+        client.get("/api/heartbeat")
+        response = client.get(
+            "/api/metrics", headers={"Authorization": f"Bearer {access_token}"}
+        )
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    # Requests are labeled by route template, not by path
+    assert any(
+        line.startswith("romm_http_request_duration_seconds_count{")
+        and 'heartbeat",status="200"} 1' in line
+        for line in response.text.splitlines()
+    )
+    assert 'romm_rq_queue_jobs{queue="high",state="queued"} 2' in response.text
+    assert 'romm_rq_queue_jobs{queue="high",state="started"} 1' in response.text
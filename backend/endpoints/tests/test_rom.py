@@ -2,9 +2,11 @@ from unittest.mock import patch
 
 import pytest
 from fastapi.testclient import TestClient
+from handler.database import db_rom_handler
 from handler.filesystem.roms_handler import FSRomsHandler
 from handler.metadata.igdb_handler import IGDBHandler, IGDBRom
 from main import app
+from models.rom import Rom
 
 
 @pytest.fixture
@@ -43,6 +45,188 @@ def test_get_all_roms(client, access_token, rom, platform):
     assert items[0]["id"] == rom.id
 
 
+@pytest.mark.parametrize(
+    "order_by, order_dir",
+    [("name", "asc"), ("created_at", "desc"), ("fs_size_bytes", "asc")],
+)
+def test_get_all_roms_keyset(client, access_token, rom, platform, order_by, order_dir):
+    for index, name in enumerate(["b_rom", "a_rom", "b_rom", "c_rom", "a_rom"]):
+        db_rom_handler.add_rom(
+            Rom(
+                platform_id=platform.id,
+                name=name,
+                slug=f"{name}_slug",
+                fs_name=f"{name}_{index}.zip",
+                fs_name_no_tags=name,
+                fs_name_no_ext=f"{name}_{index}",
+                fs_extension="zip",
+                fs_path=f"{platform.slug}/roms",
+            )
+        )
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    params = {"platform_id": platform.id, "order_by": order_by, "order_dir": order_dir}
+
+    response = client.get("/api/roms", headers=headers, params=params)
+    expected_ids = [item["id"] for item in response.json()["items"]]
+
+    ids = []
+    cursor = ""
+    while cursor is not None:
+        response = client.get(
+            "/api/roms",
+            headers=headers,
+            params={**params, "limit": 2, "cursor": cursor},
+        )
+        assert response.status_code == 200
+
+        body = response.json()
+        assert body["total"] == 6
+        assert len(body["items"]) <= 2
+
+        ids.extend(item["id"] for item in body["items"])
+        cursor = body["next_cursor"]
+
+    assert len(ids) == 6
+    assert sorted(ids) == sorted(expected_ids)
+    if order_by == "name":
+        names = [db_rom_handler.get_rom(id).name for id in ids]
+        assert names == sorted(names)
+
+
+def test_get_all_roms_keyset_total(client, access_token, rom, platform):
+    def add_rom(name: str) -> None:
+        db_rom_handler.add_rom(
+            Rom(
+                platform_id=platform.id,
+                name=name,
+                slug=f"{name}_slug",
+                fs_name=f"{name}.zip",
+                fs_name_no_tags=name,
+                fs_name_no_ext=name,
+                fs_extension="zip",
+                fs_path=f"{platform.slug}/roms",
+            )
+        )
+
+    headers = {"Authorization": f"Bearer {access_token}"}
+    params = {"platform_id": platform.id, "limit": 1}
+    add_rom("y_rom")
+
+    first_page = client.get(
+        "/api/roms", headers=headers, params={**params, "cursor": ""}
+    ).json()
+    assert first_page["total"] == 2
+
+    # Later pages keep the total counted for the first one
+    add_rom("z_rom")
+    next_page = client.get(
+        "/api/roms",
+        headers=headers,
+        params={**params, "cursor": first_page["next_cursor"]},
+    ).json()
+    assert next_page["total"] == 2
+    assert len(next_page["items"]) == 1
+
+
+def test_get_all_roms_invalid_cursor(client, access_token, rom):
+    response = client.get(
+        "/api/roms",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={"cursor": "not-a-cursor"},
+    )
+    assert response.status_code == 400
+
+
+def test_get_all_roms_cursor_order_mismatch(client, access_token, rom, platform):
+    db_rom_handler.add_rom(
+        Rom(
+            platform_id=platform.id,
+            name="other_rom",
+            slug="other_rom_slug",
+            fs_name="other_rom.zip",
+            fs_name_no_tags="other_rom",
+            fs_name_no_ext="other_rom",
+            fs_extension="zip",
+            fs_path=f"{platform.slug}/roms",
+        )
+    )
+    headers = {"Authorization": f"Bearer {access_token}"}
+    params = {"platform_id": platform.id, "limit": 1}
+
+    first_page = client.get(
+        "/api/roms", headers=headers, params={**params, "cursor": ""}
+    ).json()
+    assert first_page["next_cursor"] is not None
+
+    for order in ({"order_dir": "desc"}, {"order_by": "fs_size_bytes"}):
+        response = client.get(
+            "/api/roms",
+            headers=headers,
+            params={**params, **order, "cursor": first_page["next_cursor"]},
+        )
+        assert response.status_code == 400
+
+
+def test_get_all_roms_fields(client, access_token, rom, platform):
+    response = client.get(
+        "/api/roms",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={
+            "platform_id": platform.id,
+            "fields": "id,name,path_cover_small,platform_display_name",
+        },
+    )
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["total"] == 1
+    assert body["char_index"] == {"t": 0}
+    assert body["items"] == [
+        {
+            "id": rom.id,
+            "name": rom.name,
+            "path_cover_small": "",
+            "platform_display_name": platform.name,
+        }
+    ]
+
+
+def test_get_all_roms_fields_keyset(client, access_token, rom, platform):
+    response = client.get(
+        "/api/roms",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={"fields": "name,full_path", "cursor": "", "limit": 1},
+    )
+    assert response.status_code == 200
+
+    body = response.json()
+    assert body["next_cursor"] is None
+    assert body["items"] == [{"name": rom.name, "full_path": rom.full_path}]
+
+
+def test_get_all_roms_schema():
+    operation = app.openapi()["paths"]["/api/roms"]["get"]
+
+    parameters = {parameter["name"] for parameter in operation["parameters"]}
+    assert {"limit", "offset", "fields", "cursor"} <= parameters
+
+    schema = operation["responses"]["200"]["content"]["application/json"]["schema"]
+    assert schema["anyOf"] == [
+        {"$ref": "#/components/schemas/CustomLimitOffsetPage_SimpleRomSchema_"},
+        {"$ref": "#/components/schemas/RomProjectionPage"},
+    ]
+
+
+def test_get_all_roms_unknown_fields(client, access_token, rom):
+    response = client.get(
+        "/api/roms",
+        headers={"Authorization": f"Bearer {access_token}"},
+        params={"fields": "id,igdb_metadata"},
+    )
+    assert response.status_code == 400
+
+
 @patch.object(FSRomsHandler, "rename_fs_rom")
 @patch.object(IGDBHandler, "get_rom_by_id", return_value=IGDBRom(igdb_id=None))
 def test_update_rom(rename_fs_rom_mock, get_rom_by_id_mock, client, access_token, rom):
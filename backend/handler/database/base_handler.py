@@ -1,15 +1,106 @@
+import os
+import sys
 import time
+from typing import Final
 
-from config import DEV_SQL_ECHO
+from config import (
+    DB_POOL_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_PRE_PING_IDLE_SECONDS,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DEV_SQL_ECHO,
+    METRICS_ENABLED,
+)
 from config.config_manager import ConfigManager
-from sqlalchemy import create_engine, event
+from logger.logger import log
+from sqlalchemy import create_engine, event, exc
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from utils.metrics import (
+    DB_POOL_CHECKOUT_TIMEOUTS,
+    DB_POOL_CHECKOUT_WAIT,
+    DB_QUERY_DURATION,
+)
+
+PROCESS_NAME: Final = os.path.splitext(os.path.basename(sys.argv[0]))[0]
+
+# Pool size and overflow of each process type. Gunicorn workers serve sync endpoints
+# from a thread pool, rq workers run scans with concurrent metadata lookups, and the
+# watcher and scheduler only run a few queries now and then.
+DEFAULT_POOL_SIZES: Final = {
+    "gunicorn": (10, 20),
+    "worker": (5, 10),
+    "watcher": (2, 3),
+    "scheduler": (2, 3),
+}
+DEFAULT_POOL_SIZE: Final = (5, 10)
+
+
+class MetricsQueuePool(QueuePool):
+    """Queue pool recording how long checkouts wait for a connection"""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            DB_POOL_CHECKOUT_TIMEOUTS.inc(process=PROCESS_NAME)
+            raise
+        finally:
+            DB_POOL_CHECKOUT_WAIT.observe(
+                time.perf_counter() - start, process=PROCESS_NAME
+            )
+
+
+default_pool_size, default_max_overflow = DEFAULT_POOL_SIZES.get(
+    PROCESS_NAME, DEFAULT_POOL_SIZE
+)
+pool_size = DB_POOL_SIZE or default_pool_size
+max_overflow = (
+    DB_POOL_MAX_OVERFLOW if DB_POOL_MAX_OVERFLOW is not None else default_max_overflow
+)
 
 sync_engine = create_engine(
-    ConfigManager.get_db_engine(), pool_pre_ping=True, echo=DEV_SQL_ECHO
+    ConfigManager.get_db_engine(),
+    poolclass=MetricsQueuePool,
+    pool_size=pool_size,
+    max_overflow=max_overflow,
+    pool_timeout=DB_POOL_TIMEOUT,
+    pool_recycle=DB_POOL_RECYCLE,
+    pool_pre_ping=DB_POOL_PRE_PING == "always",
+    echo=DEV_SQL_ECHO,
 )
 sync_session = sessionmaker(bind=sync_engine, expire_on_commit=False)
 
+log.debug(
+    f"Database pool of {pool_size} connections (+{max_overflow} overflow) "
+    f"in {PROCESS_NAME}"
+)
+
+if DB_POOL_PRE_PING == "idle":
+
+    @event.listens_for(sync_engine, "checkin")
+    def record_checkin_time(dbapi_connection, connection_record):
+        connection_record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(sync_engine, "checkout")
+    def ping_idle_connection(dbapi_connection, connection_record, connection_proxy):
+        # Connections in use moments ago are alive, so only ping the ones left idle
+        checked_in_at = connection_record.info.get("checked_in_at")
+        if (
+            checked_in_at is None
+            or time.monotonic() - checked_in_at < DB_POOL_PRE_PING_IDLE_SECONDS
+        ):
+            return
+
+        try:
+            sync_engine.dialect.do_ping(dbapi_connection)
+        except Exception as error:
+            # The pool discards the connection and checks out another one
+            raise exc.DisconnectionError() from error
+
 
 if DEV_SQL_ECHO:
 
@@ -27,4 +118,20 @@ if DEV_SQL_ECHO:
         print(f"Execution time: {total_time:.4f} seconds")
 
 
+if METRICS_ENABLED:
+
+    @event.listens_for(sync_engine, "before_cursor_execute")
+    def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+        context._metrics_start_time = time.perf_counter()
+
+    @event.listens_for(sync_engine, "after_cursor_execute")
+    def observe_query_duration(
+        conn, cursor, statement, parameters, context, executemany
+    ):
+        DB_QUERY_DURATION.observe(
+            time.perf_counter() - context._metrics_start_time,
+            statement=statement.lstrip().split(" ", 1)[0].lower(),
+        )
+
+
 class DBBaseHandler: ...
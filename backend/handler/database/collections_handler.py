@@ -2,12 +2,29 @@ from collections.abc import Sequence
 
 from decorators.database import begin_session
 from models.collection import Collection, CollectionRom, VirtualCollection
-from sqlalchemy import delete, insert, literal, or_, select, update
-from sqlalchemy.orm import Session
+from models.rom import Rom
+from sqlalchemy import Select, delete, insert, literal, or_, select, update
+from sqlalchemy.orm import Session, lazyload, load_only, selectinload
+from sqlalchemy.orm.strategy_options import _AbstractLoad
 
 from .base_handler import DBBaseHandler
 
 
+def load_collection_covers() -> _AbstractLoad:
+    """Load the covers shown for collections, from a few of their roms only"""
+    return selectinload(Collection.cover_roms).options(
+        load_only(Rom.id, Rom.path_cover_s, Rom.path_cover_l),
+        lazyload(Rom.platform),
+    )
+
+
+def collection_rom_ids_query(collection_id: int) -> Select[tuple[int]]:
+    """Ids of the roms in a collection, as a subquery on the association table"""
+    return select(CollectionRom.rom_id).where(
+        CollectionRom.collection_id == collection_id
+    )
+
+
 class DBCollectionsHandler(DBBaseHandler):
     @begin_session
     def add_collection(
@@ -16,11 +33,25 @@ class DBCollectionsHandler(DBBaseHandler):
         collection = session.merge(collection)
         session.flush()
 
-        return session.query(Collection).filter_by(id=collection.id).one()
+        return session.scalars(
+            select(Collection)
+            .options(load_collection_covers())
+            .filter_by(id=collection.id)
+            .execution_options(populate_existing=True)
+        ).one()
 
     @begin_session
     def get_collection(self, id: int, session: Session = None) -> Collection | None:
-        return session.scalar(select(Collection).filter_by(id=id).limit(1))
+        return session.scalar(
+            select(Collection)
+            .options(load_collection_covers())
+            .filter_by(id=id)
+            .limit(1)
+        )
+
+    @begin_session
+    def get_collection_rom_ids(self, id: int, session: Session = None) -> list[int]:
+        return list(session.scalars(collection_rom_ids_query(id)).all())
 
     @begin_session
     def get_virtual_collection(
@@ -36,13 +67,20 @@ class DBCollectionsHandler(DBBaseHandler):
         self, name: str, user_id: int, session: Session = None
     ) -> Collection | None:
         return session.scalar(
-            select(Collection).filter_by(name=name, user_id=user_id).limit(1)
+            select(Collection)
+            .options(load_collection_covers())
+            .filter_by(name=name, user_id=user_id)
+            .limit(1)
         )
 
     @begin_session
     def get_collections(self, session: Session = None) -> Sequence[Collection]:
         return (
-            session.scalars(select(Collection).order_by(Collection.name.asc()))
+            session.scalars(
+                select(Collection)
+                .options(load_collection_covers())
+                .order_by(Collection.name.asc())
+            )
             .unique()
             .all()
         )
@@ -92,7 +130,12 @@ class DBCollectionsHandler(DBBaseHandler):
                     ],
                 )
 
-        return session.query(Collection).filter_by(id=id).one()
+        return session.scalars(
+            select(Collection)
+            .options(load_collection_covers())
+            .filter_by(id=id)
+            .execution_options(populate_existing=True)
+        ).one()
 
     @begin_session
     def delete_collection(self, id: int, session: Session = None) -> None:
@@ -1,13 +1,15 @@
 import functools
 from collections.abc import Sequence
+from typing import cast
 
 from decorators.database import begin_session
 from models.platform import Platform
-from models.rom import Rom
-from sqlalchemy import delete, or_, select, update
+from models.rom import Rom, RomFile
+from sqlalchemy import CursorResult, delete, func, or_, select, update
 from sqlalchemy.orm import Query, Session, selectinload
 
 from .base_handler import DBBaseHandler
+from .stats_handler import invalidate_library_stats
 
 
 def with_firmware(func):
@@ -70,6 +72,7 @@ class DBPlatformsHandler(DBBaseHandler):
             .where(Platform.id == id)
             .execution_options(synchronize_session="evaluate")
         )
+        invalidate_library_stats(session)
 
     @begin_session
     def mark_missing_platforms(
@@ -106,3 +109,36 @@ class DBPlatformsHandler(DBBaseHandler):
             .execution_options(synchronize_session="fetch")
         )
         return missing_platforms
+
+    @begin_session
+    def reconcile_platforms_stats(self, session: Session = None) -> int:
+        """Recompute the rom count and size of platforms from their roms
+
+        Returns the number of platforms whose stored stats had drifted.
+        """
+        rom_count = (
+            select(func.count(Rom.id))
+            .where(Rom.platform_id == Platform.id)
+            .scalar_subquery()
+        )
+        fs_size_bytes = (
+            select(func.coalesce(func.sum(RomFile.file_size_bytes), 0))
+            .join(Rom, Rom.id == RomFile.rom_id)
+            .where(Rom.platform_id == Platform.id)
+            .scalar_subquery()
+        )
+        result = cast(
+            CursorResult,
+            session.execute(
+                update(Platform)
+                .where(
+                    or_(
+                        Platform.rom_count != rom_count,
+                        Platform.fs_size_bytes != fs_size_bytes,
+                    )
+                )
+                .values(rom_count=rom_count, fs_size_bytes=fs_size_bytes)
+                .execution_options(synchronize_session=False)
+            ),
+        )
+        return result.rowcount
@@ -1,32 +1,49 @@
 import functools
+import re
 from collections.abc import Iterable, Sequence
+from typing import Any
 
-from config import ROMM_DB_DRIVER
+from config import ROMM_DB_DRIVER, ROMM_SEARCH_MODE
 from decorators.database import begin_session
-from models.collection import Collection, VirtualCollection
+from models.collection import Collection, CollectionRom, VirtualCollection
 from models.platform import Platform
 from models.rom import Rom, RomFile, RomMetadata, RomUser
 from sqlalchemy import (
+    ColumnElement,
+    Delete,
+    Float,
     Integer,
     Row,
+    Select,
     String,
     Text,
     and_,
     case,
     cast,
     delete,
-    false,
     func,
     literal,
     not_,
     or_,
     select,
     text,
+    type_coerce,
     update,
 )
-from sqlalchemy.orm import InstrumentedAttribute, Query, Session, selectinload
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.inspection import inspect
+from sqlalchemy.orm import (
+    InstrumentedAttribute,
+    Query,
+    Session,
+    aliased,
+    selectinload,
+)
+from utils.database import upsert
 
 from .base_handler import DBBaseHandler
+from .collections_handler import collection_rom_ids_query, load_collection_covers
+from .stats_handler import invalidate_library_stats, record_library_stats_change
 
 EJS_SUPPORTED_PLATFORMS = [
     "3do",
@@ -114,7 +131,7 @@ def with_details(func):
             selectinload(Rom.sibling_roms),
             selectinload(Rom.metadatum),
             selectinload(Rom.files),
-            selectinload(Rom.collections),
+            selectinload(Rom.collections).options(load_collection_covers()),
         )
         return func(*args, **kwargs)
 
@@ -126,6 +143,7 @@ def with_simple(func):
     def wrapper(*args, **kwargs):
         kwargs["query"] = select(Rom).options(
             selectinload(Rom.rom_users),
+            selectinload(Rom.sibling_roms),
             selectinload(Rom.metadatum),
             selectinload(Rom.files),
         )
@@ -134,15 +152,403 @@ def with_simple(func):
     return wrapper
 
 
+# Columns that feed the roms_metadata table
+ROM_METADATA_SOURCE_COLUMNS = frozenset(
+    (
+        "name",
+        "fs_name",
+        "igdb_metadata",
+        "moby_metadata",
+        "ss_metadata",
+        "ra_metadata",
+        "launchbox_metadata",
+    )
+)
+
+NUMBER_PATTERN = re.compile(r"^[0-9]+(\.[0-9]+)?$")
+INTEGER_PATTERN = re.compile(r"^[0-9]+$")
+EMPTY_VALUES = ("null", "None", "0", "0.0")
+
+SEARCH_WORD_PATTERN = re.compile(r"\w+")
+# InnoDB doesn't index words shorter than innodb_ft_min_token_size
+FULLTEXT_MIN_WORD_LENGTH = 3
+
+
+def _first_metadata_list(rom: Rom, key: str, sources: Iterable[str]) -> list:
+    for source in sources:
+        value = (getattr(rom, source) or {}).get(key)
+        if value is not None:
+            return value
+    return []
+
+
+def _metadata_number(
+    metadata: dict | None, key: str, pattern: re.Pattern
+) -> float | None:
+    value = (metadata or {}).get(key)
+    if value is None or str(value) in EMPTY_VALUES or not pattern.match(str(value)):
+        return None
+    return float(value)
+
+
+def _scale(value: float | None, factor: int) -> float | None:
+    return value * factor if value is not None else None
+
+
+def build_rom_metadata(rom: Rom) -> RomMetadata:
+    """Compute the aggregated metadata of a rom, as stored in roms_metadata"""
+    igdb_age_ratings = (rom.igdb_metadata or {}).get("age_ratings") or []
+    launchbox_esrb = (rom.launchbox_metadata or {}).get("esrb")
+    if igdb_age_ratings:
+        age_ratings = [r.get("rating") for r in igdb_age_ratings]
+    elif launchbox_esrb:
+        age_ratings = [launchbox_esrb]
+    else:
+        age_ratings = []
+
+    first_release_date = None
+    for source in ("igdb_metadata", "ss_metadata", "ra_metadata", "launchbox_metadata"):
+        release_date = _metadata_number(
+            getattr(rom, source), "first_release_date", INTEGER_PATTERN
+        )
+        if release_date is not None:
+            first_release_date = int(release_date) * 1000
+            break
+
+    ratings = [
+        rating
+        for rating in (
+            _metadata_number(rom.igdb_metadata, "total_rating", NUMBER_PATTERN),
+            _scale(
+                _metadata_number(rom.moby_metadata, "moby_score", NUMBER_PATTERN), 10
+            ),
+            _scale(_metadata_number(rom.ss_metadata, "ss_score", NUMBER_PATTERN), 10),
+            _scale(
+                _metadata_number(
+                    rom.launchbox_metadata, "community_rating", NUMBER_PATTERN
+                ),
+                20,
+            ),
+        )
+        if rating is not None
+    ]
+
+    metadatum = RomMetadata(
+        rom_id=rom.id,
+        genres=_first_metadata_list(
+            rom,
+            "genres",
+            (
+                "igdb_metadata",
+                "moby_metadata",
+                "ss_metadata",
+                "launchbox_metadata",
+                "ra_metadata",
+            ),
+        ),
+        franchises=_first_metadata_list(
+            rom, "franchises", ("igdb_metadata", "ss_metadata")
+        ),
+        collections=_first_metadata_list(rom, "collections", ("igdb_metadata",)),
+        companies=_first_metadata_list(
+            rom,
+            "companies",
+            ("igdb_metadata", "ss_metadata", "ra_metadata", "launchbox_metadata"),
+        ),
+        game_modes=_first_metadata_list(
+            rom, "game_modes", ("igdb_metadata", "ss_metadata")
+        ),
+        age_ratings=age_ratings,
+        first_release_date=first_release_date,
+        average_rating=sum(ratings) / len(ratings) if ratings else None,
+    )
+    metadatum.search_text = build_rom_search_text(
+        rom.name,
+        rom.fs_name,
+        rom.alternative_names,
+        metadatum.franchises,
+        metadatum.collections,
+        metadatum.companies,
+        metadatum.genres,
+    )
+    return metadatum
+
+
+def build_rom_search_text(
+    name: str | None, fs_name: str | None, *values: Iterable[str] | None
+) -> str:
+    """Text indexed for the search, one distinct value per line"""
+    lines = [name, fs_name, *(value for group in values for value in group or [])]
+    return "\n".join(dict.fromkeys(line for line in lines if line))
+
+
+def _delete_returning(
+    session: Session, statement: Delete, *columns: InstrumentedAttribute
+) -> Sequence[Row]:
+    """Run a DELETE, returning the given columns of the deleted rows
+
+    Databases without DELETE ... RETURNING (MySQL) read the rows first.
+    """
+    if session.get_bind().dialect.delete_returning:
+        return session.execute(statement.returning(*columns)).all()
+
+    query = select(*columns)
+    if statement.whereclause is not None:
+        query = query.where(statement.whereclause)
+    rows = session.execute(query).all()
+    session.execute(statement)
+    return rows
+
+
+def _update_platform_stats(
+    session: Session, changes: Iterable[tuple[int | None, int, int]]
+) -> None:
+    """Apply changes to the rom count and size of platforms
+
+    Changes are given as (platform id, roms, bytes), computed from the rows
+    being written. Counters are incremented rather than recomputed, so writes
+    only cost as much as the roms they touch, and concurrent scans don't
+    overwrite each other. The library stats follow the same changes.
+    """
+    platforms_stats: dict[int, tuple[int, int]] = {}
+    for platform_id, roms, size in changes:
+        if platform_id is not None:
+            count, total = platforms_stats.get(platform_id, (0, 0))
+            platforms_stats[platform_id] = (count + roms, total + size)
+
+    platforms_change = roms_change = size_change = 0
+    for platform_id, (roms, size) in platforms_stats.items():
+        if not roms and not size:
+            continue
+
+        session.execute(
+            update(Platform)
+            .where(Platform.id == platform_id)
+            .values(
+                rom_count=Platform.rom_count + roms,
+                fs_size_bytes=Platform.fs_size_bytes + size,
+            )
+            .execution_options(synchronize_session="evaluate")
+        )
+        roms_change += roms
+        size_change += size
+
+        # Platforms count in the library stats as long as they have roms
+        if roms:
+            rom_count = session.scalar(
+                select(Platform.rom_count).where(Platform.id == platform_id)
+            )
+            if rom_count is not None:
+                platforms_change += (rom_count > 0) - (rom_count - roms > 0)
+
+    record_library_stats_change(
+        session,
+        PLATFORMS=platforms_change,
+        ROMS=roms_change,
+        TOTAL_FILESIZE_BYTES=size_change,
+    )
+
+
+def _update_roms_platform_size(session: Session, changes: dict[int, int]) -> None:
+    """Apply changes to the files size of roms, by rom id, to their platforms
+
+    The platform of each rom is looked up by the update itself.
+    """
+    for rom_id, size in changes.items():
+        if not size:
+            continue
+
+        session.execute(
+            update(Platform)
+            .where(
+                Platform.id
+                == select(Rom.platform_id).where(Rom.id == rom_id).scalar_subquery()
+            )
+            .values(fs_size_bytes=Platform.fs_size_bytes + size)
+            .execution_options(synchronize_session=False)
+        )
+        record_library_stats_change(session, TOTAL_FILESIZE_BYTES=size)
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_predicate(search_term: str) -> ColumnElement[bool] | None:
+    """Match roms_metadata rows against the search index
+
+    Every word of the term has to match: as a substring served by the trigram
+    index on PostgreSQL, or as a word prefix on MariaDB/MySQL. Returns None if
+    the indexed search is disabled or can't serve the term.
+    """
+    if ROMM_SEARCH_MODE != "indexed":
+        return None
+
+    if ROMM_DB_DRIVER == "postgresql":
+        words = search_term.split()
+        if not words:
+            return None
+
+        return and_(
+            *(
+                RomMetadata.search_text.ilike(f"%{_escape_like(word)}%", escape="\\")
+                for word in words
+            )
+        )
+
+    words = [
+        word
+        for word in SEARCH_WORD_PATTERN.findall(search_term)
+        if len(word) >= FULLTEXT_MIN_WORD_LENGTH
+    ]
+    if not words:
+        return None
+
+    return match(
+        RomMetadata.search_text.expression,
+        against=" ".join(f"+{word}*" for word in words),
+    ).in_boolean_mode()
+
+
+def search_rank(search_term: str) -> ColumnElement[float] | None:
+    """Relevance of roms_metadata rows for the search term, higher is better"""
+    predicate = search_predicate(search_term)
+    if predicate is None:
+        return None
+
+    if ROMM_DB_DRIVER == "postgresql":
+        return cast(func.word_similarity(search_term, RomMetadata.search_text), Float)
+
+    # MATCH ... AGAINST evaluates to the relevance score
+    return type_coerce(predicate, Float)
+
+
+# Fields of the slim roms listing read straight from the roms table
+ROM_PROJECTION_COLUMNS = (
+    "id",
+    "igdb_id",
+    "sgdb_id",
+    "moby_id",
+    "ss_id",
+    "ra_id",
+    "launchbox_id",
+    "hasheous_id",
+    "tgdb_id",
+    "platform_id",
+    "fs_name",
+    "fs_name_no_tags",
+    "fs_name_no_ext",
+    "fs_extension",
+    "fs_path",
+    "name",
+    "slug",
+    "summary",
+    "url_cover",
+    "path_manual",
+    "url_manual",
+    "revision",
+    "regions",
+    "languages",
+    "tags",
+    "crc_hash",
+    "md5_hash",
+    "sha1_hash",
+    "missing_from_fs",
+    "created_at",
+    "updated_at",
+)
+
+# Fields of the slim roms listing computed by Rom properties, and the columns they read
+ROM_PROJECTION_PROPERTIES = {
+    "full_path": ("fs_path", "fs_name"),
+    "has_manual": ("path_manual",),
+    "path_cover_small": ("path_cover_s", "updated_at"),
+    "path_cover_large": ("path_cover_l", "updated_at"),
+}
+
+ROM_PROJECTION_PLATFORM_FIELDS = (
+    "platform_slug",
+    "platform_fs_slug",
+    "platform_name",
+    "platform_custom_name",
+    "platform_display_name",
+)
+
+ROM_PROJECTION_FIELDS = frozenset(
+    (
+        *ROM_PROJECTION_COLUMNS,
+        *ROM_PROJECTION_PROPERTIES,
+        *ROM_PROJECTION_PLATFORM_FIELDS,
+    )
+)
+
+
+def build_rom_projection(row: Row, fields: Sequence[str]) -> dict[str, Any]:
+    """Build a slim rom from a row selected by `DBRomsHandler.project_roms`"""
+    projection = {}
+    for field in fields:
+        if field in ROM_PROJECTION_PROPERTIES:
+            prop = getattr(Rom, field)
+            getter = (
+                prop.func if isinstance(prop, functools.cached_property) else prop.fget
+            )
+            projection[field] = getter(row)
+        else:
+            projection[field] = getattr(row, field)
+
+    return projection
+
+
+def _column_values(entity: Any, exclude: Iterable[str] = ()) -> dict[str, Any]:
+    """Read the mapped column values of an entity, skipping the audit timestamps
+
+    Unset attributes of transient entities fall back to the column default.
+    """
+    state = inspect(entity)
+    values = {}
+    for column_attr in state.mapper.column_attrs:
+        key = column_attr.key
+        if key in {"created_at", "updated_at", *exclude}:
+            continue
+        if key in state.dict:
+            values[key] = state.dict[key]
+            continue
+
+        default = column_attr.columns[0].default
+        values[key] = default.arg if default is not None and default.is_scalar else None
+
+    return values
+
+
 class DBRomsHandler(DBBaseHandler):
     @begin_session
     @with_details
     def add_rom(self, rom: Rom, query: Query = None, session: Session = None) -> Rom:
+        # Merging looks the rom up anyway, so this doesn't cost another query
+        stored_rom = session.get(Rom, rom.id) if rom.id is not None else None
+        stored_platform_id = stored_rom.platform_id if stored_rom else None
+        files_size = sum(f.file_size_bytes for f in inspect(rom).dict.get("files", []))
         rom = session.merge(rom)
         session.flush()
 
+        self._refresh_rom_metadata(rom, session=session)
+        if stored_rom is None:
+            _update_platform_stats(session, [(rom.platform_id, 1, files_size)])
+        elif rom.platform_id != stored_platform_id:
+            _update_platform_stats(
+                session,
+                [
+                    (stored_platform_id, -1, -rom.fs_size_bytes),
+                    (rom.platform_id, 1, rom.fs_size_bytes),
+                ],
+            )
+
         return session.scalar(query.filter_by(id=rom.id).limit(1))
 
+    def _refresh_rom_metadata(self, rom: Rom, session: Session) -> None:
+        session.merge(build_rom_metadata(rom))
+        session.flush()
+
     @begin_session
     @with_details
     def get_rom(
@@ -156,14 +562,7 @@ class DBRomsHandler(DBBaseHandler):
     def filter_by_collection_id(
         self, query: Query, session: Session, collection_id: int
     ):
-        collection = (
-            session.query(Collection)
-            .filter(Collection.id == collection_id)
-            .one_or_none()
-        )
-        if collection:
-            return query.filter(Rom.id.in_(collection.rom_ids))
-        return query
+        return query.filter(Rom.id.in_(collection_rom_ids_query(collection_id)))
 
     def filter_by_virtual_collection_id(
         self, query: Query, session: Session, virtual_collection_id: str
@@ -179,6 +578,10 @@ class DBRomsHandler(DBBaseHandler):
         return query
 
     def filter_by_search_term(self, query: Query, search_term: str):
+        predicate = search_predicate(search_term)
+        if predicate is not None:
+            return query.filter(Rom.id.in_(select(RomMetadata.rom_id).where(predicate)))
+
         return query.filter(
             or_(
                 Rom.fs_name.ilike(f"%{search_term}%"),
@@ -204,24 +607,15 @@ class DBRomsHandler(DBBaseHandler):
         self, query: Query, session: Session, value: bool, user_id: int | None
     ) -> Query:
         """Filter based on whether the rom is in the user's Favourites collection."""
-        favourites_collection = (
-            session.query(Collection)
-            .filter(Collection.name.ilike("favourites"))
-            .filter(Collection.user_id == user_id)
-            .one_or_none()
+        # Without a Favourites collection, no rom is a favourite
+        predicate = Rom.id.in_(
+            select(CollectionRom.rom_id)
+            .join(Collection, Collection.id == CollectionRom.collection_id)
+            .where(Collection.name.ilike("favourites"), Collection.user_id == user_id)
         )
-
-        if favourites_collection:
-            predicate = Rom.id.in_(favourites_collection.rom_ids)
-            if not value:
-                predicate = not_(predicate)
-            return query.filter(predicate)
-
-        # If no Favourites collection exists, return the original query if non-favourites
-        # were requested, or an empty query if favourites were requested.
         if not value:
-            return query
-        return query.filter(false())
+            predicate = not_(predicate)
+        return query.filter(predicate)
 
     def filter_by_duplicate(self, query: Query, value: bool) -> Query:
         """Filter based on whether the rom has duplicates."""
@@ -550,15 +944,31 @@ class DBRomsHandler(DBBaseHandler):
         order_by: str = "name",
         order_dir: str = "asc",
         user_id: int | None = None,
+        keyset: bool = False,
+        search_term: str | None = None,
         query: Query = None,
         session: Session = None,
     ) -> Query[Rom]:
+        """Build the base roms query, sorted by the given field
+
+        With `keyset`, rows are ordered by the sort key and id, and the sort key is
+        selected alongside each rom so `seek_roms` can resume after any row.
+        Ordering by `relevance` ranks the roms against `search_term`, when the
+        indexed search is enabled.
+        """
         if user_id:
             query = query.outerjoin(
                 RomUser, and_(RomUser.rom_id == Rom.id, RomUser.user_id == user_id)
             )
 
-        if user_id and hasattr(RomUser, order_by) and not hasattr(Rom, order_by):
+        rank = search_rank(search_term) if search_term else None
+        order_attr: ColumnElement[Any] | InstrumentedAttribute[Any]
+        if order_by == "relevance" and rank is not None:
+            # Negated so the best matches come first in ascending order
+            order_attr = -(
+                select(rank).where(RomMetadata.rom_id == Rom.id).scalar_subquery()
+            )
+        elif user_id and hasattr(RomUser, order_by) and not hasattr(Rom, order_by):
             order_attr = getattr(RomUser, order_by)
             query = query.filter(RomUser.user_id == user_id, order_attr.isnot(None))
         elif hasattr(RomMetadata, order_by) and not hasattr(Rom, order_by):
@@ -591,6 +1001,9 @@ class DBRomsHandler(DBBaseHandler):
                 func.lower(order_attr).regexp_replace(r"^(the|a|an)\s+", "", "i")
             )
 
+        if keyset:
+            return self._order_by_keyset(query, order_attr, order_dir)
+
         if order_dir.lower() == "desc":
             order_attr = order_attr.desc()
         else:
@@ -598,6 +1011,16 @@ class DBRomsHandler(DBBaseHandler):
 
         return query.order_by(order_attr)
 
+    def _order_by_keyset(self, query: Query, sort_key: Any, order_dir: str) -> Query:
+        descending = order_dir.lower() == "desc"
+
+        # Rows without a sort key go last in both directions (MariaDB has no NULLS LAST)
+        return query.add_columns(sort_key.label("sort_key")).order_by(
+            sort_key.is_(None),
+            sort_key.desc() if descending else sort_key.asc(),
+            Rom.id.desc() if descending else Rom.id.asc(),
+        )
+
     @begin_session
     def get_roms_scalar(
         self,
@@ -608,7 +1031,8 @@ class DBRomsHandler(DBBaseHandler):
         query = self.get_roms_query(
             order_by=kwargs.pop("order_by", "name"),
             order_dir=kwargs.pop("order_dir", "asc"),
-            user_id=kwargs.pop("user_id", None),
+            user_id=kwargs.get("user_id"),
+            search_term=kwargs.get("search_term"),
         )
         roms = self.filter_roms(
             query=query,
@@ -635,6 +1059,60 @@ class DBRomsHandler(DBBaseHandler):
         )
         return session.scalars(roms).all()
 
+    def project_roms(self, query: Select, fields: Sequence[str]) -> Select:
+        """Select only the columns backing the given fields instead of whole roms
+
+        Rows are plain tuples, so no rom is hydrated and no relationship is loaded.
+        Any keyset sort key selected by `get_roms_query` is kept.
+        """
+        columns: dict[str, Any] = {"id": Rom.id}
+        platform = aliased(Platform)
+        for field in fields:
+            if field in ROM_PROJECTION_PROPERTIES:
+                for name in ROM_PROJECTION_PROPERTIES[field]:
+                    columns[name] = getattr(Rom, name)
+            elif field == "platform_display_name":
+                columns[field] = func.coalesce(
+                    func.nullif(platform.custom_name, ""), platform.name
+                ).label(field)
+            elif field in ROM_PROJECTION_PLATFORM_FIELDS:
+                columns[field] = getattr(
+                    platform, field.removeprefix("platform_")
+                ).label(field)
+            else:
+                columns[field] = getattr(Rom, field)
+
+        sort_key = query.selected_columns.get("sort_key")
+        query = query.with_only_columns(
+            *columns.values(),
+            *((sort_key,) if sort_key is not None else ()),
+            maintain_column_froms=True,
+        )
+        if any(field in ROM_PROJECTION_PLATFORM_FIELDS for field in fields):
+            query = query.join(platform, platform.id == Rom.platform_id)
+
+        return query
+
+    def seek_roms(
+        self, query: Select, order_dir: str, after: tuple[Any, int]
+    ) -> Select:
+        """Skip every row of a keyset query up to and including the given sort key and id"""
+        sort_key = query.selected_columns.sort_key.element
+        after_key, after_id = after
+        descending = order_dir.lower() == "desc"
+
+        after_id_filter = Rom.id < after_id if descending else Rom.id > after_id
+        if after_key is None:
+            return query.filter(sort_key.is_(None), after_id_filter)
+
+        return query.filter(
+            or_(
+                sort_key.is_(None),
+                sort_key < after_key if descending else sort_key > after_key,
+                and_(sort_key == after_key, after_id_filter),
+            )
+        )
+
     @begin_session
     def get_char_index(
         self, query: Query, session: Session = None
@@ -678,21 +1156,158 @@ class DBRomsHandler(DBBaseHandler):
 
     @begin_session
     def update_rom(self, id: int, data: dict, session: Session = None) -> Rom:
+        # Only moving the rom to another platform changes the platforms stats
+        stored_platform_id = (
+            session.scalar(select(Rom.platform_id).filter_by(id=id))
+            if "platform_id" in data
+            else None
+        )
         session.execute(
             update(Rom)
             .where(Rom.id == id)
             .values(**data)
             .execution_options(synchronize_session="evaluate")
         )
-        return session.query(Rom).filter_by(id=id).one()
+
+        rom = session.query(Rom).filter_by(id=id).one()
+
+        if stored_platform_id is not None and stored_platform_id != rom.platform_id:
+            _update_platform_stats(
+                session,
+                [
+                    (stored_platform_id, -1, -rom.fs_size_bytes),
+                    (rom.platform_id, 1, rom.fs_size_bytes),
+                ],
+            )
+
+        if ROM_METADATA_SOURCE_COLUMNS.intersection(data):
+            self._refresh_rom_metadata(rom, session=session)
+
+        return rom
 
     @begin_session
-    def delete_rom(self, id: int, session: Session = None) -> None:
+    def add_roms(
+        self, roms: Sequence[Rom], query: Query = None, session: Session = None
+    ) -> Sequence[Rom]:
+        """Insert new roms, without files, in a single flush
+
+        The ORM batches the inserts of a flush and fetches the new ids with
+        them, on the databases that support RETURNING. Returns the stored
+        roms, in the given order.
+        """
+        if not roms:
+            return []
+
+        session.add_all(roms)
+        session.flush()
+
         session.execute(
+            RomMetadata.metadata.tables[RomMetadata.__tablename__].insert(),
+            [_column_values(build_rom_metadata(rom)) for rom in roms],
+        )
+        _update_platform_stats(session, [(rom.platform_id, 1, 0) for rom in roms])
+        return roms
+
+    @begin_session
+    @with_simple
+    def upsert_roms(
+        self, roms: Sequence[Rom], query: Query = None, session: Session = None
+    ) -> Sequence[Rom]:
+        """Write roms along with their files and aggregated metadata
+
+        Issues one multi-row upsert per table, and replaces the existing
+        files of the roms with the ones attached to them. Returns the
+        stored roms, in the given order.
+        """
+        if not roms:
+            return []
+
+        rom_ids = [rom.id for rom in roms]
+        session.execute(
+            upsert(
+                Rom.metadata.tables[Rom.__tablename__],
+                [{**_column_values(rom), "updated_at": func.now()} for rom in roms],
+                index_elements=["id"],
+                session=session,
+            )
+        )
+
+        deleted_files = _delete_returning(
+            session,
+            delete(RomFile)
+            .where(RomFile.rom_id.in_(rom_ids))
+            .execution_options(synchronize_session=False),
+            RomFile.rom_id,
+            RomFile.file_size_bytes,
+        )
+        rom_files = [
+            {**_column_values(rom_file, exclude=("id",)), "rom_id": rom.id}
+            for rom in roms
+            for rom_file in rom.files
+        ]
+        if rom_files:
+            session.execute(
+                RomFile.metadata.tables[RomFile.__tablename__].insert(), rom_files
+            )
+
+        # The roms already exist and keep their platform, only their files change
+        platform_ids = {rom.id: rom.platform_id for rom in roms}
+        _update_platform_stats(
+            session,
+            [
+                *((platform_ids[rom_id], 0, -size) for rom_id, size in deleted_files),
+                *(
+                    (rom.platform_id, 0, rom_file.file_size_bytes)
+                    for rom in roms
+                    for rom_file in rom.files
+                ),
+            ],
+        )
+
+        session.execute(
+            upsert(
+                RomMetadata.metadata.tables[RomMetadata.__tablename__],
+                [
+                    {
+                        **_column_values(build_rom_metadata(rom)),
+                        "updated_at": func.now(),
+                    }
+                    for rom in roms
+                ],
+                index_elements=["rom_id"],
+                session=session,
+            )
+        )
+
+        stored_roms = {
+            rom.id: rom
+            for rom in session.scalars(query.filter(Rom.id.in_(rom_ids))).unique()
+        }
+        return [stored_roms[rom_id] for rom_id in rom_ids]
+
+    @begin_session
+    def delete_rom(self, id: int, session: Session = None) -> None:
+        deleted_files = _delete_returning(
+            session,
+            delete(RomFile)
+            .where(RomFile.rom_id == id)
+            .execution_options(synchronize_session="evaluate"),
+            RomFile.file_size_bytes,
+        )
+        deleted_roms = _delete_returning(
+            session,
             delete(Rom)
             .where(Rom.id == id)
-            .execution_options(synchronize_session="evaluate")
+            .execution_options(synchronize_session="evaluate"),
+            Rom.platform_id,
         )
+        files_size = sum(size for (size,) in deleted_files)
+        _update_platform_stats(
+            session,
+            [(platform_id, -1, -files_size) for (platform_id,) in deleted_roms],
+        )
+        # Its saves, states and screenshots are deleted along with it
+        invalidate_library_stats(session)
 
     @begin_session
     def mark_missing_roms(
@@ -779,7 +1394,26 @@ class DBRomsHandler(DBBaseHandler):
 
     @begin_session
     def add_rom_file(self, rom_file: RomFile, session: Session = None) -> RomFile:
-        return session.merge(rom_file)
+        stored_file = (
+            session.execute(
+                select(RomFile.rom_id, RomFile.file_size_bytes).filter_by(
+                    id=rom_file.id
+                )
+            ).first()
+            if rom_file.id is not None
+            else None
+        )
+        rom_file = session.merge(rom_file)
+        session.flush()
+
+        size_changes = {rom_file.rom_id: rom_file.file_size_bytes}
+        if stored_file is not None:
+            stored_rom_id, stored_size = stored_file
+            size_changes[stored_rom_id] = (
+                size_changes.get(stored_rom_id, 0) - stored_size
+            )
+        _update_roms_platform_size(session, size_changes)
+        return rom_file
 
     @begin_session
     def get_rom_file_by_id(self, id: int, session: Session = None) -> RomFile | None:
@@ -787,6 +1421,14 @@ class DBRomsHandler(DBBaseHandler):
 
     @begin_session
     def update_rom_file(self, id: int, data: dict, session: Session = None) -> RomFile:
+        # Only moving or resizing the file changes the platforms stats
+        stored_file = (
+            session.execute(
+                select(RomFile.rom_id, RomFile.file_size_bytes).filter_by(id=id)
+            ).one()
+            if data.keys() & {"rom_id", "file_size_bytes"}
+            else None
+        )
         session.execute(
             update(RomFile)
             .where(RomFile.id == id)
@@ -794,6 +1436,15 @@ class DBRomsHandler(DBBaseHandler):
             .execution_options(synchronize_session="evaluate")
         )
 
+        if stored_file is not None:
+            stored_rom_id, stored_size = stored_file
+            rom_id = data.get("rom_id", stored_rom_id)
+            size_changes = {rom_id: data.get("file_size_bytes", stored_size)}
+            size_changes[stored_rom_id] = (
+                size_changes.get(stored_rom_id, 0) - stored_size
+            )
+            _update_roms_platform_size(session, size_changes)
+
         return session.query(RomFile).filter_by(id=id).one()
 
     @begin_session
@@ -808,4 +1459,61 @@ class DBRomsHandler(DBBaseHandler):
             .where(RomFile.rom_id == rom_id)
             .execution_options(synchronize_session="evaluate")
         )
+        _update_roms_platform_size(
+            session, {rom_id: -sum(f.file_size_bytes for f in purged_rom_files)}
+        )
         return purged_rom_files
+
+
+class RomsBulkWriter:
+    """Accumulate scanned roms to write them with a fixed number of statements
+
+    Roms must already exist in the database, with their files attached to
+    `Rom.files`. New roms are inserted a batch at a time with `add_new_roms`,
+    to get their ids before they are scanned. Each flush runs in a single
+    transaction.
+
+    New roms are tracked until they are written, so that the ones a failed
+    scan never got to can be removed instead of being left empty.
+    """
+
+    def __init__(self, handler: DBRomsHandler, batch_size: int):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.roms: dict[int, Rom] = {}
+        self.new_rom_ids: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self.roms)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.roms) >= self.batch_size
+
+    def add(self, rom: Rom) -> None:
+        self.roms[rom.id] = rom
+
+    def add_new_roms(self, roms: Sequence[Rom]) -> Sequence[Rom]:
+        new_roms = self.handler.add_roms(roms)
+        self.new_rom_ids.update(rom.id for rom in new_roms)
+        return new_roms
+
+    def flush(self) -> Sequence[Rom]:
+        if not self.roms:
+            return []
+
+        roms = list(self.roms.values())
+        self.roms.clear()
+        stored_roms = self.handler.upsert_roms(roms)
+        self.new_rom_ids.difference_update(rom.id for rom in stored_roms)
+        return stored_roms
+
+    def discard_unwritten_roms(self) -> None:
+        """Delete the roms created for the scan that were never written
+
+        A quick scan skips the roms it finds in the database, so leaving them
+        empty would keep them from being scanned again.
+        """
+        for rom_id in sorted(self.new_rom_ids):
+            self.handler.delete_rom(rom_id)
+        self.new_rom_ids.clear()
@@ -1,17 +1,23 @@
 from collections.abc import Sequence
+from typing import cast
 
 from decorators.database import begin_session
 from models.assets import Save
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import CursorResult, and_, delete, select, update
 from sqlalchemy.orm import Session
 
 from .base_handler import DBBaseHandler
+from .stats_handler import record_library_stats_change
 
 
 class DBSavesHandler(DBBaseHandler):
     @begin_session
     def add_save(self, save: Save, session: Session = None) -> Save:
-        return session.merge(save)
+        is_new = save.id is None or session.get(Save, save.id) is None
+        save = session.merge(save)
+        if is_new:
+            record_library_stats_change(session, SAVES=1)
+        return save
 
     @begin_session
     def get_save(self, user_id: int, id: int, session: Session = None) -> Save | None:
@@ -57,11 +63,15 @@ class DBSavesHandler(DBBaseHandler):
 
     @begin_session
     def delete_save(self, id: int, session: Session = None) -> None:
-        session.execute(
-            delete(Save)
-            .where(Save.id == id)
-            .execution_options(synchronize_session="evaluate")
+        result = cast(
+            CursorResult,
+            session.execute(
+                delete(Save)
+                .where(Save.id == id)
+                .execution_options(synchronize_session="evaluate")
+            ),
         )
+        record_library_stats_change(session, SAVES=-result.rowcount)
 
     @begin_session
     def mark_missing_saves(
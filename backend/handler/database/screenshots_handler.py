@@ -1,11 +1,13 @@
 from collections.abc import Sequence
+from typing import cast
 
 from decorators.database import begin_session
 from models.assets import Screenshot
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import CursorResult, and_, delete, select, update
 from sqlalchemy.orm import Session
 
 from .base_handler import DBBaseHandler
+from .stats_handler import record_library_stats_change
 
 
 class DBScreenshotsHandler(DBBaseHandler):
@@ -13,7 +15,11 @@ class DBScreenshotsHandler(DBBaseHandler):
     def add_screenshot(
         self, screenshot: Screenshot, session: Session = None
     ) -> Screenshot:
-        return session.merge(screenshot)
+        is_new = screenshot.id is None or session.get(Screenshot, screenshot.id) is None
+        screenshot = session.merge(screenshot)
+        if is_new:
+            record_library_stats_change(session, SCREENSHOTS=1)
+        return screenshot
 
     @begin_session
     def get_screenshot(self, id, session: Session = None) -> Screenshot | None:
@@ -43,11 +49,15 @@ class DBScreenshotsHandler(DBBaseHandler):
 
     @begin_session
     def delete_screenshot(self, id: int, session: Session = None) -> None:
-        session.execute(
-            delete(Screenshot)
-            .where(Screenshot.id == id)
-            .execution_options(synchronize_session="evaluate")
+        result = cast(
+            CursorResult,
+            session.execute(
+                delete(Screenshot)
+                .where(Screenshot.id == id)
+                .execution_options(synchronize_session="evaluate")
+            ),
         )
+        record_library_stats_change(session, SCREENSHOTS=-result.rowcount)
 
     @begin_session
     def mark_missing_screenshots(
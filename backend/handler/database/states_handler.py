@@ -1,17 +1,23 @@
 from collections.abc import Sequence
+from typing import cast
 
 from decorators.database import begin_session
 from models.assets import State
-from sqlalchemy import and_, delete, select, update
+from sqlalchemy import CursorResult, and_, delete, select, update
 from sqlalchemy.orm import Session
 
 from .base_handler import DBBaseHandler
+from .stats_handler import record_library_stats_change
 
 
 class DBStatesHandler(DBBaseHandler):
     @begin_session
     def add_state(self, state: State, session: Session = None) -> State:
-        return session.merge(state)
+        is_new = state.id is None or session.get(State, state.id) is None
+        state = session.merge(state)
+        if is_new:
+            record_library_stats_change(session, STATES=1)
+        return state
 
     @begin_session
     def get_state(self, user_id: int, id: int, session: Session = None) -> State | None:
@@ -57,11 +63,15 @@ class DBStatesHandler(DBBaseHandler):
 
     @begin_session
     def delete_state(self, id: int, session: Session = None) -> None:
-        session.execute(
-            delete(State)
-            .where(State.id == id)
-            .execution_options(synchronize_session="evaluate")
+        result = cast(
+            CursorResult,
+            session.execute(
+                delete(State)
+                .where(State.id == id)
+                .execution_options(synchronize_session="evaluate")
+            ),
         )
+        record_library_stats_change(session, STATES=-result.rowcount)
 
     @begin_session
     def mark_missing_states(
@@ -1,26 +1,132 @@
+from collections import Counter
+from typing import Any, Final, cast
+
 from decorators.database import begin_session
+from handler.redis_handler import sync_cache
+from logger.logger import log
 from models.assets import Save, Screenshot, State
-from models.rom import Rom, RomFile
-from sqlalchemy import distinct, func, select
+from models.platform import Platform
+from redis.exceptions import RedisError
+from sqlalchemy import case, event, func, select
 from sqlalchemy.orm import Session
 
-from .base_handler import DBBaseHandler
+from .base_handler import DBBaseHandler, sync_session
+
+LIBRARY_STATS_KEY: Final = "romm:library_stats"
+LIBRARY_STATS_FIELDS: Final = (
+    "PLATFORMS",
+    "ROMS",
+    "SAVES",
+    "STATES",
+    "SCREENSHOTS",
+    "TOTAL_FILESIZE_BYTES",
+)
+
+# Keys of Session.info holding the stats changes of the ongoing transaction
+PENDING_STATS_CHANGES: Final = "library_stats_changes"
+PENDING_STATS_INVALIDATION: Final = "library_stats_invalidated"
+
+
+def record_library_stats_change(session: Session, **changes: int) -> None:
+    """Queue changes to the cached library stats, applied once the session commits"""
+    pending = session.info.setdefault(PENDING_STATS_CHANGES, Counter())
+    pending.update({field: change for field, change in changes.items() if change})
+
+
+def invalidate_library_stats(session: Session) -> None:
+    """Drop the cached library stats once the session commits
+
+    For writes whose effect on the stats isn't known, like deletes that
+    cascade to saves, states and screenshots.
+    """
+    session.info[PENDING_STATS_INVALIDATION] = True
+
+
+@event.listens_for(sync_session, "after_commit")
+def _apply_library_stats_changes(session: Session) -> None:
+    changes = session.info.pop(PENDING_STATS_CHANGES, None)
+    invalidated = session.info.pop(PENDING_STATS_INVALIDATION, False)
+    if not changes and not invalidated:
+        return
+
+    try:
+        if invalidated:
+            sync_cache.delete(LIBRARY_STATS_KEY)
+            return
+
+        # Without cached stats, the next read computes them from scratch
+        if not sync_cache.exists(LIBRARY_STATS_KEY):
+            return
+
+        with sync_cache.pipeline() as pipe:
+            for field, change in changes.items():
+                pipe.hincrby(LIBRARY_STATS_KEY, field, change)
+            pipe.execute()
+    except RedisError as exc:
+        log.warning(f"Unable to update the library stats: {exc}")
+
+
+@event.listens_for(sync_session, "after_rollback")
+def _discard_library_stats_changes(session: Session) -> None:
+    session.info.pop(PENDING_STATS_CHANGES, None)
+    session.info.pop(PENDING_STATS_INVALIDATION, None)
 
 
 class DBStatsHandler(DBBaseHandler):
+    def get_library_stats(self) -> dict[str, int]:
+        """Totals of the library, as cached in Redis
+
+        The cache is kept up to date as roms and assets are written, and
+        rebuilt by `reconcile_library_stats` when missing.
+        """
+        try:
+            cached_stats = cast(dict[Any, Any], sync_cache.hgetall(LIBRARY_STATS_KEY))
+        except RedisError as exc:
+            log.warning(f"Unable to read the library stats: {exc}")
+            return self.compute_library_stats()
+
+        stats = {
+            (field.decode() if isinstance(field, bytes) else field): int(value)
+            for field, value in cached_stats.items()
+        }
+        if set(LIBRARY_STATS_FIELDS).issubset(stats):
+            return {field: stats[field] for field in LIBRARY_STATS_FIELDS}
+
+        return self.reconcile_library_stats()
+
     @begin_session
-    def get_platforms_count(self, session: Session = None) -> int:
-        """Get the number of platforms with any roms."""
-        return (
-            session.scalar(
-                select(func.count(distinct(Rom.platform_id))).select_from(Rom)
+    def compute_library_stats(self, session: Session = None) -> dict[str, int]:
+        """Totals of the library, computed from the database
+
+        Rom totals come from the counters stored on platforms, so only the
+        assets tables are counted.
+        """
+        platforms, roms, total_filesize = session.execute(
+            select(
+                func.coalesce(func.sum(case((Platform.rom_count > 0, 1), else_=0)), 0),
+                func.coalesce(func.sum(Platform.rom_count), 0),
+                func.coalesce(func.sum(Platform.fs_size_bytes), 0),
             )
-            or 0
-        )
+        ).one()
 
-    @begin_session
-    def get_roms_count(self, session: Session = None) -> int:
-        return session.scalar(select(func.count()).select_from(Rom)) or 0
+        return {
+            "PLATFORMS": int(platforms),
+            "ROMS": int(roms),
+            "SAVES": self.get_saves_count(session=session),
+            "STATES": self.get_states_count(session=session),
+            "SCREENSHOTS": self.get_screenshots_count(session=session),
+            "TOTAL_FILESIZE_BYTES": int(total_filesize),
+        }
+
+    def reconcile_library_stats(self) -> dict[str, int]:
+        """Recompute the library stats and replace the cached ones"""
+        stats = self.compute_library_stats()
+        try:
+            sync_cache.hset(LIBRARY_STATS_KEY, mapping=stats)
+        except RedisError as exc:
+            log.warning(f"Unable to store the library stats: {exc}")
+
+        return stats
 
     @begin_session
     def get_saves_count(self, session: Session = None) -> int:
@@ -33,26 +139,3 @@ class DBStatsHandler(DBBaseHandler):
     @begin_session
     def get_screenshots_count(self, session: Session = None) -> int:
         return session.scalar(select(func.count()).select_from(Screenshot)) or 0
-
-    @begin_session
-    def get_total_filesize(self, session: Session = None) -> int:
-        """Get the total filesize of all roms in the database, in bytes."""
-        return (
-            session.scalar(
-                select(func.sum(RomFile.file_size_bytes)).select_from(RomFile)
-            )
-            or 0
-        )
-
-    @begin_session
-    def get_platform_filesize(self, platform_id: int, session: Session = None) -> int:
-        """Get the total filesize of all roms in the database, in bytes."""
-        return (
-            session.scalar(
-                select(func.sum(RomFile.file_size_bytes))
-                .select_from(RomFile)
-                .join(Rom)
-                .filter(Rom.platform_id == platform_id)
-            )
-            or 0
-        )
@@ -6,6 +6,7 @@ from sqlalchemy import delete, func, select, update
 from sqlalchemy.orm import Session
 
 from .base_handler import DBBaseHandler
+from .stats_handler import invalidate_library_stats
 
 
 class DBUsersHandler(DBBaseHandler):
@@ -47,6 +48,8 @@ class DBUsersHandler(DBBaseHandler):
 
     @begin_session
     def delete_user(self, id: int, session: Session = None):
+        # Their saves, states and screenshots are deleted along with them
+        invalidate_library_stats(session)
         return session.execute(
             delete(User)
             .where(User.id == id)
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import json
+import os
+from typing import TYPE_CHECKING, Final
+
+from handler.redis_handler import async_cache
+
+if TYPE_CHECKING:
+    from handler.filesystem.roms_handler import RomHashes
+
+ROM_HASHES_CACHE_KEY: Final = "romm:rom_hashes"
+ROM_HASHES_CACHE_TTL: Final = 60 * 60 * 24 * 90  # 90 days
+
+# Path, size in bytes and modification time in nanoseconds of a file
+FileFingerprint = tuple[str, int, int]
+
+
+def get_file_fingerprints(file_paths: list[str]) -> list[FileFingerprint] | None:
+    """Stat the rom files, returning None if any of them can't be read"""
+    fingerprints: list[FileFingerprint] = []
+    for file_path in file_paths:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        fingerprints.append((file_path, stat.st_size, stat.st_mtime_ns))
+
+    return fingerprints
+
+
+class RomHashCache:
+    """Persistent cache of rom hashes, keyed by path and invalidated by size and mtime.
+
+    Entries are stored per rom, as the rom-level hashes are calculated over the contents
+    of all its files, so they can only be reused if none of the files changed.
+    """
+
+    def _key(self, rom_path: str) -> str:
+        return f"{ROM_HASHES_CACHE_KEY}:{rom_path}"
+
+    async def _get_entry(
+        self, rom_path: str, fingerprints: list[FileFingerprint]
+    ) -> dict | None:
+        entry = await async_cache.get(self._key(rom_path))
+        if not entry:
+            return None
+
+        try:
+            data = json.loads(entry)
+        except json.JSONDecodeError:
+            return None
+
+        # Any added, removed or modified file invalidates the whole entry
+        if [tuple(f) for f in data.get("files", [])] != fingerprints:
+            return None
+
+        return data
+
+    async def get_hashes(
+        self, rom_path: str, fingerprints: list[FileFingerprint]
+    ) -> RomHashes | None:
+        data = await self._get_entry(rom_path, fingerprints)
+        if not data or "hashes" not in data:
+            return None
+
+        await async_cache.expire(self._key(rom_path), ROM_HASHES_CACHE_TTL)
+        return data["hashes"]
+
+    async def get_ra_hash(
+        self, rom_path: str, fingerprints: list[FileFingerprint], ra_platform_id: int
+    ) -> str | None:
+        data = await self._get_entry(rom_path, fingerprints)
+        if not data:
+            return None
+
+        return data.get("ra_hashes", {}).get(str(ra_platform_id))
+
+    async def set_hashes(
+        self,
+        rom_path: str,
+        fingerprints: list[FileFingerprint],
+        rom_hashes: RomHashes | None = None,
+        ra_hash: tuple[int, str] | None = None,
+    ) -> None:
+        """Store the hashes of a rom, merging them with any still valid entry"""
+        data = await self._get_entry(rom_path, fingerprints) or {"files": fingerprints}
+        if rom_hashes is not None:
+            data["hashes"] = rom_hashes
+        if ra_hash is not None:
+            ra_platform_id, hash_value = ra_hash
+            data.setdefault("ra_hashes", {})[str(ra_platform_id)] = hash_value
+
+        await async_cache.set(
+            self._key(rom_path), json.dumps(data), ex=ROM_HASHES_CACHE_TTL
+        )
@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+import asyncio
+import multiprocessing
+import time
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from dataclasses import dataclass, field, replace
+from typing import TYPE_CHECKING
+
+from config import SCAN_HASH_CHUNK_SIZE, SCAN_HASH_WORKERS
+from logger.logger import log
+from utils.metrics import HASHED_BYTES
+
+if TYPE_CHECKING:
+    from handler.filesystem.roms_handler import RomHashes
+
+
+@dataclass
+class HashingStats:
+    roms: int = 0
+    files: int = 0
+    bytes: int = 0
+    cached_roms: int = 0
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    @property
+    def throughput(self) -> float:
+        """Hashed bytes per second since the stats were reset"""
+        elapsed = self.elapsed
+        return self.bytes / elapsed if elapsed > 0 else 0.0
+
+    def __sub__(self, other: HashingStats) -> HashingStats:
+        """Stats gathered since `other`, an earlier snapshot of the same stats"""
+        return HashingStats(
+            roms=self.roms - other.roms,
+            files=self.files - other.files,
+            bytes=self.bytes - other.bytes,
+            cached_roms=self.cached_roms - other.cached_roms,
+            started_at=other.started_at,
+        )
+
+    def summary(self) -> str:
+        return (
+            f"{self.files} files from {self.roms} roms, "
+            f"{self.bytes / 1024 / 1024:.1f} MiB in {self.elapsed:.1f}s "
+            f"({self.throughput / 1024 / 1024:.1f} MiB/s), "
+            f"{self.cached_roms} roms reused from cache"
+        )
+
+
+class HashingEngine:
+    """Calculate rom hashes in a bounded pool of worker processes.
+
+    Hashing is CPU bound, so running it outside the event loop keeps socket updates
+    flowing, and concurrent callers are spread across up to `workers` cores.
+
+    The engine is shared by the scans of a process, which hold it with `in_use`
+    so the pool is only shut down once the last of them is done.
+    """
+
+    def __init__(
+        self,
+        workers: int = SCAN_HASH_WORKERS,
+        chunk_size: int = SCAN_HASH_CHUNK_SIZE,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.chunk_size = chunk_size
+        self.stats = HashingStats()
+        self._executor: ProcessPoolExecutor | None = None
+        self._users = 0
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # Spawn fresh interpreters, as forking a process with running threads
+            # (event loop executors, redis connections) is not safe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def hash_rom(self, file_paths: list[str]) -> RomHashes:
+        """Hash all the files of a rom in a worker process
+
+        Args:
+            file_paths: Absolute paths to the rom files, in the order they are combined
+        Returns:
+            Per-file and rom-level hashes
+        """
+        from handler.filesystem.roms_handler import hash_rom_files
+
+        loop = asyncio.get_running_loop()
+        try:
+            rom_hashes = await loop.run_in_executor(
+                self._get_executor(), hash_rom_files, file_paths, self.chunk_size
+            )
+        except BrokenProcessPool:
+            log.error("Hashing worker died unexpectedly, restarting the pool")
+            self.shutdown()
+            raise
+
+        self.stats.roms += 1
+        self.stats.files += len(file_paths)
+        self.stats.bytes += rom_hashes["bytes_read"]
+        HASHED_BYTES.inc(rom_hashes["bytes_read"])
+
+        return rom_hashes
+
+    async def hash_roms(self, roms_file_paths: list[list[str]]) -> list[RomHashes]:
+        """Hash several roms in parallel, returning results in the same order"""
+        return list(
+            await asyncio.gather(
+                *(self.hash_rom(file_paths) for file_paths in roms_file_paths)
+            )
+        )
+
+    def snapshot_stats(self) -> HashingStats:
+        """Copy of the stats so far, to subtract from the later ones"""
+        return replace(self.stats, started_at=time.monotonic())
+
+    @contextmanager
+    def in_use(self) -> Iterator[None]:
+        """Keep the worker processes around while the caller hashes roms"""
+        self._users += 1
+        try:
+            yield
+        finally:
+            self._users -= 1
+            # Release the worker processes until the next scan
+            if self._users == 0:
+                self.shutdown()
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
@@ -1,4 +1,8 @@
+import asyncio
 import os
+import time
+from collections.abc import Iterable
+from dataclasses import dataclass
 from io import BytesIO
 from pathlib import Path
 
@@ -13,6 +17,14 @@ from utils.context import ctx_httpx_client
 from .base_handler import CoverSize, FSHandler
 
 
+@dataclass
+class CoverStats:
+    """Work done while storing covers"""
+
+    downloaded_bytes: int = 0
+    resize_seconds: float = 0.0
+
+
 class FSResourcesHandler(FSHandler):
     def __init__(self) -> None:
         super().__init__(base_path=RESOURCES_BASE_PATH)
@@ -35,8 +47,7 @@ class FSResourcesHandler(FSHandler):
             return True  # At least one file found
         return False
 
-    def resize_cover_to_small(self, cover: ImageFile.ImageFile, save_path: str) -> None:
-        """Resize cover to small size, and save it to filesystem."""
+    def _resize_cover_to_small(self, cover: Image.Image) -> Image.Image:
         if cover.height >= 1000:
             ratio = 0.2
         else:
@@ -45,44 +56,85 @@ class FSResourcesHandler(FSHandler):
         small_width = int(cover.width * ratio)
         small_height = int(cover.height * ratio)
         small_size = (small_width, small_height)
-        small_img = cover.resize(small_size)
+        return cover.resize(small_size)
 
+    def resize_cover_to_small(self, cover: ImageFile.ImageFile, save_path: str) -> None:
+        """Resize cover to small size, and save it to filesystem."""
+        small_img = self._resize_cover_to_small(cover)
         small_img.save(save_path)
 
+    def _write_covers(
+        self,
+        cover_content: bytes,
+        cover_path: Path,
+        sizes: Iterable[CoverSize],
+        cover_stats: CoverStats,
+    ) -> None:
+        """Write every size of a cover from a single decode of the image
+
+        The big cover keeps the downloaded bytes, so the image is only decoded
+        when the small cover is needed.
+        """
+        sizes = set(sizes)
+        if CoverSize.BIG in sizes:
+            (cover_path / f"{CoverSize.BIG.value}.png").write_bytes(cover_content)
+
+        if CoverSize.SMALL not in sizes:
+            return
+
+        start = time.perf_counter()
+        try:
+            with Image.open(BytesIO(cover_content)) as img:
+                self._resize_cover_to_small(img).save(
+                    cover_path / f"{CoverSize.SMALL.value}.png"
+                )
+        except (UnidentifiedImageError, OSError) as exc:
+            log.error(f"Unable to identify image {cover_path}: {str(exc)}")
+        finally:
+            cover_stats.resize_seconds += time.perf_counter() - start
+
     async def _store_cover(
-        self, entity: Rom | Collection, url_cover: str, size: CoverSize
+        self,
+        entity: Rom | Collection,
+        url_cover: str,
+        sizes: Iterable[CoverSize] = (CoverSize.SMALL, CoverSize.BIG),
+        cover_stats: CoverStats | None = None,
     ) -> None:
-        """Store roms resources in filesystem
+        """Download a cover once and store it in filesystem in the given sizes
 
         Args:
-            fs_slug: short name of the platform
-            rom_name: name of rom file
+            entity: Rom or Collection object
             url_cover: url to get the cover
-            size: size of the cover
+            sizes: sizes of the cover to store
+            cover_stats: collects the bytes downloaded and time spent resizing
         """
+        cover_stats = cover_stats or CoverStats()
         cover_file = f"{entity.fs_resources_path}/cover"
         await self.make_directory(f"{cover_file}")
 
         httpx_client = ctx_httpx_client.get()
+        cover_content = BytesIO()
         try:
             async with httpx_client.stream("GET", url_cover, timeout=120) as response:
-                if response.status_code == 200:
-                    async with await self.write_file_streamed(
-                        path=cover_file, filename=f"{size.value}.png"
-                    ) as f:
-                        async for chunk in response.aiter_raw():
-                            await f.write(chunk)
+                if response.status_code != 200:
+                    return None
+
+                async for chunk in response.aiter_bytes():
+                    cover_content.write(chunk)
         except httpx.TransportError as exc:
             log.error(f"Unable to fetch cover at {url_cover}: {str(exc)}")
+            return None
 
-        if size == CoverSize.SMALL:
-            try:
-                image_path = self.validate_path(f"{cover_file}/{size.value}.png")
-                with Image.open(image_path) as img:
-                    self.resize_cover_to_small(img, save_path=str(image_path))
-            except UnidentifiedImageError as exc:
-                log.error(f"Unable to identify image {cover_file}: {str(exc)}")
-                return None
+        cover_stats.downloaded_bytes += cover_content.tell()
+
+        # Decoding and resizing are CPU bound, so keep them off the event loop
+        await asyncio.to_thread(
+            self._write_covers,
+            cover_content.getvalue(),
+            self.validate_path(cover_file),
+            sizes,
+            cover_stats,
+        )
 
     def _get_cover_path(self, entity: Rom | Collection, size: CoverSize) -> str | None:
         """Returns rom cover filesystem path adapted to frontend folder structure
@@ -98,29 +150,32 @@ class FSResourcesHandler(FSHandler):
         return None
 
     async def get_cover(
-        self, entity: Rom | Collection | None, overwrite: bool, url_cover: str | None
+        self,
+        entity: Rom | Collection | None,
+        overwrite: bool,
+        url_cover: str | None,
+        cover_stats: CoverStats | None = None,
     ) -> tuple[str | None, str | None]:
         if not entity:
             return None, None
 
-        small_cover_exists = self.cover_exists(entity, CoverSize.SMALL)
-        if url_cover and (overwrite or not small_cover_exists):
-            await self._store_cover(entity, url_cover, CoverSize.SMALL)
-            small_cover_exists = self.cover_exists(entity, CoverSize.SMALL)
+        missing_sizes = [
+            size
+            for size in (CoverSize.SMALL, CoverSize.BIG)
+            if overwrite or not self.cover_exists(entity, size)
+        ]
+        if url_cover and missing_sizes:
+            await self._store_cover(entity, url_cover, missing_sizes, cover_stats)
 
         path_cover_s = (
             self._get_cover_path(entity, CoverSize.SMALL)
-            if small_cover_exists
+            if self.cover_exists(entity, CoverSize.SMALL)
             else None
         )
-
-        big_cover_exists = self.cover_exists(entity, CoverSize.BIG)
-        if url_cover and (overwrite or not big_cover_exists):
-            await self._store_cover(entity, url_cover, CoverSize.BIG)
-            big_cover_exists = self.cover_exists(entity, CoverSize.BIG)
-
         path_cover_l = (
-            self._get_cover_path(entity, CoverSize.BIG) if big_cover_exists else None
+            self._get_cover_path(entity, CoverSize.BIG)
+            if self.cover_exists(entity, CoverSize.BIG)
+            else None
         )
 
         return path_cover_s, path_cover_l
@@ -14,7 +14,11 @@ from typing import IO, Any, Final, Literal, TypedDict
 import magic
 import py7zr
 import zipfile_inflate64  # trunk-ignore(ruff/F401): Patches zipfile to support Enhanced Deflate
-from adapters.services.rahasher import RAHasherService
+from adapters.services.rahasher import (
+    RA_WHOLE_FILE_MD5_MAX_SIZE,
+    RA_WHOLE_FILE_MD5_PLATFORM_IDS,
+    RAHasherService,
+)
 from config import LIBRARY_BASE_PATH
 from config.config_manager import config_manager as cm
 from exceptions.fs_exceptions import (
@@ -41,6 +45,8 @@ from .base_handler import (
     TAG_REGEX,
     FSHandler,
 )
+from .hash_cache import RomHashCache, get_file_fingerprints
+from .hashing_engine import HashingEngine
 
 # Known compressed file MIME types
 COMPRESSED_MIME_TYPES: Final = frozenset(
@@ -115,6 +121,14 @@ class FileHash(TypedDict):
     sha1_hash: str
 
 
+class RomHashes(TypedDict):
+    files: list[FileHash]
+    crc_hash: str
+    md5_hash: str
+    sha1_hash: str
+    bytes_read: int
+
+
 def is_compressed_file(file_path: str) -> bool:
     mime = magic.Magic(mime=True)
     file_type = mime.from_file(file_path)
@@ -124,30 +138,36 @@ def is_compressed_file(file_path: str) -> bool:
     )
 
 
-def read_basic_file(file_path: os.PathLike[str]) -> Iterator[bytes]:
+def read_basic_file(
+    file_path: os.PathLike[str], chunk_size: int = FILE_READ_CHUNK_SIZE
+) -> Iterator[bytes]:
     with open(file_path, "rb") as f:
-        while chunk := f.read(FILE_READ_CHUNK_SIZE):
+        while chunk := f.read(chunk_size):
             yield chunk
 
 
-def read_zip_file(file: str | os.PathLike[str] | IO[bytes]) -> Iterator[bytes]:
+def read_zip_file(
+    file: str | os.PathLike[str] | IO[bytes], chunk_size: int = FILE_READ_CHUNK_SIZE
+) -> Iterator[bytes]:
     try:
         with zipfile.ZipFile(file, "r") as z:
             for file in z.namelist():
                 with z.open(file, "r") as f:
-                    while chunk := f.read(FILE_READ_CHUNK_SIZE):
+                    while chunk := f.read(chunk_size):
                         yield chunk
 
                     # We only need to read the first file in the archive
                     return
     except zipfile.BadZipFile:
         if isinstance(file, Path):
-            for chunk in read_basic_file(file):
+            for chunk in read_basic_file(file, chunk_size):
                 yield chunk
 
 
 def read_tar_file(
-    file_path: Path, mode: Literal["r", "r:*", "r:", "r:gz", "r:bz2", "r:xz"] = "r"
+    file_path: Path,
+    mode: Literal["r", "r:*", "r:", "r:gz", "r:bz2", "r:xz"] = "r",
+    chunk_size: int = FILE_READ_CHUNK_SIZE,
 ) -> Iterator[bytes]:
     try:
         with tarfile.open(file_path, mode) as f:
@@ -161,24 +181,27 @@ def read_tar_file(
                     continue
 
                 with f.extractfile(member) as ef:  # type: ignore
-                    while chunk := ef.read(FILE_READ_CHUNK_SIZE):
+                    while chunk := ef.read(chunk_size):
                         yield chunk
 
                 # We only need to read the first file in the archive
                 return
     except tarfile.ReadError:
-        for chunk in read_basic_file(file_path):
+        for chunk in read_basic_file(file_path, chunk_size):
             yield chunk
 
 
-def read_gz_file(file_path: Path) -> Iterator[bytes]:
-    return read_tar_file(file_path, "r:gz")
+def read_gz_file(
+    file_path: Path, chunk_size: int = FILE_READ_CHUNK_SIZE
+) -> Iterator[bytes]:
+    return read_tar_file(file_path, "r:gz", chunk_size)
 
 
 def process_7z_file(
     file_path: Path,
     fn_hash_update: Callable[[bytes | bytearray], None],
     fn_hash_read: Callable[[int | None], bytes],
+    chunk_size: int = FILE_READ_CHUNK_SIZE,
 ) -> None:
     """Process a 7zip file and use the provided callables to update the calculated hashes.
 
@@ -209,17 +232,19 @@ def process_7z_file(
         PasswordRequired,
         UnsupportedCompressionMethodError,
     ):
-        for chunk in read_basic_file(file_path):
+        for chunk in read_basic_file(file_path, chunk_size):
             fn_hash_update(chunk)
 
 
-def read_bz2_file(file_path: Path) -> Iterator[bytes]:
+def read_bz2_file(
+    file_path: Path, chunk_size: int = FILE_READ_CHUNK_SIZE
+) -> Iterator[bytes]:
     try:
         with bz2.BZ2File(file_path, "rb") as f:
-            while chunk := f.read(FILE_READ_CHUNK_SIZE):
+            while chunk := f.read(chunk_size):
                 yield chunk
     except EOFError:
-        for chunk in read_basic_file(file_path):
+        for chunk in read_basic_file(file_path, chunk_size):
             yield chunk
 
 
@@ -232,9 +257,135 @@ DEFAULT_MD5_H_DIGEST = hashlib.md5(usedforsecurity=False).digest()
 DEFAULT_SHA1_H_DIGEST = hashlib.sha1(usedforsecurity=False).digest()
 
 
+def calculate_file_hashes(
+    file_path: Path,
+    rom_crc_c: int,
+    rom_md5_h: Any,
+    rom_sha1_h: Any,
+    chunk_size: int = FILE_READ_CHUNK_SIZE,
+) -> tuple[int, int, Any, Any, Any, Any]:
+    extension = Path(file_path).suffix.lower()
+    mime = magic.Magic(mime=True)
+    try:
+        file_type = mime.from_file(file_path)
+        file_type = None
+
+        crc_c = 0
+        md5_h = hashlib.md5(usedforsecurity=False)
+        sha1_h = hashlib.sha1(usedforsecurity=False)
+
+        def update_hashes(chunk: bytes | bytearray):
+            md5_h.update(chunk)
+            rom_md5_h.update(chunk)
+
+            sha1_h.update(chunk)
+            rom_sha1_h.update(chunk)
+
+            nonlocal crc_c
+            crc_c = binascii.crc32(chunk, crc_c)
+            nonlocal rom_crc_c
+            rom_crc_c = binascii.crc32(chunk, rom_crc_c)
+
+        if extension == ".zip" or file_type == "application/zip":
+            for chunk in read_zip_file(file_path, chunk_size=chunk_size):
+                update_hashes(chunk)
+
+        elif extension == ".tar" or file_type == "application/x-tar":
+            for chunk in read_tar_file(file_path, chunk_size=chunk_size):
+                update_hashes(chunk)
+
+        elif extension == ".gz" or file_type == "application/x-gzip":
+            for chunk in read_gz_file(file_path, chunk_size=chunk_size):
+                update_hashes(chunk)
+
+        elif extension == ".7z" or file_type == "application/x-7z-compressed":
+            process_7z_file(
+                file_path=file_path,
+                fn_hash_update=update_hashes,
+                fn_hash_read=lambda size: sha1_h.digest(),
+                chunk_size=chunk_size,
+            )
+
+        elif extension == ".bz2" or file_type == "application/x-bzip2":
+            for chunk in read_bz2_file(file_path, chunk_size=chunk_size):
+                update_hashes(chunk)
+
+        else:
+            for chunk in read_basic_file(file_path, chunk_size=chunk_size):
+                update_hashes(chunk)
+
+        return crc_c, rom_crc_c, md5_h, rom_md5_h, sha1_h, rom_sha1_h
+    except (FileNotFoundError, PermissionError):
+        return (
+            0,
+            rom_crc_c,
+            hashlib.md5(usedforsecurity=False),
+            rom_md5_h,
+            hashlib.sha1(usedforsecurity=False),
+            rom_sha1_h,
+        )
+
+
+def _build_file_hash(crc_c: int, md5_h: Any, sha1_h: Any) -> FileHash:
+    return FileHash(
+        crc_hash=crc32_to_hex(crc_c) if crc_c != DEFAULT_CRC_C else "",
+        md5_hash=md5_h.hexdigest() if md5_h.digest() != DEFAULT_MD5_H_DIGEST else "",
+        sha1_hash=(
+            sha1_h.hexdigest() if sha1_h.digest() != DEFAULT_SHA1_H_DIGEST else ""
+        ),
+    )
+
+
+def hash_rom_files(
+    file_paths: list[str], chunk_size: int = FILE_READ_CHUNK_SIZE
+) -> RomHashes:
+    """Calculate the hashes of each file of a rom, and of the rom as a whole.
+
+    This runs inside the hashing engine worker processes, so it must stay a module-level
+    function that only takes and returns picklable values. Files are hashed in the given
+    order, as the rom-level hashes are calculated over their concatenated contents.
+    """
+    rom_crc_c = 0
+    rom_md5_h = hashlib.md5(usedforsecurity=False)
+    rom_sha1_h = hashlib.sha1(usedforsecurity=False)
+    file_hashes: list[FileHash] = []
+    bytes_read = 0
+
+    for file_path in file_paths:
+        try:
+            crc_c, rom_crc_c, md5_h, rom_md5_h, sha1_h, rom_sha1_h = (
+                calculate_file_hashes(
+                    Path(file_path), rom_crc_c, rom_md5_h, rom_sha1_h, chunk_size
+                )
+            )
+        except zlib.error:
+            crc_c = 0
+            md5_h = hashlib.md5(usedforsecurity=False)
+            sha1_h = hashlib.sha1(usedforsecurity=False)
+
+        file_hashes.append(_build_file_hash(crc_c, md5_h, sha1_h))
+
+        try:
+            bytes_read += os.path.getsize(file_path)
+        except OSError:
+            pass
+
+    rom_hash = _build_file_hash(rom_crc_c, rom_md5_h, rom_sha1_h)
+    return RomHashes(
+        files=file_hashes,
+        crc_hash=rom_hash["crc_hash"],
+        md5_hash=rom_hash["md5_hash"],
+        sha1_hash=rom_hash["sha1_hash"],
+        bytes_read=bytes_read,
+    )
+
+
 class FSRomsHandler(FSHandler):
     def __init__(self) -> None:
         super().__init__(base_path=LIBRARY_BASE_PATH)
+        self.hashing_engine = HashingEngine()
+        self.hash_cache = RomHashCache()
+        self.ra_hasher = RAHasherService()
 
     def get_roms_fs_structure(self, fs_slug: str) -> str:
         cnfg = cm.get_config()
@@ -326,6 +477,35 @@ class FSRomsHandler(FSHandler):
             sha1_hash=file_hash["sha1_hash"],
         )
 
+    def _get_ra_hash_from_md5(
+        self,
+        ra_platform_id: int,
+        rom_file_paths: list[tuple[Path, str]],
+        rom_hashes: RomHashes,
+    ) -> str:
+        """Reuse the MD5 as the RA hash for platforms where RAHasher hashes the whole
+        file, which saves running it. Returns an empty string when it can't be reused.
+        """
+        if (
+            ra_platform_id not in RA_WHOLE_FILE_MD5_PLATFORM_IDS
+            or len(rom_file_paths) != 1
+        ):
+            return ""
+
+        file_path, file_name = rom_file_paths[0]
+        # The MD5 of archives is calculated over their decompressed content
+        if Path(file_name).suffix.lower() in COMPRESSED_FILE_EXTENSIONS:
+            return ""
+
+        try:
+            file_size = os.stat(Path(self.base_path, file_path, file_name)).st_size
+        except OSError:
+            return ""
+        if file_size > RA_WHOLE_FILE_MD5_MAX_SIZE:
+            return ""
+
+        return rom_hashes["files"][0]["md5_hash"]
+
     async def get_rom_files(self, rom: Rom) -> tuple[list[RomFile], str, str, str, str]:
         from handler.metadata.ra_handler import RA_PLATFORM_LIST
 
@@ -333,7 +513,6 @@ class FSRomsHandler(FSHandler):
             rom.platform.fs_slug
         )  # Relative path to roms
         abs_fs_path = f"{self.base_path}/{rel_roms_path}"  # Absolute path to roms
-        rom_files: list[RomFile] = []
 
         # Skip hashing games for platforms that don't have a hash database
         hashable_platform = rom.platform_slug not in NON_HASHABLE_PLATFORMS
@@ -341,19 +520,16 @@ class FSRomsHandler(FSHandler):
         excluded_file_names = cm.get_config().EXCLUDED_MULTI_PARTS_FILES
         excluded_file_exts = cm.get_config().EXCLUDED_MULTI_PARTS_EXT
 
-        rom_crc_c = 0
-        rom_md5_h = hashlib.md5(usedforsecurity=False)
-        rom_sha1_h = hashlib.sha1(usedforsecurity=False)
-        rom_ra_h = ""
+        # Relative path and name of each file that belongs to the rom
+        rom_file_paths: list[tuple[Path, str]] = []
+        ra_hasher_path: str | None = None
 
         # Check if rom is a multi-part rom
-        if os.path.isdir(f"{abs_fs_path}/{rom.fs_name}"):
+        is_multi = os.path.isdir(f"{abs_fs_path}/{rom.fs_name}")
+        if is_multi:
             # Calculate the RA hash if the platform has a slug that matches a known RA slug
             if rom.platform_slug in RA_PLATFORM_LIST.keys():
-                rom_ra_h = await RAHasherService().calculate_hash(
-                    RA_PLATFORM_LIST[rom.platform_slug]["id"],
-                    f"{abs_fs_path}/{rom.fs_name}/*",
-                )
+                ra_hasher_path = f"{abs_fs_path}/{rom.fs_name}/*"
 
             for f_path, file_name in iter_files(
                 f"{abs_fs_path}/{rom.fs_name}", recursive=True
@@ -369,100 +545,90 @@ class FSRomsHandler(FSHandler):
                 ):
                     continue
 
-                if hashable_platform:
-                    try:
-                        crc_c, rom_crc_c, md5_h, rom_md5_h, sha1_h, rom_sha1_h = (
-                            self._calculate_rom_hashes(
-                                Path(f_path, file_name),
-                                rom_crc_c,
-                                rom_md5_h,
-                                rom_sha1_h,
-                            )
-                        )
-                    except zlib.error:
-                        crc_c = 0
-                        md5_h = hashlib.md5(usedforsecurity=False)
-                        sha1_h = hashlib.sha1(usedforsecurity=False)
-
-                    file_hash = FileHash(
-                        crc_hash=crc32_to_hex(crc_c) if crc_c != DEFAULT_CRC_C else "",
-                        md5_hash=(
-                            md5_h.hexdigest()
-                            if md5_h.digest() != DEFAULT_MD5_H_DIGEST
-                            else ""
-                        ),
-                        sha1_hash=(
-                            sha1_h.hexdigest()
-                            if sha1_h.digest() != DEFAULT_SHA1_H_DIGEST
-                            else ""
-                        ),
-                    )
-                else:
-                    file_hash = FileHash(
-                        crc_hash="",
-                        md5_hash="",
-                        sha1_hash="",
-                    )
-
-                rom_files.append(
-                    self._build_rom_file(
-                        f_path.relative_to(self.base_path),
-                        file_name,
-                        file_hash,
-                    )
-                )
-        elif hashable_platform:
-            try:
-                crc_c, rom_crc_c, md5_h, rom_md5_h, sha1_h, rom_sha1_h = (
-                    self._calculate_rom_hashes(
-                        Path(abs_fs_path, rom.fs_name), rom_crc_c, rom_md5_h, rom_sha1_h
-                    )
-                )
-            except zlib.error:
-                crc_c = 0
-                md5_h = hashlib.md5(usedforsecurity=False)
-                sha1_h = hashlib.sha1(usedforsecurity=False)
+                rom_file_paths.append((f_path.relative_to(self.base_path), file_name))
+        else:
+            rom_file_paths.append((Path(rel_roms_path), rom.fs_name))
 
             # Calculate the RA hash if the platform has a slug that matches a known RA slug
-            if rom.platform_slug in RA_PLATFORM_LIST.keys():
-                rom_ra_h = await RAHasherService().calculate_hash(
-                    RA_PLATFORM_LIST[rom.platform_slug]["id"],
-                    f"{abs_fs_path}/{rom.fs_name}",
-                )
+            if hashable_platform and rom.platform_slug in RA_PLATFORM_LIST.keys():
+                ra_hasher_path = f"{abs_fs_path}/{rom.fs_name}"
 
-            file_hash = FileHash(
-                crc_hash=crc32_to_hex(crc_c) if crc_c != DEFAULT_CRC_C else "",
-                md5_hash=(
-                    md5_h.hexdigest() if md5_h.digest() != DEFAULT_MD5_H_DIGEST else ""
-                ),
-                sha1_hash=(
-                    sha1_h.hexdigest()
-                    if sha1_h.digest() != DEFAULT_SHA1_H_DIGEST
-                    else ""
-                ),
-            )
-            rom_files.append(
-                self._build_rom_file(Path(rel_roms_path), rom.fs_name, file_hash)
+        abs_file_paths = [
+            str(Path(self.base_path, file_path, file_name))
+            for file_path, file_name in rom_file_paths
+        ]
+
+        # Unchanged files reuse the hashes stored in a previous scan
+        rom_cache_path = f"{abs_fs_path}/{rom.fs_name}"
+        fingerprints = get_file_fingerprints(abs_file_paths)
+
+        if hashable_platform:
+            cached_hashes = (
+                await self.hash_cache.get_hashes(rom_cache_path, fingerprints)
+                if fingerprints is not None
+                else None
             )
+            if cached_hashes is not None:
+                rom_hashes = cached_hashes
+                self.hashing_engine.stats.cached_roms += 1
+            else:
+                rom_hashes = await self.hashing_engine.hash_rom(abs_file_paths)
+                if fingerprints is not None:
+                    await self.hash_cache.set_hashes(
+                        rom_cache_path, fingerprints, rom_hashes=rom_hashes
+                    )
         else:
-            file_hash = FileHash(
+            rom_hashes = RomHashes(
+                files=[
+                    FileHash(crc_hash="", md5_hash="", sha1_hash="")
+                    for _ in rom_file_paths
+                ],
                 crc_hash="",
                 md5_hash="",
                 sha1_hash="",
+                bytes_read=0,
+            )
+
+        rom_ra_h = ""
+        if ra_hasher_path:
+            ra_platform_id = RA_PLATFORM_LIST[rom.platform_slug]["id"]
+            if not is_multi:
+                rom_ra_h = self._get_ra_hash_from_md5(
+                    ra_platform_id, rom_file_paths, rom_hashes
+                )
+
+            cached_ra_h = (
+                await self.hash_cache.get_ra_hash(
+                    rom_cache_path, fingerprints, ra_platform_id
+                )
+                if fingerprints is not None and not rom_ra_h
+                else None
             )
-            rom_files.append(
-                self._build_rom_file(Path(rel_roms_path), rom.fs_name, file_hash)
+            if cached_ra_h is not None:
+                rom_ra_h = cached_ra_h
+            elif not rom_ra_h:
+                rom_ra_h = await self.ra_hasher.calculate_hash(
+                    ra_platform_id, ra_hasher_path
+                )
+                if rom_ra_h and fingerprints is not None:
+                    await self.hash_cache.set_hashes(
+                        rom_cache_path,
+                        fingerprints,
+                        ra_hash=(ra_platform_id, rom_ra_h),
+                    )
+
+        rom_files = [
+            self._build_rom_file(file_path, file_name, file_hash)
+            for (file_path, file_name), file_hash in zip(
+                rom_file_paths, rom_hashes["files"], strict=True
             )
+        ]
 
         return (
             rom_files,
-            crc32_to_hex(rom_crc_c) if rom_crc_c != DEFAULT_CRC_C else "",
-            rom_md5_h.hexdigest() if rom_md5_h.digest() != DEFAULT_MD5_H_DIGEST else "",
-            (
-                rom_sha1_h.hexdigest()
-                if rom_sha1_h.digest() != DEFAULT_SHA1_H_DIGEST
-                else ""
-            ),
+            rom_hashes["crc_hash"],
+            rom_hashes["md5_hash"],
+            rom_hashes["sha1_hash"],
             rom_ra_h,
         )
 
@@ -473,65 +639,9 @@ class FSRomsHandler(FSHandler):
         rom_md5_h: Any,
         rom_sha1_h: Any,
     ) -> tuple[int, int, Any, Any, Any, Any]:
-        extension = Path(file_path).suffix.lower()
-        mime = magic.Magic(mime=True)
-        try:
-            file_type = mime.from_file(file_path)
-            file_type = None
-
-            crc_c = 0
-            md5_h = hashlib.md5(usedforsecurity=False)
-            sha1_h = hashlib.sha1(usedforsecurity=False)
-
-            def update_hashes(chunk: bytes | bytearray):
-                md5_h.update(chunk)
-                rom_md5_h.update(chunk)
-
-                sha1_h.update(chunk)
-                rom_sha1_h.update(chunk)
-
-                nonlocal crc_c
-                crc_c = binascii.crc32(chunk, crc_c)
-                nonlocal rom_crc_c
-                rom_crc_c = binascii.crc32(chunk, rom_crc_c)
-
-            if extension == ".zip" or file_type == "application/zip":
-                for chunk in read_zip_file(file_path):
-                    update_hashes(chunk)
-
-            elif extension == ".tar" or file_type == "application/x-tar":
-                for chunk in read_tar_file(file_path):
-                    update_hashes(chunk)
-
-            elif extension == ".gz" or file_type == "application/x-gzip":
-                for chunk in read_gz_file(file_path):
-                    update_hashes(chunk)
-
-            elif extension == ".7z" or file_type == "application/x-7z-compressed":
-                process_7z_file(
-                    file_path=file_path,
-                    fn_hash_update=update_hashes,
-                    fn_hash_read=lambda size: sha1_h.digest(),
-                )
-
-            elif extension == ".bz2" or file_type == "application/x-bzip2":
-                for chunk in read_bz2_file(file_path):
-                    update_hashes(chunk)
-
-            else:
-                for chunk in read_basic_file(file_path):
-                    update_hashes(chunk)
-
-            return crc_c, rom_crc_c, md5_h, rom_md5_h, sha1_h, rom_sha1_h
-        except (FileNotFoundError, PermissionError):
-            return (
-                0,
-                rom_crc_c,
-                hashlib.md5(usedforsecurity=False),
-                rom_md5_h,
-                hashlib.sha1(usedforsecurity=False),
-                rom_sha1_h,
-            )
+        return calculate_file_hashes(
+            file_path, rom_crc_c, rom_md5_h, rom_sha1_h, self.hashing_engine.chunk_size
+        )
 
     async def get_roms(self, platform: Platform) -> list[FSRom]:
         """Gets all filesystem roms for a platform
@@ -0,0 +1,61 @@
+import os
+
+import pytest
+from handler.filesystem.hash_cache import RomHashCache, get_file_fingerprints
+from handler.filesystem.roms_handler import RomHashes
+
+
+class TestRomHashCache:
+    """Test suite for RomHashCache class"""
+
+    @pytest.fixture
+    def cache(self):
+        return RomHashCache()
+
+    @pytest.fixture
+    def rom_file(self, tmp_path):
+        rom_file = tmp_path / "game.bin"
+        rom_file.write_bytes(b"rom content")
+        return rom_file
+
+    @pytest.fixture
+    def rom_hashes(self):
+        return RomHashes(
+            files=[{"crc_hash": "aaaa", "md5_hash": "bbbb", "sha1_hash": "cccc"}],
+            crc_hash="aaaa",
+            md5_hash="bbbb",
+            sha1_hash="cccc",
+            bytes_read=11,
+        )
+
+    def test_get_file_fingerprints_missing_file(self, tmp_path):
+        """Test that unreadable files disable the cache for the rom"""
+        assert get_file_fingerprints([str(tmp_path / "missing.bin")]) is None
+
+    async def test_get_hashes_unchanged_file(self, cache, rom_file, rom_hashes):
+        """Test that hashes are reused while size and mtime don't change"""
+        fingerprints = get_file_fingerprints([str(rom_file)])
+        await cache.set_hashes(str(rom_file), fingerprints, rom_hashes=rom_hashes)
+
+        assert await cache.get_hashes(str(rom_file), fingerprints) == rom_hashes
+
+    async def test_get_hashes_modified_file(self, cache, rom_file, rom_hashes):
+        """Test that a modified file invalidates the cached hashes"""
+        fingerprints = get_file_fingerprints([str(rom_file)])
+        await cache.set_hashes(str(rom_file), fingerprints, rom_hashes=rom_hashes)
+
+        stat = rom_file.stat()
+        os.utime(rom_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        new_fingerprints = get_file_fingerprints([str(rom_file)])
+
+        assert await cache.get_hashes(str(rom_file), new_fingerprints) is None
+
+    async def test_ra_hash_merged_with_hashes(self, cache, rom_file, rom_hashes):
+        """Test that RA hashes are stored alongside the file hashes"""
+        fingerprints = get_file_fingerprints([str(rom_file)])
+        await cache.set_hashes(str(rom_file), fingerprints, rom_hashes=rom_hashes)
+        await cache.set_hashes(str(rom_file), fingerprints, ra_hash=(4, "dddd"))
+
+        assert await cache.get_ra_hash(str(rom_file), fingerprints, 4) == "dddd"
+        assert await cache.get_ra_hash(str(rom_file), fingerprints, 5) is None
+        assert await cache.get_hashes(str(rom_file), fingerprints) == rom_hashes
@@ -0,0 +1,91 @@
+import binascii
+import hashlib
+
+import pytest
+from handler.filesystem.hashing_engine import HashingEngine, HashingStats
+from handler.filesystem.roms_handler import hash_rom_files
+from utils.hashing import crc32_to_hex
+
+
+class TestHashingEngine:
+    """Test suite for HashingEngine class"""
+
+    @pytest.fixture
+    def engine(self):
+        engine = HashingEngine(workers=2, chunk_size=4)
+        yield engine
+        engine.shutdown()
+
+    @pytest.fixture
+    def rom_parts(self, tmp_path):
+        part_1 = tmp_path / "part1.bin"
+        part_1.write_bytes(b"first part of the rom")
+        part_2 = tmp_path / "part2.bin"
+        part_2.write_bytes(b"second part of the rom")
+        return [part_1, part_2]
+
+    def test_hash_rom_files_combines_parts_in_order(self, rom_parts):
+        """Test that rom-level hashes cover the concatenated file contents"""
+        content = b"".join(part.read_bytes() for part in rom_parts)
+
+        result = hash_rom_files([str(part) for part in rom_parts], chunk_size=4)
+
+        assert result["crc_hash"] == crc32_to_hex(binascii.crc32(content))
+        assert (
+            result["md5_hash"]
+            == hashlib.md5(content, usedforsecurity=False).hexdigest()
+        )
+        assert (
+            result["sha1_hash"]
+            == hashlib.sha1(content, usedforsecurity=False).hexdigest()
+        )
+        assert result["bytes_read"] == len(content)
+        assert [f["md5_hash"] for f in result["files"]] == [
+            hashlib.md5(part.read_bytes(), usedforsecurity=False).hexdigest()
+            for part in rom_parts
+        ]
+
+    def test_hash_rom_files_missing_file(self, tmp_path):
+        """Test that missing files produce empty hashes instead of failing"""
+        result = hash_rom_files([str(tmp_path / "missing.bin")])
+
+        assert result["files"] == [{"crc_hash": "", "md5_hash": "", "sha1_hash": ""}]
+        assert result["md5_hash"] == ""
+        assert result["bytes_read"] == 0
+
+    async def test_hash_roms_in_worker_processes(self, engine, rom_parts):
+        """Test that several roms are hashed in the pool and tracked in the stats"""
+        results = await engine.hash_roms(
+            [[str(rom_parts[0])], [str(part) for part in rom_parts]]
+        )
+
+        assert results[0] == hash_rom_files([str(rom_parts[0])])
+        assert results[1] == hash_rom_files([str(part) for part in rom_parts])
+
+        assert engine.stats.roms == 2
+        assert engine.stats.files == 3
+        assert engine.stats.bytes == rom_parts[0].stat().st_size * 2 + (
+            rom_parts[1].stat().st_size
+        )
+
+    def test_stats_since_snapshot(self, engine):
+        """Test that stats can be taken for a single run out of the shared ones"""
+        engine.stats.bytes = 1024
+        snapshot = engine.snapshot_stats()
+        engine.stats.bytes += 512
+        engine.stats.files += 1
+
+        stats = engine.stats - snapshot
+
+        assert isinstance(stats, HashingStats)
+        assert (stats.bytes, stats.files) == (512, 1)
+        assert stats.started_at == snapshot.started_at
+
+    async def test_in_use_keeps_pool_until_last_user(self, engine, rom_parts):
+        """Test that the pool is only shut down once every user is done"""
+        with engine.in_use():
+            with engine.in_use():
+                await engine.hash_rom([str(rom_parts[0])])
+            assert engine._executor is not None
+
+        assert engine._executor is None
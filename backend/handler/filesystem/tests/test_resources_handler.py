@@ -1,13 +1,15 @@
 import os
+from io import BytesIO
 from pathlib import Path
 from unittest.mock import Mock, patch
 
 import pytest
 from config import RESOURCES_BASE_PATH
 from handler.filesystem.base_handler import CoverSize
-from handler.filesystem.resources_handler import FSResourcesHandler
+from handler.filesystem.resources_handler import CoverStats, FSResourcesHandler
 from models.collection import Collection
 from models.rom import Rom
+from PIL import Image
 
 
 class TestFSResourcesHandler:
@@ -160,10 +162,10 @@ class TestFSResourcesHandler:
 
                 await handler.get_cover(rom, False, url)
 
-                # Should call _store_cover for both sizes since covers don't exist
-                assert mock_store.call_count == 2
-                mock_store.assert_any_call(rom, url, CoverSize.SMALL)
-                mock_store.assert_any_call(rom, url, CoverSize.BIG)
+                # Should download the cover once for both sizes
+                mock_store.assert_called_once_with(
+                    rom, url, [CoverSize.SMALL, CoverSize.BIG], None
+                )
 
     @pytest.mark.asyncio
     async def test_get_cover_with_overwrite(
@@ -175,10 +177,55 @@ class TestFSResourcesHandler:
         with patch.object(handler, "_store_cover") as mock_store:
             await handler.get_cover(rom, True, url)
 
-            # Should call _store_cover for both sizes regardless of existence
-            assert mock_store.call_count == 2
-            mock_store.assert_any_call(rom, url, CoverSize.SMALL)
-            mock_store.assert_any_call(rom, url, CoverSize.BIG)
+            # Should store both sizes regardless of existence
+            mock_store.assert_called_once_with(
+                rom, url, [CoverSize.SMALL, CoverSize.BIG], None
+            )
+
+    @pytest.mark.asyncio
+    async def test_get_cover_only_missing_size(
+        self, handler: FSResourcesHandler, rom: Rom
+    ):
+        """Test get_cover only stores the sizes that don't exist"""
+        url = "http://example.com/cover.png"
+
+        with patch.object(handler, "_store_cover") as mock_store:
+            with patch.object(handler, "cover_exists") as mock_exists:
+                mock_exists.side_effect = lambda _, size: size == CoverSize.BIG
+
+                await handler.get_cover(rom, False, url)
+
+                mock_store.assert_called_once_with(rom, url, [CoverSize.SMALL], None)
+
+    def test_write_covers(self, handler: FSResourcesHandler, tmp_path: Path):
+        """Test _write_covers stores every size from the same image"""
+        cover = BytesIO()
+        Image.new("RGB", (500, 1000)).save(cover, "PNG")
+        cover_stats = CoverStats()
+
+        handler._write_covers(
+            cover.getvalue(),
+            tmp_path,
+            [CoverSize.SMALL, CoverSize.BIG],
+            cover_stats,
+        )
+
+        assert (tmp_path / "big.png").read_bytes() == cover.getvalue()
+        with Image.open(tmp_path / "small.png") as small_cover:
+            assert small_cover.size == (100, 200)
+        assert cover_stats.resize_seconds > 0
+
+    def test_write_covers_big_only(self, handler: FSResourcesHandler, tmp_path: Path):
+        """Test _write_covers doesn't decode the image for the big cover alone"""
+        cover_stats = CoverStats()
+
+        with patch("handler.filesystem.resources_handler.Image.open") as mock_open:
+            handler._write_covers(b"cover", tmp_path, [CoverSize.BIG], cover_stats)
+
+        mock_open.assert_not_called()
+        assert (tmp_path / "big.png").read_bytes() == b"cover"
+        assert not (tmp_path / "small.png").exists()
+        assert cover_stats.resize_seconds == 0
 
     async def test_remove_cover_no_entity(self, handler: FSResourcesHandler):
         """Test remove_cover with no entity"""
@@ -1,6 +1,7 @@
+import asyncio
 import os
 from pathlib import Path
-from unittest.mock import Mock
+from unittest.mock import Mock, patch
 
 import pytest
 from config.config_manager import LIBRARY_BASE_PATH, Config
@@ -315,6 +316,55 @@ class TestFSRomsHandler:
                 assert rom_file.file_size_bytes > 0
                 assert rom_file.last_modified is not None
 
+    @pytest.mark.asyncio
+    async def test_get_rom_files_reuses_cached_hashes(
+        self, handler: FSRomsHandler, rom_single, config
+    ):
+        """Test that unchanged files are not hashed again"""
+        with pytest.MonkeyPatch.context() as m:
+            m.setattr("handler.filesystem.roms_handler.cm.get_config", lambda: config)
+            m.setattr("os.path.exists", lambda x: False)  # Normal structure
+
+            _, _, md5_hash, _, _ = await handler.get_rom_files(rom_single)
+
+            hash_rom = Mock(side_effect=AssertionError("Rom should not be hashed"))
+            m.setattr(handler.hashing_engine, "hash_rom", hash_rom)
+
+            rom_files, _, cached_md5_hash, _, _ = await handler.get_rom_files(
+                rom_single
+            )
+
+            hash_rom.assert_not_called()
+            assert cached_md5_hash == md5_hash
+            assert rom_files[0].md5_hash == md5_hash
+
+    def test_get_ra_hash_from_md5(self, handler: FSRomsHandler, rom_single):
+        """Test that the MD5 is reused as the RA hash only for whole-file platforms"""
+        rom_file_paths = [(Path("n64/roms"), rom_single.fs_name)]
+        rom_hashes = {"files": [FileHash(crc_hash="", md5_hash="abcd", sha1_hash="")]}
+
+        # Game Boy roms are hashed whole by RAHasher, N64 roms are byte-swapped first
+        assert handler._get_ra_hash_from_md5(4, rom_file_paths, rom_hashes) == "abcd"
+        assert handler._get_ra_hash_from_md5(2, rom_file_paths, rom_hashes) == ""
+        assert (
+            handler._get_ra_hash_from_md5(
+                4, [(Path("n64/roms"), "Paper Mario (USA).zip")], rom_hashes
+            )
+            == ""
+        )
+
+    @pytest.mark.asyncio
+    async def test_ra_hasher_timeout(self, handler: FSRomsHandler):
+        """Test that a RAHasher process running past its timeout is killed"""
+        create_subprocess_exec = asyncio.create_subprocess_exec
+
+        async def run_sleep(*args, **kwargs):
+            return await create_subprocess_exec("sleep", "10", **kwargs)
+
+        handler.ra_hasher.timeout = 0.1
+        with patch("asyncio.create_subprocess_exec", run_sleep):
+            assert await handler.ra_hasher.calculate_hash(4, "rom.gb") == ""
+
     async def test_rename_fs_rom_same_name(self, handler: FSRomsHandler):
         """Test rename_fs_rom when old and new names are the same"""
         old_name = "test_rom.n64"
@@ -1,11 +1,21 @@
+import functools
+import hashlib
+import inspect
 import json
 import os
 import re
+import time
 import unicodedata
+from collections.abc import Callable, Coroutine
 from functools import lru_cache
 from itertools import batched
-from typing import Final, NotRequired, TypedDict
+from typing import Any, Final, NotRequired, ParamSpec, TypedDict, TypeVar
 
+from config import (
+    METADATA_CACHE_ENABLED,
+    METADATA_CACHE_MAX_ENTRIES,
+    METADATA_CACHE_TTL,
+)
 from handler.redis_handler import async_cache, sync_cache
 from logger.logger import log
 from tasks.update_switch_titledb import (
@@ -57,6 +67,109 @@ NON_WORD_SPACE_PATTERN = re.compile(r"[^\w\s]")
 MULTIPLE_SPACE_PATTERN = re.compile(r"\s+")
 
 
+METADATA_CACHE_KEY: Final = "romm:metadata_cache"
+
+# Arguments that change how a request is made, but not its response
+_UNCACHED_REQUEST_ARGS: Final = frozenset(("request_timeout", "timeout"))
+
+_P = ParamSpec("_P")
+_R = TypeVar("_R")
+
+
+def _normalize_request(value: Any) -> Any:
+    if isinstance(value, str):
+        return MULTIPLE_SPACE_PATTERN.sub(" ", value).strip()
+    if isinstance(value, dict):
+        return {
+            str(k): _normalize_request(v)
+            for k, v in sorted(value.items(), key=lambda item: str(item[0]))
+            if v is not None and k not in _UNCACHED_REQUEST_ARGS
+        }
+    if isinstance(value, (list, tuple)):
+        return [_normalize_request(v) for v in value]
+    return value
+
+
+class ProviderResponseCache:
+    """Cache the responses of a metadata provider in Redis
+
+    Responses are keyed by the normalized request, so the same lookup made by
+    a rescan or a manual search is served locally until the entry expires.
+    Past `max_entries`, the oldest entries are evicted first.
+    """
+
+    def __init__(
+        self,
+        provider: str,
+        ttl: int = METADATA_CACHE_TTL,
+        max_entries: int = METADATA_CACHE_MAX_ENTRIES,
+    ) -> None:
+        self.provider = provider
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.index_key = f"{METADATA_CACHE_KEY}:{provider}:index"
+
+    def _key(self, request: Any) -> str:
+        normalized = json.dumps(_normalize_request(request), default=str)
+        digest = hashlib.sha256(normalized.encode()).hexdigest()
+        return f"{METADATA_CACHE_KEY}:{self.provider}:{digest}"
+
+    async def get(self, request: Any) -> Any | None:
+        cached_response = await async_cache.get(self._key(request))
+        return json.loads(cached_response) if cached_response else None
+
+    async def set(self, request: Any, response: Any) -> None:
+        key = self._key(request)
+        async with async_cache.pipeline() as pipe:
+            pipe.set(key, json.dumps(response), ex=self.ttl)
+            pipe.zadd(self.index_key, {key: time.time()})
+            pipe.zcard(self.index_key)
+            *_, cached_entries = await pipe.execute()
+
+        if cached_entries > self.max_entries:
+            evicted = await async_cache.zpopmin(
+                self.index_key, cached_entries - self.max_entries
+            )
+            await async_cache.delete(*(evicted_key for evicted_key, _ in evicted))
+
+    def cached(
+        self, func: Callable[_P, Coroutine[Any, Any, _R]]
+    ) -> Callable[_P, Coroutine[Any, Any, _R]]:
+        """Serve the responses of a request method from the cache
+
+        Works on methods and bound methods alike. Empty responses are not
+        cached, as providers also return them when a request fails.
+        """
+        # The instance of a method is not part of the request
+        skip_args = 0 if inspect.ismethod(func) else 1
+
+        @functools.wraps(func)
+        async def wrapper(*args: _P.args, **kwargs: _P.kwargs) -> _R:
+            if not METADATA_CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            request = [args[skip_args:], kwargs]
+            try:
+                cached_response = await self.get(request)
+            except Exception as exc:
+                log.warning(f"Unable to read the {self.provider} cache: {exc}")
+                return await func(*args, **kwargs)
+
+            if cached_response is not None:
+                return cached_response
+
+            response = await func(*args, **kwargs)
+            if response:
+                try:
+                    await self.set(request, response)
+                except Exception as exc:
+                    log.warning(f"Unable to write the {self.provider} cache: {exc}")
+
+            return response
+
+        return wrapper
+
+
 class BaseRom(TypedDict):
     name: NotRequired[str]
     summary: NotRequired[str]
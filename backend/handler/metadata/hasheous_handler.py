@@ -1,17 +1,26 @@
+import asyncio
 import json
+from collections.abc import Awaitable, Callable
 from datetime import datetime
-from typing import Any, NotRequired, TypedDict
+from typing import Any, Final, NotRequired, TypedDict
 
 import httpx
 import pydash
-from config import DEV_MODE, HASHEOUS_API_ENABLED
+from config import (
+    DEV_MODE,
+    HASHEOUS_API_ENABLED,
+    HASHEOUS_MAX_CONCURRENT_REQUESTS,
+    HASHEOUS_REQUESTS_PER_SECOND,
+    METADATA_CACHE_TTL,
+)
 from fastapi import HTTPException, status
 from logger.logger import log
 from models.rom import RomFile
 from utils import get_version
 from utils.context import ctx_httpx_client
+from utils.rate_limiter import RedisConcurrencyLimit, RedisTokenBucket
 
-from .base_hander import BaseRom, MetadataHandler
+from .base_hander import BaseRom, MetadataHandler, ProviderResponseCache
 from .igdb_handler import (
     IGDB_AGE_RATINGS,
     IGDBMetadata,
@@ -19,6 +28,11 @@ from .igdb_handler import (
 )
 from .ra_handler import RAMetadata
 
+# Lookups are by hash, so their responses rarely change
+HASHEOUS_RESPONSE_CACHE: Final = ProviderResponseCache(
+    "hasheous", ttl=METADATA_CACHE_TTL * 4
+)
+
 
 class HasheousMetadata(TypedDict):
     tosec_match: bool
@@ -116,12 +130,17 @@ class HasheousHandler(MetadataHandler):
         self.proxy_igdb_game_endpoint = f"{self.BASE_URL}/MetadataProxy/IGDB/Game"
         self.proxy_igdb_cover_endpoint = f"{self.BASE_URL}/MetadataProxy/IGDB/Cover"
         self.proxy_ra_game_endpoint = f"{self.BASE_URL}/MetadataProxy/RA/Game"
+        self.rate_limiter = RedisTokenBucket("hasheous", HASHEOUS_REQUESTS_PER_SECOND)
+        self.concurrency_limit = RedisConcurrencyLimit(
+            "hasheous", HASHEOUS_MAX_CONCURRENT_REQUESTS
+        )
         self.app_api_key = (
             "UUvh9ef_CddMM4xXO1iqxl9FqEt764v33LU-UiGFc0P34odXjMP9M6MTeE4JZRxZ"
             if DEV_MODE
             else "JNoFBA-jEh4HbxuxEHM6MVzydKoAXs9eCcp2dvcg5LRCnpp312voiWmjuaIssSzS"
         )
 
+    @HASHEOUS_RESPONSE_CACHE.cached
     async def _request(
         self,
         url: str,
@@ -162,10 +181,12 @@ class HasheousHandler(MetadataHandler):
                 request_kwargs["json"] = data
 
             # Make the request
-            res = await httpx_client.request(method, **request_kwargs)
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await httpx_client.request(method, **request_kwargs)
 
-            res.raise_for_status()
-            return res.json()
+                res.raise_for_status()
+                return res.json()
         except httpx.HTTPStatusError as exc:
             # Check if its a 404 error
             if exc.response.status_code == status.HTTP_404_NOT_FOUND:
@@ -313,17 +334,8 @@ class HasheousHandler(MetadataHandler):
             ),
         )
 
-    async def get_igdb_game(self, hasheous_rom: HasheousRom) -> HasheousRom:
-        if not HASHEOUS_API_ENABLED:
-            return hasheous_rom
-
-        igdb_id = hasheous_rom.get("igdb_id", None)
-
-        if igdb_id is None:
-            log.info("No IGDB ID provided for Hasheous IGDB game lookup.")
-            return hasheous_rom
-
-        igdb_game = await self._request(
+    async def _get_igdb_game(self, igdb_id: int) -> dict:
+        return await self._request(
             self.proxy_igdb_game_endpoint,
             params={
                 "Id": igdb_id,
@@ -332,10 +344,9 @@ class HasheousHandler(MetadataHandler):
             method="GET",
         )
 
-        if not igdb_game:
-            log.debug(f"No Hasheous game found for IGDB ID {igdb_id}.")
-            return hasheous_rom
-
+    def _merge_igdb_game(
+        self, hasheous_rom: HasheousRom, igdb_game: dict
+    ) -> HasheousRom:
         return HasheousRom(
             {
                 **hasheous_rom,
@@ -357,22 +368,43 @@ class HasheousHandler(MetadataHandler):
             }
         )
 
-    async def get_ra_game(self, hasheous_rom: HasheousRom) -> HasheousRom:
+    async def get_igdb_game(self, hasheous_rom: HasheousRom) -> HasheousRom:
         if not HASHEOUS_API_ENABLED:
             return hasheous_rom
 
-        ra_id = hasheous_rom.get("ra_id", None)
+        igdb_id = hasheous_rom.get("igdb_id", None)
 
-        if ra_id is None:
-            log.info("No RA ID provided for Hasheous RA game lookup.")
+        if igdb_id is None:
+            log.info("No IGDB ID provided for Hasheous IGDB game lookup.")
             return hasheous_rom
 
-        ra_game = await self._request(
+        igdb_game = await self._get_igdb_game(igdb_id)
+
+        if not igdb_game:
+            log.debug(f"No Hasheous game found for IGDB ID {igdb_id}.")
+            return hasheous_rom
+
+        return self._merge_igdb_game(hasheous_rom, igdb_game)
+
+    async def _get_ra_game(self, ra_id: int) -> dict:
+        return await self._request(
             self.proxy_ra_game_endpoint,
             params={"Id": ra_id},
             method="GET",
         )
 
+    async def get_ra_game(self, hasheous_rom: HasheousRom) -> HasheousRom:
+        if not HASHEOUS_API_ENABLED:
+            return hasheous_rom
+
+        ra_id = hasheous_rom.get("ra_id", None)
+
+        if ra_id is None:
+            log.info("No RA ID provided for Hasheous RA game lookup.")
+            return hasheous_rom
+
+        ra_game = await self._get_ra_game(ra_id)
+
         if not ra_game:
             log.debug(f"No Hasheous game found for RA ID {ra_id}.")
             return hasheous_rom
@@ -380,6 +412,54 @@ class HasheousHandler(MetadataHandler):
         return hasheous_rom
 
 
+class HasheousGameLookups:
+    """Shares the IGDB and RA follow-up lookups of Hasheous matches during a scan.
+
+    Each game is fetched once for the lifetime of the object, and shared by every
+    rom that matched it, such as the discs, regions and revisions of a game.
+    """
+
+    def __init__(self, handler: HasheousHandler) -> None:
+        self.handler = handler
+        self._games: dict[tuple[str, int], asyncio.Task[dict]] = {}
+
+    async def _get_game(
+        self, source: str, game_id: int, fetch: Callable[[int], Awaitable[dict]]
+    ) -> dict:
+        task = self._games.get((source, game_id))
+        if task is None:
+            task = asyncio.ensure_future(fetch(game_id))
+            self._games[(source, game_id)] = task
+
+        # Shielded so a cancelled rom doesn't cancel the lookup for the others
+        return await asyncio.shield(task)
+
+    async def get_igdb_game(self, hasheous_rom: HasheousRom) -> HasheousRom:
+        igdb_id = hasheous_rom.get("igdb_id", None)
+        if not HASHEOUS_API_ENABLED or igdb_id is None:
+            return await self.handler.get_igdb_game(hasheous_rom)
+
+        igdb_game = await self._get_game("igdb", igdb_id, self.handler._get_igdb_game)
+
+        if not igdb_game:
+            log.debug(f"No Hasheous game found for IGDB ID {igdb_id}.")
+            return hasheous_rom
+
+        return self.handler._merge_igdb_game(hasheous_rom, igdb_game)
+
+    async def get_ra_game(self, hasheous_rom: HasheousRom) -> HasheousRom:
+        ra_id = hasheous_rom.get("ra_id", None)
+        if not HASHEOUS_API_ENABLED or ra_id is None:
+            return await self.handler.get_ra_game(hasheous_rom)
+
+        ra_game = await self._get_game("ra", ra_id, self.handler._get_ra_game)
+
+        if not ra_game:
+            log.debug(f"No Hasheous game found for RA ID {ra_id}.")
+
+        return hasheous_rom
+
+
 class SlugToHasheousId(TypedDict):
     id: int
     name: str
@@ -1,17 +1,26 @@
+import asyncio
 import functools
 import json
 import re
+from collections.abc import Awaitable, Callable
 from typing import Final, NotRequired, TypedDict
 
 import httpx
 import pydash
 from adapters.services.igdb_types import GameType
-from config import IGDB_CLIENT_ID, IGDB_CLIENT_SECRET, IS_PYTEST_RUN
+from config import (
+    IGDB_CLIENT_ID,
+    IGDB_CLIENT_SECRET,
+    IGDB_MAX_CONCURRENT_REQUESTS,
+    IGDB_REQUESTS_PER_SECOND,
+    IS_PYTEST_RUN,
+)
 from fastapi import HTTPException, status
 from handler.redis_handler import async_cache
 from logger.logger import log
 from unidecode import unidecode as uc
 from utils.context import ctx_httpx_client
+from utils.rate_limiter import RedisConcurrencyLimit, RedisTokenBucket
 
 from .base_hander import (
     PS2_OPL_REGEX,
@@ -20,6 +29,7 @@ from .base_hander import (
     SWITCH_TITLEDB_REGEX,
     BaseRom,
     MetadataHandler,
+    ProviderResponseCache,
 )
 
 # Used to display the IGDB API status in the frontend
@@ -31,6 +41,13 @@ PSP_IGDB_ID: Final = 38
 SWITCH_IGDB_ID: Final = 130
 ARCADE_IGDB_IDS: Final = [52, 79, 80]
 
+# https://api-docs.igdb.com/#rate-limits
+# https://api-docs.igdb.com/#multi-query
+MULTIQUERY_MAX_QUERIES: Final = 10
+MULTIQUERY_BATCH_WINDOW: Final = 0.05  # seconds
+
+IGDB_RESPONSE_CACHE: Final = ProviderResponseCache("igdb")
+
 
 class IGDBPlatform(TypedDict):
     slug: str
@@ -205,6 +222,96 @@ def extract_metadata_from_igdb_rom(self: MetadataHandler, rom: dict) -> IGDBMeta
     )
 
 
+class IGDBMultiQueryBatcher:
+    """Coalesce concurrent IGDB queries into multiquery requests.
+
+    Queries made while another request is in flight are held for a short window and
+    sent as sub-queries of a single request, up to `max_queries` per request, so
+    concurrent lookups from a scan share both the rate limit and the API quota.
+    Otherwise, queries are sent right away, along with the ones made in the same
+    iteration of the event loop.
+    """
+
+    def __init__(
+        self,
+        send: Callable[[str], Awaitable[list]],
+        max_queries: int = MULTIQUERY_MAX_QUERIES,
+        window: float = MULTIQUERY_BATCH_WINDOW,
+    ) -> None:
+        self._send = send
+        self.max_queries = max_queries
+        self.window = window
+        self._pending: list[tuple[str, str, asyncio.Future[list]]] = []
+        self._flush_handle: asyncio.Handle | None = None
+        self._tasks: set[asyncio.Task] = set()
+
+    async def query(self, endpoint: str, data: str) -> list:
+        """Queue a query for the next multiquery request
+
+        Args:
+            endpoint: Name of the API endpoint, e.g. "games"
+            data: Apicalypse query, including its limit
+        Returns:
+            The results of the query
+        """
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future[list] = loop.create_future()
+        self._pending.append((endpoint, data, future))
+
+        if len(self._pending) >= self.max_queries:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = (
+                loop.call_later(self.window, self._flush)
+                if self._tasks
+                else loop.call_soon(self._flush)
+            )
+
+        return await future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        while self._pending:
+            batch = self._pending[: self.max_queries]
+            self._pending = self._pending[self.max_queries :]
+
+            task = asyncio.ensure_future(self._send_batch(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send_batch(self, batch: list[tuple[str, str, asyncio.Future[list]]]):
+        content = "".join(
+            f'query {endpoint} "{index}" {{ {data} }};\n'
+            for index, (endpoint, data, _future) in enumerate(batch)
+        )
+
+        try:
+            response = await self._send(content)
+        except Exception as exc:
+            for *_, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        # A single invalid sub-query fails the whole request, so retry them one by one
+        if not response and len(batch) > 1:
+            for item in batch:
+                await self._send_batch([item])
+            return
+
+        results = {
+            item.get("name"): item.get("result", [])
+            for item in response
+            if isinstance(item, dict)
+        }
+        for index, (*_, future) in enumerate(batch):
+            if not future.done():
+                future.set_result(results.get(str(index), []))
+
+
 class IGDBHandler(MetadataHandler):
     def __init__(self) -> None:
         self.BASE_URL = "https://api.igdb.com/v4"
@@ -216,7 +323,13 @@ class IGDBHandler(MetadataHandler):
         self.games_fields = GAMES_FIELDS
         self.search_endpoint = f"{self.BASE_URL}/search"
         self.search_fields = SEARCH_FIELDS
+        self.multiquery_endpoint = f"{self.BASE_URL}/multiquery"
         self.pagination_limit = 200
+        self.rate_limiter = RedisTokenBucket("igdb", IGDB_REQUESTS_PER_SECOND)
+        self.concurrency_limit = RedisConcurrencyLimit(
+            "igdb", IGDB_MAX_CONCURRENT_REQUESTS
+        )
+        self.multiquery_batcher = IGDBMultiQueryBatcher(self._multiquery)
         self.twitch_auth = TwitchAuth()
         self.headers = {
             "Client-ID": IGDB_CLIENT_ID,
@@ -233,7 +346,17 @@ class IGDBHandler(MetadataHandler):
 
         return wrapper
 
+    @IGDB_RESPONSE_CACHE.cached
     async def _request(self, url: str, data: str) -> list:
+        endpoint = url.removeprefix(f"{self.BASE_URL}/")
+        return await self.multiquery_batcher.query(
+            endpoint, f"{data} limit {self.pagination_limit};"
+        )
+
+    async def _multiquery(self, content: str) -> list:
+        return await self._post(self.multiquery_endpoint, content)
+
+    async def _post(self, url: str, content: str) -> list:
         httpx_client = ctx_httpx_client.get()
         masked_headers = {}
 
@@ -243,18 +366,20 @@ class IGDBHandler(MetadataHandler):
                 "API request: URL=%s, Headers=%s, Content=%s, Timeout=%s",
                 url,
                 masked_headers,
-                f"{data} limit {self.pagination_limit};",
+                content,
                 120,
             )
-            res = await httpx_client.post(
-                url,
-                content=f"{data} limit {self.pagination_limit};",
-                headers=self.headers,
-                timeout=120,
-            )
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await httpx_client.post(
+                    url,
+                    content=content,
+                    headers=self.headers,
+                    timeout=120,
+                )
 
-            res.raise_for_status()
-            return res.json()
+                res.raise_for_status()
+                return res.json()
         except httpx.LocalProtocolError as exc:
             if str(exc) == "Illegal header value b'Bearer '":
                 log.critical("IGDB Error: Invalid IGDB_CLIENT_ID or IGDB_CLIENT_SECRET")
@@ -297,17 +422,19 @@ class IGDBHandler(MetadataHandler):
                 "Making a second attempt API request: URL=%s, Headers=%s, Content=%s, Timeout=%s",
                 url,
                 masked_headers,
-                f"{data} limit {self.pagination_limit};",
+                content,
                 120,
             )
-            res = await httpx_client.post(
-                url,
-                content=f"{data} limit {self.pagination_limit};",
-                headers=self.headers,
-                timeout=120,
-            )
-            res.raise_for_status()
-            return res.json()
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await httpx_client.post(
+                    url,
+                    content=content,
+                    headers=self.headers,
+                    timeout=120,
+                )
+                res.raise_for_status()
+                return res.json()
         except (httpx.HTTPError, json.decoder.JSONDecodeError) as exc:
             # Log the error and return an empty list if the request fails again
             log.error(exc)
@@ -579,14 +706,15 @@ class IGDBHandler(MetadataHandler):
         if not platform_igdb_id:
             return []
 
-        matched_roms = await self._request(
-            self.games_endpoint,
-            data=f'search "{uc(search_term)}"; fields {",".join(self.games_fields)}; where platforms=[{platform_igdb_id}];',
-        )
-
-        alternative_matched_roms = await self._request(
-            self.search_endpoint,
-            data=f'fields {",".join(self.search_fields)}; where game.platforms=[{platform_igdb_id}] & (name ~ *"{search_term}"* | alternative_name ~ *"{search_term}"*);',
+        matched_roms, alternative_matched_roms = await asyncio.gather(
+            self._request(
+                self.games_endpoint,
+                data=f'search "{uc(search_term)}"; fields {",".join(self.games_fields)}; where platforms=[{platform_igdb_id}];',
+            ),
+            self._request(
+                self.search_endpoint,
+                data=f'fields {",".join(self.search_fields)}; where game.platforms=[{platform_igdb_id}] & (name ~ *"{search_term}"* | alternative_name ~ *"{search_term}"*);',
+            ),
         )
 
         if alternative_matched_roms:
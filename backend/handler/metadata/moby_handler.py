@@ -15,8 +15,11 @@ from .base_hander import (
     SWITCH_TITLEDB_REGEX,
     BaseRom,
     MetadataHandler,
+    ProviderResponseCache,
 )
 
+MOBYGAMES_RESPONSE_CACHE: Final = ProviderResponseCache("mobygames")
+
 # Used to display the Mobygames API status in the frontend
 MOBY_API_ENABLED: Final = bool(MOBYGAMES_API_KEY)
 
@@ -69,9 +72,15 @@ def extract_metadata_from_moby_rom(rom: MobyGame) -> MobyMetadata:
     )
 
 
+class CachedMobyGamesService(MobyGamesService):
+    @MOBYGAMES_RESPONSE_CACHE.cached
+    async def _request(self, url: str, request_timeout: int = 120) -> dict:
+        return await super()._request(url, request_timeout)
+
+
 class MobyGamesHandler(MetadataHandler):
     def __init__(self) -> None:
-        self.moby_service = MobyGamesService()
+        self.moby_service = CachedMobyGamesService()
 
     async def _search_rom(
         self, search_term: str, platform_moby_id: int
@@ -1,15 +1,28 @@
 import json
 from enum import Enum
-from typing import NotRequired, TypedDict
+from typing import Final, NotRequired, TypedDict
 
 import httpx
 import yarl
-from config import PLAYMATCH_API_ENABLED
+from config import (
+    METADATA_CACHE_TTL,
+    PLAYMATCH_API_ENABLED,
+    PLAYMATCH_MAX_CONCURRENT_REQUESTS,
+    PLAYMATCH_REQUESTS_PER_SECOND,
+)
 from fastapi import HTTPException, status
 from logger.logger import log
 from models.rom import RomFile
 from utils import get_version
 from utils.context import ctx_httpx_client
+from utils.rate_limiter import RedisConcurrencyLimit, RedisTokenBucket
+
+from .base_hander import ProviderResponseCache
+
+# Lookups are by hash, so their responses rarely change
+PLAYMATCH_RESPONSE_CACHE: Final = ProviderResponseCache(
+    "playmatch", ttl=METADATA_CACHE_TTL * 4
+)
 
 
 class PlaymatchProvider(str, Enum):
@@ -46,7 +59,12 @@ class PlaymatchHandler:
     def __init__(self):
         self.base_url = "https://playmatch.retrorealm.dev/api"
         self.identify_url = f"{self.base_url}/identify/ids"
+        self.rate_limiter = RedisTokenBucket("playmatch", PLAYMATCH_REQUESTS_PER_SECOND)
+        self.concurrency_limit = RedisConcurrencyLimit(
+            "playmatch", PLAYMATCH_MAX_CONCURRENT_REQUESTS
+        )
 
+    @PLAYMATCH_RESPONSE_CACHE.cached
     async def _request(self, url: str, query: dict) -> dict:
         """
         Sends a Request to Playmatch API.
@@ -77,11 +95,13 @@ class PlaymatchHandler:
         }
 
         try:
-            res = await httpx_client.get(
-                str(url_with_query), headers=headers, timeout=60
-            )
-            res.raise_for_status()
-            return res.json()
+            async with self.concurrency_limit.slot():
+                await self.rate_limiter.acquire()
+                res = await httpx_client.get(
+                    str(url_with_query), headers=headers, timeout=60
+                )
+                res.raise_for_status()
+                return res.json()
         except httpx.HTTPStatusError as exc:
             log.warning("Connection error: can't connect to Playmatch", exc_info=True)
             raise HTTPException(
@@ -1,8 +1,10 @@
 import json
 import os
 import time
+from collections.abc import Awaitable
 from datetime import datetime
-from typing import Final, NotRequired, TypedDict
+from itertools import batched
+from typing import Final, NotRequired, TypedDict, cast
 
 import pydash
 from adapters.services.retroachievements import RetroAchievementsService
@@ -15,6 +17,8 @@ from config import (
     RETROACHIEVEMENTS_API_KEY,
 )
 from handler.filesystem import fs_resource_handler
+from handler.redis_handler import async_cache
+from logger.logger import log
 from models.rom import Rom
 
 from .base_hander import BaseRom, MetadataHandler
@@ -22,6 +26,11 @@ from .base_hander import BaseRom, MetadataHandler
 # Used to display the Retroachievements API status in the frontend
 RA_API_ENABLED: Final = bool(RETROACHIEVEMENTS_API_KEY)
 
+# Hash -> game entry, per platform, rebuilt whenever the hashes file is refreshed
+RA_HASHES_INDEX_KEY: Final = "romm:ra_hashes_index"
+# Field set on every index, so platforms without any hashes count as indexed too
+RA_HASHES_INDEX_BUILT_FIELD: Final = "_built"
+
 
 class RAGamesPlatform(TypedDict):
     slug: str
@@ -142,10 +151,44 @@ class RAHandler(MetadataHandler):
         full_path = fs_resource_handler.validate_path(file_path)
         return int((time.time() - os.path.getmtime(full_path)) / (24 * 3600))
 
+    def _get_hashes_index_key(self, platform_id: int) -> str:
+        return f"{RA_HASHES_INDEX_KEY}:{platform_id}"
+
+    async def _build_hashes_index(
+        self, platform_id: int, roms: list[RAGameListItem]
+    ) -> None:
+        start = time.perf_counter()
+        index_key = self._get_hashes_index_key(platform_id)
+        index_data = {
+            ra_hash: json.dumps({k: v for k, v in r.items() if k != "Hashes"})
+            for r in roms
+            for ra_hash in r.get("Hashes", ())
+        }
+
+        async with async_cache.pipeline(transaction=True) as pipe:
+            pipe.delete(index_key)
+            pipe.hset(index_key, RA_HASHES_INDEX_BUILT_FIELD, "1")
+            for data_batch in batched(index_data.items(), 2000, strict=False):
+                pipe.hset(index_key, mapping=dict(data_batch))
+            await pipe.execute()
+
+        try:
+            memory_usage = await async_cache.memory_usage(index_key) or 0
+        except Exception:
+            # Not every Redis-compatible server implements MEMORY USAGE
+            memory_usage = 0
+
+        log.info(
+            f"Indexed {len(index_data)} RetroAchievements hashes for platform {platform_id} "
+            f"in {time.perf_counter() - start:.2f}s ({memory_usage / 1024:.1f} KiB)"
+        )
+
     async def _search_rom(self, rom: Rom, ra_hash: str) -> RAGameListItem | None:
         if not rom.platform.ra_id:
             return None
 
+        index_key = self._get_hashes_index_key(rom.platform.id)
+
         # Fetch all hashes for specific platform
         roms: list[RAGameListItem]
         if (
@@ -170,18 +213,24 @@ class RAHandler(MetadataHandler):
                 platform_resources_path,
                 self.HASHES_FILE_NAME,
             )
-        else:
+            await self._build_hashes_index(rom.platform.id, roms)
+        elif not await async_cache.exists(index_key):
             # Read the roms result from the JSON file
             json_file_bytes = await fs_resource_handler.read_file(
                 self._get_hashes_file_path(rom.platform.id)
             )
             roms = json.loads(json_file_bytes.decode("utf-8"))
+            await self._build_hashes_index(rom.platform.id, roms)
 
-        for r in roms:
-            if ra_hash in r.get("Hashes", ()):
-                return r
+        start = time.perf_counter()
+        index_entry = await cast(
+            Awaitable[bytes | None], async_cache.hget(index_key, ra_hash)
+        )
+        log.debug(
+            f"RetroAchievements hash lookup took {(time.perf_counter() - start) * 1000:.2f}ms"
+        )
 
-        return None
+        return json.loads(index_entry) if index_entry else None
 
     def get_platform(self, slug: str) -> RAGamesPlatform:
         platform = RA_PLATFORM_LIST.get(slug.lower(), None)
@@ -7,11 +7,13 @@ from config import STEAMGRIDDB_API_KEY
 from Levenshtein import distance as levenshtein_distance
 from logger.logger import log
 
-from .base_hander import MetadataHandler
+from .base_hander import MetadataHandler, ProviderResponseCache
 
 # Used to display the Mobygames API status in the frontend
 STEAMGRIDDB_API_ENABLED: Final = bool(STEAMGRIDDB_API_KEY)
 
+SGDB_RESPONSE_CACHE: Final = ProviderResponseCache("steamgriddb")
+
 
 class SGDBResource(TypedDict):
     thumb: str
@@ -29,9 +31,15 @@ class SGDBRom(TypedDict):
     url_cover: NotRequired[str]
 
 
+class CachedSteamGridDBService(SteamGridDBService):
+    @SGDB_RESPONSE_CACHE.cached
+    async def _request(self, url: str, request_timeout: int = 120) -> dict:
+        return await super()._request(url, request_timeout)
+
+
 class SGDBBaseHandler(MetadataHandler):
     def __init__(self) -> None:
-        self.sgdb_service = SteamGridDBService()
+        self.sgdb_service = CachedSteamGridDBService()
         self.max_levenshtein_distance: Final = 4
 
     async def get_details(self, search_term: str) -> list[SGDBResult]:
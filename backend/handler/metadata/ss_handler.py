@@ -17,8 +17,11 @@ from .base_hander import (
     SWITCH_TITLEDB_REGEX,
     BaseRom,
     MetadataHandler,
+    ProviderResponseCache,
 )
 
+SS_RESPONSE_CACHE: Final = ProviderResponseCache("screenscraper")
+
 # Used to display the Screenscraper API status in the frontend
 SS_API_ENABLED: Final = bool(SCREENSCRAPER_USER) and bool(SCREENSCRAPER_PASSWORD)
 SS_DEV_ID: Final = base64.b64decode("enVyZGkxNQ==").decode()
@@ -271,9 +274,15 @@ def extract_metadata_from_ss_rom(rom: SSGame) -> SSMetadata:
     )
 
 
+class CachedScreenScraperService(ScreenScraperService):
+    @SS_RESPONSE_CACHE.cached
+    async def _request(self, url: str, request_timeout: int = 120) -> dict:
+        return await super()._request(url, request_timeout)
+
+
 class SSHandler(MetadataHandler):
     def __init__(self) -> None:
-        self.ss_service = ScreenScraperService()
+        self.ss_service = CachedScreenScraperService()
 
     async def _search_rom(self, search_term: str, platform_ss_id: int) -> SSGame | None:
         if not platform_ss_id:
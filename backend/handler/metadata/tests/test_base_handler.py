@@ -0,0 +1,69 @@
+from handler.metadata.base_hander import ProviderResponseCache
+from handler.redis_handler import async_cache
+
+
+class TestProviderResponseCache:
+    """Test suite for ProviderResponseCache class"""
+
+    async def test_cached_method_is_served_from_cache(self):
+        """Test that the same normalized request only reaches the provider once"""
+        cache = ProviderResponseCache("test_served")
+
+        class Provider:
+            def __init__(self) -> None:
+                self.requests: list[str] = []
+
+            @cache.cached
+            async def _request(self, url: str, data: str) -> list:
+                self.requests.append(data)
+                return [{"id": 1}]
+
+        provider = Provider()
+        first = await provider._request("games", "fields  id;\n where id=1;")
+        second = await provider._request("games", "fields id; where id=1;")
+
+        assert first == second == [{"id": 1}]
+        assert len(provider.requests) == 1
+
+    async def test_cached_bound_method_ignores_timeouts(self):
+        """Test wrapping a bound method, keyed without the request timeout"""
+        cache = ProviderResponseCache("test_bound")
+        requests: list[str] = []
+
+        class Service:
+            async def _request(self, url: str, request_timeout: int = 120) -> dict:
+                requests.append(url)
+                return {"games": []}
+
+        request = cache.cached(Service()._request)
+        await request("https://example.com/games?id=1", request_timeout=10)
+        await request("https://example.com/games?id=1", request_timeout=60)
+
+        assert requests == ["https://example.com/games?id=1"]
+
+    async def test_empty_responses_are_not_cached(self):
+        """Test that failed or empty lookups are retried"""
+        cache = ProviderResponseCache("test_empty")
+        requests: list[dict] = []
+
+        @cache.cached
+        async def request(self, query: dict) -> dict:
+            requests.append(query)
+            return {}
+
+        await request(None, {"md5": "abc"})
+        await request(None, {"md5": "abc"})
+
+        assert len(requests) == 2
+
+    async def test_oldest_entries_are_evicted(self):
+        """Test that the cache doesn't grow past its size limit"""
+        cache = ProviderResponseCache("test_evicted", max_entries=2)
+
+        for i in range(3):
+            await cache.set(["games", i], {"id": i})
+
+        assert await cache.get(["games", 0]) is None
+        assert await cache.get(["games", 1]) == {"id": 1}
+        assert await cache.get(["games", 2]) == {"id": 2}
+        assert await async_cache.zcard(cache.index_key) == 2
@@ -0,0 +1,68 @@
+import asyncio
+from unittest.mock import AsyncMock, Mock, patch
+
+import pytest
+from handler.metadata.hasheous_handler import HasheousGameLookups, HasheousHandler
+
+
+def _rom_files(md5_hash: str) -> list[Mock]:
+    return [
+        Mock(
+            file_size_bytes=1024,
+            file_extension="sfc",
+            md5_hash=md5_hash,
+            sha1_hash=None,
+            crc_hash=None,
+        )
+    ]
+
+
+def _hasheous_game(url: str, params: dict, data: dict | None = None, **kwargs) -> dict:
+    if data is not None:
+        game_id = {"aaaa": 1, "bbbb": 2}[data["mD5"]]
+        return {
+            "id": game_id,
+            "name": f"Game {game_id}",
+            "metadata": [{"source": "IGDB", "immutableId": "100"}],
+        }
+
+    return {"id": params["Id"], "name": "IGDB Game", "slug": "igdb-game"}
+
+
+class TestHasheousGameLookups:
+    """Test suite for HasheousGameLookups"""
+
+    @pytest.fixture(autouse=True)
+    def enable_api(self):
+        with patch("handler.metadata.hasheous_handler.HASHEOUS_API_ENABLED", True):
+            yield
+
+    @pytest.fixture
+    def handler(self):
+        handler = HasheousHandler()
+        handler._request = AsyncMock(side_effect=_hasheous_game)  # type: ignore[method-assign]
+        return handler
+
+    async def test_shares_follow_up_lookups(self, handler):
+        """Test that roms matching the same game fetch it once"""
+        games = HasheousGameLookups(handler)
+        roms = [
+            await handler.lookup_rom("snes", _rom_files(md5_hash))
+            for md5_hash in ("aaaa", "bbbb", "aaaa")
+        ]
+        assert handler._request.await_count == 3
+
+        igdb_roms = await asyncio.gather(*(games.get_igdb_game(rom) for rom in roms))
+
+        assert [rom["slug"] for rom in igdb_roms] == ["igdb-game"] * 3
+        assert [rom["hasheous_id"] for rom in igdb_roms] == [1, 2, 1]
+        assert handler._request.await_count == 4
+
+    async def test_without_game_id(self, handler):
+        """Test that a rom without a game id is returned as is"""
+        games = HasheousGameLookups(handler)
+        rom = await handler.lookup_rom("snes", [])
+
+        assert await games.get_igdb_game(rom) == rom
+        assert await games.get_ra_game(rom) == rom
+        handler._request.assert_not_awaited()
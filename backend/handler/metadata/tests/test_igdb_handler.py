@@ -0,0 +1,202 @@
+import asyncio
+import re
+from unittest.mock import patch
+
+import httpx
+import pytest
+from handler.metadata.igdb_handler import IGDBHandler, IGDBMultiQueryBatcher
+from utils.context import ctx_httpx_client, set_context_var
+from utils.rate_limiter import TokenBucket
+
+SUB_QUERY_REGEX = re.compile(r'^query (\w+) "(\d+)" \{ (.*) \};$', re.MULTILINE)
+
+
+class TestIGDBMultiQueryBatcher:
+    """Test suite for IGDBMultiQueryBatcher class"""
+
+    async def test_concurrent_queries_share_a_request(self):
+        """Test that concurrent queries are sent as sub-queries of one request"""
+        requests: list[str] = []
+
+        async def send(content: str) -> list:
+            requests.append(content)
+            return [
+                {"name": str(i), "result": [{"id": i}]}
+                for i in range(content.count("query "))
+            ]
+
+        batcher = IGDBMultiQueryBatcher(send, max_queries=10, window=0.01)
+        results = await asyncio.gather(
+            *(batcher.query("games", f"where id={i}; limit 1;") for i in range(3))
+        )
+
+        assert results == [[{"id": 0}], [{"id": 1}], [{"id": 2}]]
+        assert len(requests) == 1
+        assert 'query games "1" { where id=1; limit 1; };' in requests[0]
+
+    async def test_single_query_is_sent_right_away(self):
+        """Test that a query doesn't wait for others when no request is in flight"""
+
+        async def send(content: str) -> list:
+            return [{"name": "0", "result": [{"id": 1}]}]
+
+        batcher = IGDBMultiQueryBatcher(send, max_queries=10, window=10)
+        result = await asyncio.wait_for(batcher.query("games", "where id=1;"), 1)
+
+        assert result == [{"id": 1}]
+
+    async def test_queries_wait_for_the_request_in_flight(self):
+        """Test that queries made during a request are sent together after it"""
+        requests: list[str] = []
+        in_flight = asyncio.Event()
+        release = asyncio.Event()
+
+        async def send(content: str) -> list:
+            requests.append(content)
+            in_flight.set()
+            await release.wait()
+            return [
+                {"name": str(i), "result": []} for i in range(content.count("query "))
+            ]
+
+        batcher = IGDBMultiQueryBatcher(send, max_queries=10, window=0.01)
+        first = asyncio.ensure_future(batcher.query("games", "where id=1;"))
+        await in_flight.wait()
+        others = asyncio.gather(
+            batcher.query("games", "where id=2;"),
+            batcher.query("games", "where id=3;"),
+        )
+        release.set()
+        await asyncio.gather(first, others)
+
+        assert [r.count("query ") for r in requests] == [1, 2]
+
+    async def test_batches_are_capped(self):
+        """Test that no request has more sub-queries than allowed"""
+        requests: list[str] = []
+
+        async def send(content: str) -> list:
+            requests.append(content)
+            return [
+                {"name": str(i), "result": []} for i in range(content.count("query "))
+            ]
+
+        batcher = IGDBMultiQueryBatcher(send, max_queries=10, window=0.01)
+        await asyncio.gather(
+            *(batcher.query("games", "fields id; limit 1;") for _ in range(25))
+        )
+
+        assert [r.count("query ") for r in requests] == [10, 10, 5]
+
+    async def test_failed_batch_retries_queries_individually(self):
+        """Test that an invalid sub-query doesn't fail the rest of the batch"""
+
+        async def send(content: str) -> list:
+            if "invalid" in content:
+                return []
+            return [{"name": "0", "result": [{"id": 1}]}]
+
+        batcher = IGDBMultiQueryBatcher(send, max_queries=10, window=0.01)
+        valid, invalid = await asyncio.gather(
+            batcher.query("games", "where id=1;"),
+            batcher.query("games", "invalid"),
+        )
+
+        assert valid == [{"id": 1}]
+        assert invalid == []
+
+
+class TestIGDBHandlerMultiQuery:
+    """Test suite for the multiquery requests sent by IGDBHandler"""
+
+    @pytest.fixture(autouse=True)
+    def disable_response_cache(self):
+        with patch("handler.metadata.base_hander.METADATA_CACHE_ENABLED", False):
+            yield
+
+    @staticmethod
+    def mock_client(requests: list[httpx.Request], status_code: int = 200):
+        """Client answering each sub-query with the id it filters on"""
+
+        def handler(request: httpx.Request) -> httpx.Response:
+            requests.append(request)
+            if status_code != 200:
+                return httpx.Response(status_code, json={"message": "error"})
+
+            return httpx.Response(
+                200,
+                json=[
+                    {
+                        "name": name,
+                        "result": [
+                            {"endpoint": endpoint, "id": int(game_id)}
+                            for game_id in re.findall(r"where id=(\d+);", query)
+                        ],
+                    }
+                    for endpoint, name, query in SUB_QUERY_REGEX.findall(
+                        request.content.decode()
+                    )
+                ],
+            )
+
+        return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    async def test_requests_share_a_multiquery(self):
+        """Test that concurrent requests are sent as one multiquery request"""
+        requests: list[httpx.Request] = []
+        igdb_handler = IGDBHandler()
+
+        async with (
+            self.mock_client(requests) as client,
+            set_context_var(ctx_httpx_client, client),
+        ):
+            games, videos = await asyncio.gather(
+                igdb_handler._request(
+                    igdb_handler.games_endpoint, "fields name; where id=3340;"
+                ),
+                igdb_handler._request(
+                    f"{igdb_handler.BASE_URL}/game_videos",
+                    "fields video_id; where id=10;",
+                ),
+            )
+
+        assert games == [{"endpoint": "games", "id": 3340}]
+        assert videos == [{"endpoint": "game_videos", "id": 10}]
+
+        assert len(requests) == 1
+        assert requests[0].method == "POST"
+        assert str(requests[0].url) == "https://api.igdb.com/v4/multiquery"
+        assert requests[0].content.decode().splitlines() == [
+            'query games "0" { fields name; where id=3340; limit 200; };',
+            'query game_videos "1" { fields video_id; where id=10; limit 200; };',
+        ]
+
+    async def test_failed_request_returns_empty_results(self):
+        """Test that an error response resolves every sub-query to no results"""
+        requests: list[httpx.Request] = []
+        igdb_handler = IGDBHandler()
+
+        async with (
+            self.mock_client(requests, status_code=400) as client,
+            set_context_var(ctx_httpx_client, client),
+        ):
+            results = await asyncio.gather(
+                igdb_handler._request(igdb_handler.games_endpoint, "where id=1;"),
+                igdb_handler._request(igdb_handler.games_endpoint, "where id=2;"),
+            )
+
+        assert results == [[], []]
+        # The batch is retried one query at a time before giving up
+        assert [r.content.decode().count("query ") for r in requests] == [2, 1, 1]
+
+
+async def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=20, capacity=2)
+    loop = asyncio.get_running_loop()
+
+    started_at = loop.time()
+    for _ in range(6):
+        await bucket.acquire()
+
+    # The first two tokens are free, the other four are refilled at 20/s
+    assert loop.time() - started_at >= 0.19
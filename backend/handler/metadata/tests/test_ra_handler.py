@@ -0,0 +1,74 @@
+import json
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from handler.metadata.ra_handler import RAHandler
+from handler.redis_handler import async_cache
+
+
+class TestRAHandler:
+    """Test suite for RAHandler class"""
+
+    @pytest.fixture
+    def handler(self):
+        return RAHandler()
+
+    @pytest.fixture
+    def rom(self):
+        rom = MagicMock()
+        rom.platform.id = 9001
+        rom.platform.ra_id = 7
+        return rom
+
+    @pytest.fixture
+    def ra_games(self):
+        return [
+            {"ID": 1, "Title": "Game 1", "Hashes": ["aaaa", "bbbb"]},
+            {"ID": 2, "Title": "Game 2", "Hashes": ["cccc"]},
+        ]
+
+    async def test_search_rom_builds_hashes_index_once(self, handler, rom, ra_games):
+        """Test that the hashes file is parsed once and lookups use the index"""
+        await async_cache.delete(handler._get_hashes_index_key(rom.platform.id))
+        read_file = AsyncMock(return_value=json.dumps(ra_games).encode("utf-8"))
+
+        with (
+            patch.object(handler, "_exists_cache_file", AsyncMock(return_value=True)),
+            patch.object(
+                handler,
+                "_days_since_last_cache_file_update",
+                AsyncMock(return_value=0),
+            ),
+            patch(
+                "handler.metadata.ra_handler.fs_resource_handler.read_file", read_file
+            ),
+        ):
+            first = await handler._search_rom(rom, "bbbb")
+            second = await handler._search_rom(rom, "cccc")
+            missing = await handler._search_rom(rom, "dddd")
+
+        assert first == {"ID": 1, "Title": "Game 1"}
+        assert second == {"ID": 2, "Title": "Game 2"}
+        assert missing is None
+        read_file.assert_awaited_once()
+
+    async def test_search_rom_indexes_platforms_without_hashes(self, handler, rom):
+        """Test that a platform without any hashes isn't parsed again on each lookup"""
+        await async_cache.delete(handler._get_hashes_index_key(rom.platform.id))
+        read_file = AsyncMock(return_value=json.dumps([]).encode("utf-8"))
+
+        with (
+            patch.object(handler, "_exists_cache_file", AsyncMock(return_value=True)),
+            patch.object(
+                handler,
+                "_days_since_last_cache_file_update",
+                AsyncMock(return_value=0),
+            ),
+            patch(
+                "handler.metadata.ra_handler.fs_resource_handler.read_file", read_file
+            ),
+        ):
+            assert await handler._search_rom(rom, "aaaa") is None
+            assert await handler._search_rom(rom, "bbbb") is None
+
+        read_file.assert_awaited_once()
@@ -3,6 +3,7 @@ from enum import Enum
 from typing import Any
 
 import emoji
+from config import HASHEOUS_API_ENABLED, LAUNCHBOX_API_ENABLED
 from config.config_manager import config_manager as cm
 from handler.database import db_platform_handler
 from handler.filesystem import fs_asset_handler, fs_firmware_handler
@@ -18,14 +19,14 @@ from handler.metadata import (
     meta_ss_handler,
     meta_tgdb_handler,
 )
-from handler.metadata.hasheous_handler import HasheousRom
-from handler.metadata.igdb_handler import IGDBRom
+from handler.metadata.hasheous_handler import HasheousGameLookups, HasheousRom
+from handler.metadata.igdb_handler import IGDB_API_ENABLED, IGDBRom
 from handler.metadata.launchbox_handler import LaunchboxRom
-from handler.metadata.moby_handler import MobyGamesRom
+from handler.metadata.moby_handler import MOBY_API_ENABLED, MobyGamesRom
 from handler.metadata.playmatch_handler import PlaymatchRomMatch
-from handler.metadata.ra_handler import RAGameRom
-from handler.metadata.sgdb_handler import SGDBRom
-from handler.metadata.ss_handler import SSRom
+from handler.metadata.ra_handler import RA_API_ENABLED, RAGameRom
+from handler.metadata.sgdb_handler import STEAMGRIDDB_API_ENABLED, SGDBRom
+from handler.metadata.ss_handler import SS_API_ENABLED, SSRom
 from logger.formatter import BLUE, LIGHTYELLOW
 from logger.formatter import highlight as hl
 from logger.logger import log
@@ -58,6 +59,21 @@ class MetadataSource:
     SGDB = "sgdb"  # SteamGridDB
 
 
+def get_enabled_metadata_sources() -> list[str]:
+    """Get the metadata sources used by scans that aren't started by a user"""
+    source_mapping = (
+        (IGDB_API_ENABLED, MetadataSource.IGDB),
+        (SS_API_ENABLED, MetadataSource.SS),
+        (MOBY_API_ENABLED, MetadataSource.MOBY),
+        (RA_API_ENABLED, MetadataSource.RA),
+        (LAUNCHBOX_API_ENABLED, MetadataSource.LB),
+        (HASHEOUS_API_ENABLED, MetadataSource.HASHEOUS),
+        (STEAMGRIDDB_API_ENABLED, MetadataSource.SGDB),
+    )
+
+    return [source for enabled, source in source_mapping if enabled]
+
+
 async def _get_main_platform_igdb_id(platform: Platform):
     cnfg = cm.get_config()
 
@@ -233,6 +249,7 @@ async def scan_rom(
     fs_rom: FSRom,
     metadata_sources: list[str],
     newly_added: bool,
+    hasheous_games: HasheousGameLookups | None = None,
 ) -> Rom:
     if not metadata_sources:
         log.error("No metadata sources provided")
@@ -300,6 +317,9 @@ async def scan_rom(
             }
         )
 
+    # Game lookups are shared with the rest of the scan when possible
+    hasheous_lookup = hasheous_games or meta_hasheous_handler
+
     async def fetch_playmatch_hash_match() -> PlaymatchRomMatch:
         if (
             MetadataSource.IGDB in metadata_sources
@@ -476,8 +496,8 @@ async def scan_rom(
                 igdb_game,
                 ra_game,
             ) = await asyncio.gather(
-                meta_hasheous_handler.get_igdb_game(hasheous_rom),
-                meta_hasheous_handler.get_ra_game(hasheous_rom),
+                hasheous_lookup.get_igdb_game(hasheous_rom),
+                hasheous_lookup.get_ra_game(hasheous_rom),
             )
 
             return HasheousRom(
@@ -1,15 +1,23 @@
+from unittest.mock import patch
+
 from handler.auth import auth_handler
 from handler.database import (
+    db_collection_handler,
     db_platform_handler,
     db_rom_handler,
     db_save_handler,
     db_screenshot_handler,
     db_state_handler,
+    db_stats_handler,
     db_user_handler,
 )
+from handler.database.roms_handler import RomsBulkWriter
+from handler.database.stats_handler import LIBRARY_STATS_KEY
+from handler.redis_handler import sync_cache
 from models.assets import Save, Screenshot, State
+from models.collection import COLLECTION_COVERS_LIMIT, Collection
 from models.platform import Platform
-from models.rom import Rom
+from models.rom import Rom, RomFile
 from models.user import Role, User
 from sqlalchemy.exc import IntegrityError
 
@@ -69,6 +77,390 @@ def test_roms(rom: Rom, platform: Platform):
     assert len(roms) == 1
 
 
+def test_roms_metadata_refresh(rom: Rom, platform: Platform):
+    db_rom_handler.update_rom(
+        rom.id,
+        {
+            "igdb_metadata": {
+                "genres": ["Platform"],
+                "total_rating": "80.0",
+                "first_release_date": 946684800,
+            },
+            "moby_metadata": {"genres": ["Action"], "moby_score": 6.0},
+        },
+    )
+
+    roms = db_rom_handler.get_roms_scalar(
+        platform_id=platform.id, selected_genre="Platform"
+    )
+    assert [r.id for r in roms] == [rom.id]
+    assert roms[0].metadatum.genres == ["Platform"]
+    assert roms[0].metadatum.average_rating == 70.0
+    assert roms[0].metadatum.first_release_date == 946684800000
+
+    db_rom_handler.update_rom(rom.id, {"igdb_metadata": {}})
+
+    roms = db_rom_handler.get_roms_scalar(
+        platform_id=platform.id, selected_genre="Action"
+    )
+    assert [r.id for r in roms] == [rom.id]
+    assert roms[0].metadatum.average_rating == 60.0
+
+
+def test_roms_indexed_search(rom: Rom, platform: Platform):
+    db_rom_handler.update_rom(
+        rom.id,
+        {
+            "name": "Super Mario Bros.",
+            "igdb_metadata": {
+                "alternative_names": ["Super Mario Brothers"],
+                "franchises": ["Mario"],
+            },
+        },
+    )
+    db_rom_handler.add_rom(
+        Rom(
+            platform_id=platform.id,
+            name="Mario Kart",
+            slug="mario_kart_slug",
+            fs_name="mario_kart.zip",
+            fs_name_no_tags="mario_kart",
+            fs_name_no_ext="mario_kart",
+            fs_extension="zip",
+            fs_path=f"{platform.slug}/roms",
+        )
+    )
+
+    with patch("handler.database.roms_handler.ROMM_SEARCH_MODE", "indexed"):
+        # Alternative names and metadata are searched too
+        roms = db_rom_handler.get_roms_scalar(search_term="brothers")
+        assert [r.id for r in roms] == [rom.id]
+
+        roms = db_rom_handler.get_roms_scalar(search_term="mario")
+        assert len(roms) == 2
+
+        roms = db_rom_handler.get_roms_scalar(
+            search_term="super mario", order_by="relevance"
+        )
+        assert [r.name for r in roms] == ["Super Mario Bros."]
+
+        roms = db_rom_handler.get_roms_scalar(
+            search_term="mario kart", order_by="relevance"
+        )
+        assert roms[0].name == "Mario Kart"
+
+
+def test_collection_membership(rom: Rom, platform: Platform, admin_user: User):
+    rom_2 = db_rom_handler.add_rom(
+        Rom(
+            platform_id=platform.id,
+            name="test_rom_2",
+            slug="test_rom_slug_2",
+            fs_name="test_rom_2.zip",
+            fs_name_no_tags="test_rom_2",
+            fs_name_no_ext="test_rom_2",
+            fs_extension="zip",
+            fs_path=f"{platform.slug}/roms",
+            path_cover_s="roms/cover_small.png",
+            path_cover_l="roms/cover_big.png",
+        )
+    )
+    collection = db_collection_handler.add_collection(
+        Collection(name="test_collection", user_id=admin_user.id)
+    )
+    collection = db_collection_handler.update_collection(
+        collection.id, {}, rom_ids=[rom_2.id]
+    )
+    assert collection.rom_ids == [rom_2.id]
+    assert collection.rom_count == 1
+    assert db_collection_handler.get_collection_rom_ids(collection.id) == [rom_2.id]
+
+    collections = db_collection_handler.get_collections()
+    assert [c.rom_ids for c in collections] == [[rom_2.id]]
+    assert (
+        collections[0]
+        .path_covers_small[0]
+        .startswith("/assets/romm/resources/roms/cover_small.png")
+    )
+
+    roms = db_rom_handler.get_roms_scalar(collection_id=collection.id)
+    assert [r.id for r in roms] == [rom_2.id]
+
+    # Favourites are looked up by name, for the given user
+    roms = db_rom_handler.get_roms_scalar(favourite=True, user_id=admin_user.id)
+    assert roms == []
+
+    db_collection_handler.update_collection(collection.id, {"name": "Favourites"})
+    roms = db_rom_handler.get_roms_scalar(favourite=True, user_id=admin_user.id)
+    assert [r.id for r in roms] == [rom_2.id]
+    roms = db_rom_handler.get_roms_scalar(favourite=False, user_id=admin_user.id)
+    assert [r.id for r in roms] == [rom.id]
+
+
+def test_collection_covers(rom: Rom, platform: Platform, admin_user: User):
+    rom_ids = [rom.id]
+    for index in range(COLLECTION_COVERS_LIMIT + 2):
+        rom_ids.append(
+            db_rom_handler.add_rom(
+                Rom(
+                    platform_id=platform.id,
+                    name=f"test_rom_{index}",
+                    fs_name=f"test_rom_{index}.zip",
+                    fs_name_no_tags=f"test_rom_{index}",
+                    fs_name_no_ext=f"test_rom_{index}",
+                    fs_extension="zip",
+                    fs_path=f"{platform.slug}/roms",
+                    path_cover_s=f"roms/cover_small_{index}.png",
+                    path_cover_l=f"roms/cover_big_{index}.png",
+                )
+            ).id
+        )
+    collection = db_collection_handler.add_collection(
+        Collection(name="test_collection", user_id=admin_user.id)
+    )
+    db_collection_handler.update_collection(collection.id, {}, rom_ids=rom_ids)
+
+    # Only the first roms with a cover are loaded for it, the others are counted
+    [collection] = db_collection_handler.get_collections()
+    assert collection.rom_count == len(rom_ids)
+    assert len(collection.path_covers_small) == COLLECTION_COVERS_LIMIT
+    assert len(collection.path_covers_large) == COLLECTION_COVERS_LIMIT
+
+
+def test_roms_bulk_writer(rom: Rom, platform: Platform):
+    rom_2 = db_rom_handler.add_rom(
+        Rom(
+            platform_id=platform.id,
+            name="test_rom_2",
+            fs_name="test_rom_2.zip",
+            fs_name_no_tags="test_rom_2",
+            fs_name_no_ext="test_rom_2",
+            fs_extension="zip",
+            fs_path=f"{platform.slug}/roms",
+        )
+    )
+    db_rom_handler.add_rom_file(
+        RomFile(
+            rom_id=rom.id,
+            file_name="stale.zip",
+            file_path=rom.fs_path,
+            file_size_bytes=1,
+        )
+    )
+
+    rom.name = "Bulk Rom"
+    rom.igdb_metadata = {"genres": ["Platform"]}
+    rom.files = [
+        RomFile(
+            file_name="test_rom.zip",
+            file_path=rom.fs_path,
+            file_size_bytes=1000,
+            md5_hash="md5",
+        )
+    ]
+    rom_2.name = "Bulk Rom 2"
+    rom_2.files = []
+
+    bulk_writer = RomsBulkWriter(db_rom_handler, batch_size=2)
+    bulk_writer.add(rom)
+    bulk_writer.add(rom_2)
+    assert bulk_writer.is_full
+    stored_roms = bulk_writer.flush()
+    assert [r.id for r in stored_roms] == [rom.id, rom_2.id]
+    assert len(bulk_writer) == 0
+
+    updated_rom = db_rom_handler.get_rom(rom.id)
+    assert updated_rom is not None
+    assert updated_rom.name == "Bulk Rom"
+    assert [f.file_name for f in updated_rom.files] == ["test_rom.zip"]
+    assert updated_rom.files[0].md5_hash == "md5"
+    assert updated_rom.metadatum.genres == ["Platform"]
+
+    updated_rom_2 = db_rom_handler.get_rom(rom_2.id)
+    assert updated_rom_2 is not None
+    assert updated_rom_2.name == "Bulk Rom 2"
+    assert updated_rom_2.files == []
+
+    updated_platform = db_platform_handler.get_platform(platform.id)
+    assert updated_platform is not None
+    assert updated_platform.rom_count == 2
+    assert updated_platform.fs_size_bytes == 1000
+
+
+def test_roms_bulk_writer_new_roms(rom: Rom, platform: Platform):
+    bulk_writer = RomsBulkWriter(db_rom_handler, batch_size=2)
+    new_roms = bulk_writer.add_new_roms(
+        [
+            Rom(
+                platform_id=platform.id,
+                name=f"new_rom_{index}",
+                fs_name=f"new_rom_{index}.zip",
+                fs_name_no_tags=f"new_rom_{index}",
+                fs_name_no_ext=f"new_rom_{index}",
+                fs_extension="zip",
+                fs_path=f"{platform.slug}/roms",
+            )
+            for index in range(2)
+        ]
+    )
+    assert [r.fs_name for r in new_roms] == ["new_rom_0.zip", "new_rom_1.zip"]
+    assert all(r.id is not None for r in new_roms)
+
+    stored_rom = db_rom_handler.get_rom(new_roms[0].id)
+    assert stored_rom is not None
+    assert stored_rom.metadatum is not None
+    updated_platform = db_platform_handler.get_platform(platform.id)
+    assert updated_platform is not None
+    assert updated_platform.rom_count == 3
+
+    # Only the new roms that were never written are removed
+    bulk_writer.add(
+        Rom(
+            id=new_roms[0].id,
+            platform_id=platform.id,
+            name="Written Rom",
+            fs_name=new_roms[0].fs_name,
+            fs_name_no_tags=new_roms[0].fs_name_no_tags,
+            fs_name_no_ext=new_roms[0].fs_name_no_ext,
+            fs_extension="zip",
+            fs_path=new_roms[0].fs_path,
+            files=[],
+        )
+    )
+    bulk_writer.flush()
+    bulk_writer.discard_unwritten_roms()
+
+    assert db_rom_handler.get_rom(new_roms[0].id) is not None
+    assert db_rom_handler.get_rom(new_roms[1].id) is None
+    assert db_rom_handler.get_rom(rom.id) is not None
+    updated_platform = db_platform_handler.get_platform(platform.id)
+    assert updated_platform is not None
+    assert updated_platform.rom_count == 2
+
+
+def test_platforms_stats(rom: Rom, platform: Platform):
+    rom_file = db_rom_handler.add_rom_file(
+        RomFile(
+            rom_id=rom.id,
+            file_name="test_rom.zip",
+            file_path=rom.fs_path,
+            file_size_bytes=100,
+        )
+    )
+    rom_2 = db_rom_handler.add_rom(
+        Rom(
+            platform_id=platform.id,
+            name="test_rom_2",
+            fs_name="test_rom_2.zip",
+            fs_name_no_tags="test_rom_2",
+            fs_name_no_ext="test_rom_2",
+            fs_extension="zip",
+            fs_path=f"{platform.slug}/roms",
+            files=[
+                RomFile(
+                    file_name="test_rom_2.zip",
+                    file_path=f"{platform.slug}/roms",
+                    file_size_bytes=20,
+                )
+            ],
+        )
+    )
+
+    stored_platform = db_platform_handler.get_platform(platform.id)
+    assert stored_platform is not None
+    assert (stored_platform.rom_count, stored_platform.fs_size_bytes) == (2, 120)
+
+    db_rom_handler.update_rom_file(rom_file.id, {"file_size_bytes": 50})
+    db_rom_handler.delete_rom(rom_2.id)
+
+    stored_platform = db_platform_handler.get_platform(platform.id)
+    assert stored_platform is not None
+    assert (stored_platform.rom_count, stored_platform.fs_size_bytes) == (1, 50)
+
+    db_rom_handler.purge_rom_files(rom.id)
+
+    stored_platform = db_platform_handler.get_platform(platform.id)
+    assert stored_platform is not None
+    assert (stored_platform.rom_count, stored_platform.fs_size_bytes) == (1, 0)
+
+    # Reconciliation fixes counters that drifted
+    db_platform_handler.add_platform(
+        Platform(id=platform.id, rom_count=7, fs_size_bytes=7)
+    )
+    assert db_platform_handler.reconcile_platforms_stats() == 1
+    assert db_platform_handler.reconcile_platforms_stats() == 0
+
+    stored_platform = db_platform_handler.get_platform(platform.id)
+    assert stored_platform is not None
+    assert (stored_platform.rom_count, stored_platform.fs_size_bytes) == (1, 0)
+
+
+def test_library_stats(rom: Rom, platform: Platform, admin_user: User):
+    sync_cache.delete(LIBRARY_STATS_KEY)
+
+    # Missing stats are computed from the database and cached
+    assert db_stats_handler.get_library_stats() == {
+        "PLATFORMS": 1,
+        "ROMS": 1,
+        "SAVES": 0,
+        "STATES": 0,
+        "SCREENSHOTS": 0,
+        "TOTAL_FILESIZE_BYTES": 0,
+    }
+    assert sync_cache.exists(LIBRARY_STATS_KEY)
+
+    # Writes update the cached stats
+    db_rom_handler.add_rom_file(
+        RomFile(
+            rom_id=rom.id,
+            file_name="test_rom.zip",
+            file_path=rom.fs_path,
+            file_size_bytes=100,
+        )
+    )
+    save = db_save_handler.add_save(
+        Save(
+            rom_id=rom.id,
+            user_id=admin_user.id,
+            file_name="test_save.sav",
+            file_name_no_tags="test_save",
+            file_name_no_ext="test_save",
+            file_extension="sav",
+            emulator="test_emulator",
+            file_path=f"{platform.slug}/saves/test_emulator",
+            file_size_bytes=1.0,
+        )
+    )
+    db_save_handler.update_save(save.id, {"file_name": "test_save_2.sav"})
+
+    stats = db_stats_handler.get_library_stats()
+    assert stats["SAVES"] == 1
+    assert stats["TOTAL_FILESIZE_BYTES"] == 100
+
+    # Deleting a rom deletes its assets too, so the stats are computed again
+    db_rom_handler.delete_rom(rom.id)
+    assert not sync_cache.exists(LIBRARY_STATS_KEY)
+
+    assert db_stats_handler.get_library_stats() == {
+        "PLATFORMS": 0,
+        "ROMS": 0,
+        "SAVES": 0,
+        "STATES": 0,
+        "SCREENSHOTS": 0,
+        "TOTAL_FILESIZE_BYTES": 0,
+    }
+
+
+@patch("handler.database.base_handler.DB_POOL_CHECKOUT_WAIT")
+def test_pool_checkout_wait(mock_checkout_wait):
+    db_platform_handler.get_platforms()
+    assert mock_checkout_wait.observe.call_count == 1
+
+    # Nested handler calls share the caller's session, so they check out one connection
+    db_stats_handler.compute_library_stats()
+    assert mock_checkout_wait.observe.call_count == 2
+
+
 def test_users(admin_user):
     db_user_handler.add_user(
         User(
@@ -1,4 +1,8 @@
+import re
+from unittest.mock import patch
+
 import pytest
+from handler.metadata import meta_igdb_handler
 from handler.scan_handler import MetadataSource, ScanType, scan_platform, scan_rom
 from models.platform import Platform
 from models.rom import Rom, RomFile
@@ -37,35 +41,53 @@ async def test_scan_rom():
         multi=False,
     )
 
-    async with initialize_context():
-        rom = await scan_rom(
-            platform=platform,
-            scan_type=ScanType.QUICK,
-            rom=rom,
-            fs_rom={
-                "fs_name": "Paper Mario (USA).z64",
-                "multi": False,
-                "files": [
-                    RomFile(
-                        file_name="Paper Mario (USA).z64",
-                        file_path="n64/Paper Mario (USA)",
-                        file_size_bytes=1024,
-                        last_modified=1620000000,
-                    )
-                ],
-                "crc_hash": "",
-                "md5_hash": "",
-                "sha1_hash": "",
-                "ra_hash": "",
-            },
-            metadata_sources=[MetadataSource.IGDB],
-            newly_added=True,
-        )
+    # IGDB is queried through multiquery requests, which the cassette predates, so
+    # its responses are mocked here and the multiquery protocol is covered by
+    # handler/metadata/tests/test_igdb_handler.py
+    async def igdb_post(url: str, content: str) -> list:
+        return [
+            {
+                "name": name,
+                "result": (
+                    [{"id": 3340, "name": "Paper Mario", "slug": "paper-mario"}]
+                    if endpoint == "games"
+                    else []
+                ),
+            }
+            for endpoint, name in re.findall(r'^query (\w+) "(\d+)"', content, re.M)
+        ]
+
+    with patch.object(meta_igdb_handler, "_post", side_effect=igdb_post):
+        async with initialize_context():
+            rom = await scan_rom(
+                platform=platform,
+                scan_type=ScanType.QUICK,
+                rom=rom,
+                fs_rom={
+                    "fs_name": "Paper Mario (USA).z64",
+                    "multi": False,
+                    "files": [
+                        RomFile(
+                            file_name="Paper Mario (USA).z64",
+                            file_path="n64/Paper Mario (USA)",
+                            file_size_bytes=1024,
+                            last_modified=1620000000,
+                        )
+                    ],
+                    "crc_hash": "",
+                    "md5_hash": "",
+                    "sha1_hash": "",
+                    "ra_hash": "",
+                },
+                metadata_sources=[MetadataSource.IGDB],
+                newly_added=True,
+            )
 
     assert type(rom) is Rom
     assert rom.fs_name == "Paper Mario (USA).z64"
     assert rom.name == "Paper Mario"
     assert rom.igdb_id == 3340
+    assert rom.slug == "paper-mario"
     assert rom.fs_size_bytes == 1024
     assert rom.tags == []
     assert not rom.multi
@@ -22,6 +22,7 @@ from endpoints import (
     feeds,
     firmware,
     heartbeat,
+    metrics,
     platform,
     raw,
     rom,
@@ -49,6 +50,7 @@ from utils.context import (
     initialize_context,
     set_context_middleware,
 )
+from utils.metrics import metrics_middleware
 
 logging.config.dictConfig(LOGGING_CONFIG)
 
@@ -110,6 +112,9 @@ app.add_middleware(
 # Sets context vars in request-response cycle
 app.middleware("http")(set_context_middleware)
 
+# Records the latency of requests, when metrics are enabled
+app.middleware("http")(metrics_middleware)
+
 app.include_router(heartbeat.router, prefix="/api")
 app.include_router(auth.router, prefix="/api")
 app.include_router(user.router, prefix="/api")
@@ -126,6 +131,7 @@ app.include_router(raw.router, prefix="/api")
 app.include_router(screenshots.router, prefix="/api")
 app.include_router(firmware.router, prefix="/api")
 app.include_router(collections.router, prefix="/api")
+app.include_router(metrics.router, prefix="/api")
 
 app.mount("/ws", socket_handler.socket_app)
 
@@ -2,15 +2,29 @@ from __future__ import annotations
 
 import base64
 import json
+from typing import Final
 
 from config import FRONTEND_RESOURCES_PATH
 from models.base import BaseModel
 from models.rom import Rom
 from models.user import User
-from sqlalchemy import ForeignKey, String, Text, UniqueConstraint
+from sqlalchemy import (
+    ForeignKey,
+    String,
+    Subquery,
+    Text,
+    UniqueConstraint,
+    and_,
+    func,
+    or_,
+    select,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from utils.database import CustomJSON
 
+# Covers of a collection's roms shown by its card, out of which two are picked
+COLLECTION_COVERS_LIMIT: Final = 10
+
 
 class Collection(BaseModel):
     __tablename__ = "collections"
@@ -31,7 +45,23 @@ class Collection(BaseModel):
         secondary="collections_roms",
         collection_class=set,
         back_populates="collections",
-        lazy="joined",
+        lazy="select",
+    )
+    # A few of the roms, to build the covers from
+    cover_roms: Mapped[list[Rom]] = relationship(
+        "Rom",
+        secondary=lambda: _cover_links,
+        primaryjoin=lambda: Collection.id == _cover_links.c.collection_id,
+        secondaryjoin=lambda: and_(
+            Rom.id == _cover_links.c.rom_id,
+            _cover_links.c.cover_index <= COLLECTION_COVERS_LIMIT,
+        ),
+        viewonly=True,
+        lazy="select",
+    )
+    # Membership rows only, so the rom ids don't require loading the roms
+    rom_links: Mapped[list[CollectionRom]] = relationship(
+        "CollectionRom", lazy="selectin", viewonly=True
     )
 
     user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
@@ -43,11 +73,11 @@ class Collection(BaseModel):
 
     @property
     def rom_ids(self) -> list[int]:
-        return [r.id for r in self.roms]
+        return [link.rom_id for link in self.rom_links]
 
     @property
     def rom_count(self) -> int:
-        return len(self.roms)
+        return len(self.rom_links)
 
     @property
     def fs_resources_path(self) -> str:
@@ -73,7 +103,7 @@ class Collection(BaseModel):
     def path_covers_small(self) -> list[str]:
         return [
             f"{FRONTEND_RESOURCES_PATH}/{r.path_cover_s}?ts={self.updated_at}"
-            for r in self.roms
+            for r in self.cover_roms
             if r.path_cover_s
         ]
 
@@ -81,7 +111,7 @@ class Collection(BaseModel):
     def path_covers_large(self) -> list[str]:
         return [
             f"{FRONTEND_RESOURCES_PATH}/{r.path_cover_l}?ts={self.updated_at}"
-            for r in self.roms
+            for r in self.cover_roms
             if r.path_cover_l
         ]
 
@@ -108,6 +138,22 @@ class CollectionRom(BaseModel):
     )
 
 
+# The first roms with a cover in each collection, numbered by a window function so
+# that loading them for many collections still reads a few rows per collection
+_cover_links: Subquery = (
+    select(
+        CollectionRom.collection_id,
+        CollectionRom.rom_id,
+        func.row_number()
+        .over(partition_by=CollectionRom.collection_id, order_by=CollectionRom.rom_id)
+        .label("cover_index"),
+    )
+    .join(Rom, Rom.id == CollectionRom.rom_id)
+    .where(or_(Rom.path_cover_s != "", Rom.path_cover_l != ""))
+    .subquery()
+)
+
+
 class VirtualCollection(BaseModel):
     __tablename__ = "virtual_collections"
 
@@ -1,12 +1,11 @@
 from __future__ import annotations
 
-from functools import cached_property
 from typing import TYPE_CHECKING
 
 from models.base import FILE_PATH_MAX_LENGTH, BaseModel
 from models.rom import Rom
-from sqlalchemy import String, func, select
-from sqlalchemy.orm import Mapped, column_property, mapped_column, relationship
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 if TYPE_CHECKING:
     from models.firmware import Firmware
@@ -50,9 +49,11 @@ class Platform(BaseModel):
         String(length=10), server_default=DEFAULT_COVER_ASPECT_RATIO
     )
 
-    # This runs a subquery to get the count of roms for the platform
-    rom_count = column_property(
-        select(func.count(Rom.id)).where(Rom.platform_id == id).scalar_subquery()
+    # Maintained by the roms handler as roms and files are written, and
+    # reconciled periodically by the library stats task
+    rom_count: Mapped[int] = mapped_column(default=0, server_default="0")
+    fs_size_bytes: Mapped[int] = mapped_column(
+        BigInteger(), default=0, server_default="0"
     )
 
     missing_from_fs: Mapped[bool] = mapped_column(default=False, nullable=False)
@@ -72,11 +73,5 @@ class Platform(BaseModel):
     def is_identified(self) -> bool:
         return not self.is_unidentified
 
-    @cached_property
-    def fs_size_bytes(self) -> int:
-        from handler.database import db_stats_handler
-
-        return db_stats_handler.get_platform_filesize(self.id)
-
     def __repr__(self) -> str:
         return self.name
@@ -102,6 +102,11 @@ class RomMetadata(BaseModel):
         ForeignKey("roms.id", ondelete="CASCADE"), primary_key=True
     )
 
+    __table_args__ = (
+        Index("idx_roms_metadata_average_rating", "average_rating"),
+        Index("idx_roms_metadata_first_release_date", "first_release_date"),
+    )
+
     genres: Mapped[list[str] | None] = mapped_column(CustomJSON(), default=[])
     franchises: Mapped[list[str] | None] = mapped_column(CustomJSON(), default=[])
     collections: Mapped[list[str] | None] = mapped_column(CustomJSON(), default=[])
@@ -110,6 +115,8 @@ class RomMetadata(BaseModel):
     age_ratings: Mapped[list[str] | None] = mapped_column(CustomJSON(), default=[])
     first_release_date: Mapped[int | None] = mapped_column(BigInteger(), default=None)
     average_rating: Mapped[float | None] = mapped_column(default=None)
+    # Names, alternative names and metadata of the rom, served by the search index
+    search_text: Mapped[str | None] = mapped_column(Text, default=None)
 
     rom: Mapped[Rom] = relationship(lazy="joined", back_populates="metadatum")
 
@@ -0,0 +1,33 @@
+from config import (
+    ENABLE_SCHEDULED_RECONCILE_LIBRARY_STATS,
+    SCHEDULED_RECONCILE_LIBRARY_STATS_CRON,
+)
+from handler.database import db_platform_handler, db_stats_handler
+from logger.logger import log
+from tasks.tasks import PeriodicTask
+
+
+class ReconcileLibraryStatsTask(PeriodicTask):
+    def __init__(self):
+        super().__init__(
+            func="tasks.reconcile_library_stats.reconcile_library_stats_task.run",
+            description="library stats reconciliation",
+            enabled=ENABLE_SCHEDULED_RECONCILE_LIBRARY_STATS,
+            cron_string=SCHEDULED_RECONCILE_LIBRARY_STATS_CRON,
+        )
+
+    async def run(self) -> None:
+        """Recompute the stats kept up to date as roms are written, to fix any drift"""
+        log.info("Reconciling library stats...")
+
+        drifted_platforms = db_platform_handler.reconcile_platforms_stats()
+        if drifted_platforms:
+            log.warning(f"Fixed the stats of {drifted_platforms} platforms")
+
+        # The cached totals are built from the platforms stats
+        db_stats_handler.reconcile_library_stats()
+
+        log.info("Library stats reconciled")
+
+
+reconcile_library_stats_task = ReconcileLibraryStatsTask()
@@ -1,16 +1,6 @@
-from config import (
-    ENABLE_SCHEDULED_RESCAN,
-    HASHEOUS_API_ENABLED,
-    LAUNCHBOX_API_ENABLED,
-    SCHEDULED_RESCAN_CRON,
-)
+from config import ENABLE_SCHEDULED_RESCAN, SCHEDULED_RESCAN_CRON
 from endpoints.sockets.scan import scan_platforms
-from handler.metadata.igdb_handler import IGDB_API_ENABLED
-from handler.metadata.moby_handler import MOBY_API_ENABLED
-from handler.metadata.ra_handler import RA_API_ENABLED
-from handler.metadata.sgdb_handler import STEAMGRIDDB_API_ENABLED
-from handler.metadata.ss_handler import SS_API_ENABLED
-from handler.scan_handler import MetadataSource, ScanType
+from handler.scan_handler import ScanType, get_enabled_metadata_sources
 from logger.logger import log
 from tasks.tasks import PeriodicTask
 
@@ -30,17 +20,7 @@ class ScanLibraryTask(PeriodicTask):
             self.unschedule()
             return
 
-        source_mapping = {
-            IGDB_API_ENABLED: MetadataSource.IGDB,
-            SS_API_ENABLED: MetadataSource.SS,
-            MOBY_API_ENABLED: MetadataSource.MOBY,
-            RA_API_ENABLED: MetadataSource.RA,
-            LAUNCHBOX_API_ENABLED: MetadataSource.LB,
-            HASHEOUS_API_ENABLED: MetadataSource.HASHEOUS,
-            STEAMGRIDDB_API_ENABLED: MetadataSource.SGDB,
-        }
-
-        metadata_sources = [source for flag, source in source_mapping.items() if flag]
+        metadata_sources = get_enabled_metadata_sources()
         if not metadata_sources:
             log.warning("No metadata sources enabled, unscheduling library scan")
             self.unschedule()
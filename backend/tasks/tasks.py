@@ -1,5 +1,6 @@
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Any
+from typing import IO, Any
 
 import httpx
 from exceptions.task_exceptions import SchedulerException
@@ -94,3 +95,32 @@ class RemoteFilePullTask(PeriodicTask):
             log.error(f"Scheduled {self.description} failed", exc_info=True)
             log.error(e)
             return None
+
+    async def run_to_file(self, force: bool = False) -> IO[bytes] | None:
+        """Same as run, but spools the response to a temporary file instead of memory
+
+        Returns:
+            The file, rewound to the start, which the caller is responsible for closing
+        """
+        if not self.enabled and not force:
+            log.info(f"Scheduled {self.description} not enabled, unscheduling...")
+            self.unschedule()
+            return None
+
+        log.info(f"Scheduled {self.description} started...")
+
+        httpx_client = ctx_httpx_client.get()
+        spool = tempfile.TemporaryFile()
+        try:
+            async with httpx_client.stream("GET", self.url, timeout=120) as response:
+                response.raise_for_status()
+                async for chunk in response.aiter_bytes():
+                    spool.write(chunk)
+        except httpx.HTTPError as e:
+            spool.close()
+            log.error(f"Scheduled {self.description} failed", exc_info=True)
+            log.error(e)
+            return None
+
+        spool.seek(0)
+        return spool
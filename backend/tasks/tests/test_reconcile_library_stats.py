@@ -0,0 +1,41 @@
+from unittest.mock import patch
+
+import pytest
+from tasks.reconcile_library_stats import (
+    ReconcileLibraryStatsTask,
+    reconcile_library_stats_task,
+)
+
+
+class TestReconcileLibraryStatsTask:
+    @pytest.fixture
+    def task(self):
+        return ReconcileLibraryStatsTask()
+
+    def test_init(self, task):
+        """Test task initialization"""
+        assert (
+            task.func
+            == "tasks.reconcile_library_stats.reconcile_library_stats_task.run"
+        )
+        assert task.description == "library stats reconciliation"
+        assert task.cron_string == "0 6 * * *"
+
+    @patch("tasks.reconcile_library_stats.db_stats_handler")
+    @patch("tasks.reconcile_library_stats.db_platform_handler")
+    @patch("tasks.reconcile_library_stats.log")
+    async def test_run(
+        self, mock_log, mock_db_platform_handler, mock_db_stats_handler, task
+    ):
+        """Test run reports the platforms whose stats had drifted"""
+        mock_db_platform_handler.reconcile_platforms_stats.return_value = 2
+
+        await task.run()
+
+        mock_db_platform_handler.reconcile_platforms_stats.assert_called_once()
+        mock_log.warning.assert_called_once_with("Fixed the stats of 2 platforms")
+        mock_db_stats_handler.reconcile_library_stats.assert_called_once()
+
+    def test_task_instance(self):
+        """Test that the module-level task instance is created correctly"""
+        assert isinstance(reconcile_library_stats_task, ReconcileLibraryStatsTask)
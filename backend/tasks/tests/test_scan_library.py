@@ -16,9 +16,13 @@ class TestScanLibraryTask:
         assert task.description == "library scan"
 
     @patch("tasks.scan_library.ENABLE_SCHEDULED_RESCAN", True)
+    @patch(
+        "tasks.scan_library.get_enabled_metadata_sources",
+        return_value=[MetadataSource.LB],
+    )
     @patch("tasks.scan_library.scan_platforms")
     @patch("tasks.scan_library.log")
-    async def test_run_enabled(self, mock_log, mock_scan_platforms, task):
+    async def test_run_enabled(self, mock_log, mock_scan_platforms, _, task):
         """Test run when scheduled rescan is enabled"""
         mock_scan_platforms.return_value = AsyncMock()
 
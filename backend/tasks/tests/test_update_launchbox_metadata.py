@@ -1,4 +1,5 @@
 import os
+from io import BytesIO
 from unittest.mock import AsyncMock, patch
 
 import anyio
@@ -12,6 +13,7 @@ from tasks.update_launchbox_metadata import (
     LAUNCHBOX_METADATA_IMAGE_KEY,
     LAUNCHBOX_METADATA_NAME_KEY,
     LAUNCHBOX_PLATFORMS_KEY,
+    BoundedPipeline,
     UpdateLaunchboxMetadataTask,
     update_launchbox_metadata_task,
 )
@@ -249,6 +251,46 @@ class TestUpdateLaunchboxMetadataTask:
         hset_calls = mock_pipe.hset.call_args_list
         assert len(hset_calls) == 1
 
+    @patch("tasks.update_launchbox_metadata.LAUNCHBOX_STREAMING_INGEST", True)
+    @patch.object(RemoteFilePullTask, "run_to_file")
+    @patch.object(RemoteFilePullTask, "run")
+    @patch("tasks.update_launchbox_metadata.async_cache.pipeline")
+    async def test_streaming_ingest(
+        self,
+        mock_async_cache_pipeline,
+        mock_super_run,
+        mock_run_to_file,
+        task,
+        sample_zip_content,
+    ):
+        """Test that streaming mode parses the spooled download"""
+        spool = BytesIO(sample_zip_content)
+        mock_run_to_file.return_value = spool
+
+        mock_pipe = AsyncMock()
+        mock_async_cache_pipeline.return_value.__aenter__ = AsyncMock(
+            return_value=mock_pipe
+        )
+        mock_async_cache_pipeline.return_value.__aexit__ = AsyncMock(return_value=None)
+
+        await task.run(force=True)
+
+        mock_super_run.assert_not_called()
+        mock_run_to_file.assert_called_once_with(True)
+        assert len(mock_pipe.hset.call_args_list) == 12
+        assert spool.closed
+
+    async def test_bounded_pipeline_flushes_every_n_entries(self):
+        """Test that queued commands are executed every flush_size entries"""
+        mock_pipe = AsyncMock()
+        pipe = BoundedPipeline(mock_pipe, flush_size=2)
+
+        for i in range(5):
+            await pipe.hset(LAUNCHBOX_FILES_KEY, mapping={str(i): "{}"})
+
+        assert pipe.entries == 5
+        assert mock_pipe.execute.call_count == 2
+
     def test_redis_keys_are_defined(self):
         """Test that all Redis keys are properly defined"""
         assert LAUNCHBOX_PLATFORMS_KEY == "romm:launchbox_platforms"
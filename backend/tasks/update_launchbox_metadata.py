@@ -1,11 +1,15 @@
 import json
+import resource
+import time
 import zipfile
 from io import BytesIO
-from typing import Any, Final
+from typing import IO, Any, Final
 
 from config import (
     ENABLE_SCHEDULED_UPDATE_LAUNCHBOX_METADATA,
     LAUNCHBOX_API_ENABLED,
+    LAUNCHBOX_INGEST_FLUSH_SIZE,
+    LAUNCHBOX_STREAMING_INGEST,
     SCHEDULED_UPDATE_LAUNCHBOX_METADATA_CRON,
 )
 from defusedxml import ElementTree as ET
@@ -23,6 +27,28 @@ LAUNCHBOX_MAME_KEY: Final = "romm:launchbox_mame"
 LAUNCHBOX_FILES_KEY: Final = "romm:launchbox_files"
 
 
+class BoundedPipeline:
+    """Redis pipeline executed every `flush_size` commands, so the queued commands
+    don't grow with the size of the dataset"""
+
+    def __init__(self, pipe: Any, flush_size: int = LAUNCHBOX_INGEST_FLUSH_SIZE):
+        self.pipe = pipe
+        self.flush_size = max(1, flush_size)
+        self.entries = 0
+        self._queued = 0
+
+    async def hset(self, name: str, mapping: dict[str, str]) -> None:
+        await self.pipe.hset(name, mapping=mapping)
+        self.entries += 1
+        self._queued += 1
+        if self._queued >= self.flush_size:
+            await self.execute()
+
+    async def execute(self) -> None:
+        await self.pipe.execute()
+        self._queued = 0
+
+
 class UpdateLaunchboxMetadataTask(RemoteFilePullTask):
     def __init__(self):
         super().__init__(
@@ -39,18 +65,27 @@ class UpdateLaunchboxMetadataTask(RemoteFilePullTask):
             log.warning("Launchbox API is not enabled, skipping metadata update")
             return
 
-        content = await super().run(force)
-        if content is None:
+        source: IO[bytes] | None
+        if LAUNCHBOX_STREAMING_INGEST:
+            # Spool the download to disk and parse the members straight from the zip
+            source = await self.run_to_file(force)
+        else:
+            content = await super().run(force)
+            source = BytesIO(content) if content is not None else None
+
+        if source is None:
             log.warning("No content received from launchbox metadata update")
             return
 
+        start = time.perf_counter()
+        entries = 0
         try:
-            zip_file_bytes = BytesIO(content)
-            with zipfile.ZipFile(zip_file_bytes) as z:
+            with source, zipfile.ZipFile(source) as z:
                 for file in z.namelist():
                     if file == "Platforms.xml":
                         with z.open(file, "r") as f:
-                            async with async_cache.pipeline() as pipe:
+                            async with async_cache.pipeline() as redis_pipe:
+                                pipe = BoundedPipeline(redis_pipe)
                                 ctx = ET.iterparse(f, events=("end",))
 
                                 for _, elem in ctx:
@@ -71,10 +106,12 @@ class UpdateLaunchboxMetadataTask(RemoteFilePullTask):
 
                                         elem.clear()
                                 await pipe.execute()
+                                entries += pipe.entries
 
                     elif file == "Metadata.xml":
                         with z.open(file, "r") as f:
-                            async with async_cache.pipeline() as pipe:
+                            async with async_cache.pipeline() as redis_pipe:
+                                pipe = BoundedPipeline(redis_pipe)
                                 ctx = ET.iterparse(f, events=("end",))
 
                                 current_game_image_db_id = None
@@ -178,10 +215,12 @@ class UpdateLaunchboxMetadataTask(RemoteFilePullTask):
                                         },
                                     )
                                 await pipe.execute()
+                                entries += pipe.entries
 
                     elif file == "Mame.xml":
                         with z.open(file, "r") as f:
-                            async with async_cache.pipeline() as pipe:
+                            async with async_cache.pipeline() as redis_pipe:
+                                pipe = BoundedPipeline(redis_pipe)
                                 ctx = ET.iterparse(f, events=("end",))
 
                                 for _, elem in ctx:
@@ -205,10 +244,12 @@ class UpdateLaunchboxMetadataTask(RemoteFilePullTask):
 
                                         elem.clear()
                                 await pipe.execute()
+                                entries += pipe.entries
 
                     elif file == "Files.xml":
                         with z.open(file, "r") as f:
-                            async with async_cache.pipeline() as pipe:
+                            async with async_cache.pipeline() as redis_pipe:
+                                pipe = BoundedPipeline(redis_pipe)
                                 ctx = ET.iterparse(f, events=("end",))
 
                                 for _, elem in ctx:
@@ -232,11 +273,20 @@ class UpdateLaunchboxMetadataTask(RemoteFilePullTask):
 
                                         elem.clear()
                                 await pipe.execute()
+                                entries += pipe.entries
 
         except zipfile.BadZipFile:
             log.error("Bad zip file in launchbox metadata update")
             return
 
+        elapsed = time.perf_counter() - start
+        # ru_maxrss is reported in KiB on Linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        log.info(
+            f"Stored {entries} launchbox entries in {elapsed:.1f}s "
+            f"({entries / elapsed if elapsed > 0 else 0:.0f} entries/s), "
+            f"peak memory {peak_rss:.0f} MiB"
+        )
         log.info("Scheduled launchbox metadata update completed!")
 
 
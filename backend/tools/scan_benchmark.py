@@ -0,0 +1,410 @@
+"""Benchmark library scans against a synthetic library.
+
+Generates a library of fake roms (single files, multi-disc folders, zip/7z/tar/bz2
+archives and tagged file names), runs `scan_platforms` against it with the metadata
+providers replaced by mocks of configurable latency, and reports the wall time,
+roms per second and database queries per rom of each run, with the largest RSS of the
+process reached so far (which only grows across runs).
+
+Run it from the backend folder, with Redis and a MariaDB or PostgreSQL server
+configured through the usual environment variables:
+
+    python -m tools.scan_benchmark --platforms 2 --roms 500 --latency 0.05 --runs 2
+
+The scan marks any platform missing from the synthetic library as missing, so it uses
+its own database (`--db-name`, created beforehand), which is migrated on start. The
+first run scans an empty database, later runs measure rescans of the same library.
+
+Pass `--profile` to save a pyinstrument report of each run, or wrap the command with
+`memray run` to profile memory allocations.
+"""
+
+import argparse
+import asyncio
+import bz2
+import io
+import json
+import os
+import random
+import resource
+import shutil
+import tarfile
+import tempfile
+import time
+import zipfile
+from dataclasses import asdict, dataclass
+from typing import Any
+from unittest.mock import patch
+
+import py7zr
+
+PLATFORM_SLUGS = ("gba", "snes", "n64", "psx", "genesis", "nes", "gb", "ps2")
+ROM_SHAPES = ("single", "multi", "zip", "7z", "tar", "bz2")
+PROVIDERS = ("igdb", "moby", "ss", "ra", "lb", "hasheous")
+
+REGION_TAGS = ("(USA)", "(Europe)", "(Japan)", "(USA, Europe)", "(World)")
+EXTRA_TAGS = ("", " (Rev 1)", " (En,Fr,De)", " [!]", " (Beta)", " (Proto) [b]")
+
+
+@dataclass
+class BenchmarkResult:
+    run: int
+    roms: int
+    wall_time: float
+    roms_per_second: float
+    queries: int
+    queries_per_rom: float
+    max_rss_mb: float
+    max_children_rss_mb: float
+
+    def summary(self) -> str:
+        return (
+            f"Run {self.run}: {self.roms} roms in {self.wall_time:.2f}s "
+            f"({self.roms_per_second:.1f} roms/s), "
+            f"{self.queries} queries ({self.queries_per_rom:.1f}/rom), "
+            f"max RSS so far {self.max_rss_mb:.1f} MB "
+            f"(hashing workers {self.max_children_rss_mb:.1f} MB)"
+        )
+
+
+def _write_rom(
+    roms_path: str, name: str, shape: str, content: bytes, discs: int
+) -> None:
+    bin_name = f"{name}.bin"
+
+    if shape == "single":
+        with open(os.path.join(roms_path, bin_name), "wb") as f:
+            f.write(content)
+    elif shape == "multi":
+        rom_path = os.path.join(roms_path, name)
+        os.makedirs(rom_path)
+        for disc in range(1, discs + 1):
+            with open(os.path.join(rom_path, f"{name} (Disc {disc}).bin"), "wb") as f:
+                f.write(content)
+    elif shape == "zip":
+        with zipfile.ZipFile(os.path.join(roms_path, f"{name}.zip"), "w") as archive:
+            archive.writestr(bin_name, content)
+    elif shape == "7z":
+        with py7zr.SevenZipFile(os.path.join(roms_path, f"{name}.7z"), "w") as archive:
+            archive.writestr(content, bin_name)
+    elif shape == "tar":
+        with tarfile.open(os.path.join(roms_path, f"{name}.tar"), "w") as archive:
+            info = tarfile.TarInfo(bin_name)
+            info.size = len(content)
+            archive.addfile(info, io.BytesIO(content))
+    elif shape == "bz2":
+        with bz2.open(os.path.join(roms_path, f"{bin_name}.bz2"), "wb") as f:
+            f.write(content)
+    else:
+        raise ValueError(f"Unknown rom shape: {shape}")
+
+
+def generate_library(
+    library_path: str,
+    platforms: int,
+    roms_per_platform: int,
+    shapes: list[str],
+    file_size: int,
+    discs: int,
+    seed: int,
+) -> list[str]:
+    """Generate a synthetic library, returning the slugs of its platforms"""
+    rng = random.Random(seed)
+    platform_slugs = list(PLATFORM_SLUGS[:platforms])
+
+    for slug in platform_slugs:
+        roms_path = os.path.join(library_path, slug, "roms")
+        os.makedirs(roms_path)
+
+        for index in range(roms_per_platform):
+            name = (
+                f"Synthetic Game {index:05d} "
+                f"{rng.choice(REGION_TAGS)}{rng.choice(EXTRA_TAGS)}"
+            )
+            _write_rom(
+                roms_path,
+                name,
+                shapes[index % len(shapes)],
+                rng.randbytes(file_size),
+                discs,
+            )
+
+    return platform_slugs
+
+
+def count_roms(library_path: str, platform_slugs: list[str]) -> int:
+    """Count the roms of a library, each file or folder of a platform being one rom"""
+    return sum(
+        len(os.listdir(os.path.join(library_path, slug, "roms")))
+        for slug in platform_slugs
+    )
+
+
+def _mock_providers(providers: list[str], latency: float) -> list[Any]:
+    """Patch the metadata lookups of the given providers with empty, delayed results"""
+    from handler.metadata import (
+        meta_hasheous_handler,
+        meta_igdb_handler,
+        meta_launchbox_handler,
+        meta_moby_handler,
+        meta_playmatch_handler,
+        meta_ra_handler,
+        meta_ss_handler,
+    )
+    from handler.metadata.hasheous_handler import HasheousRom
+    from handler.metadata.igdb_handler import IGDBRom
+    from handler.metadata.launchbox_handler import LaunchboxRom
+    from handler.metadata.moby_handler import MobyGamesRom
+    from handler.metadata.playmatch_handler import PlaymatchRomMatch
+    from handler.metadata.ra_handler import RAGameRom
+    from handler.metadata.ss_handler import SSRom
+
+    lookups: dict[str, list[tuple[Any, str, Any]]] = {
+        "igdb": [
+            (meta_igdb_handler, "get_rom", IGDBRom(igdb_id=None)),
+            (meta_igdb_handler, "get_rom_by_id", IGDBRom(igdb_id=None)),
+            (
+                meta_playmatch_handler,
+                "lookup_rom",
+                PlaymatchRomMatch(igdb_id=None),
+            ),
+        ],
+        "moby": [(meta_moby_handler, "get_rom", MobyGamesRom(moby_id=None))],
+        "ss": [(meta_ss_handler, "get_rom", SSRom(ss_id=None))],
+        "ra": [
+            (meta_ra_handler, "get_rom", RAGameRom(ra_id=None)),
+            (meta_ra_handler, "get_rom_by_id", RAGameRom(ra_id=None)),
+        ],
+        "lb": [(meta_launchbox_handler, "get_rom", LaunchboxRom(launchbox_id=None))],
+        "hasheous": [
+            (
+                meta_hasheous_handler,
+                "lookup_rom",
+                HasheousRom(hasheous_id=None, igdb_id=None, tgdb_id=None, ra_id=None),
+            ),
+        ],
+    }
+
+    def delayed(result):
+        async def lookup(*_args, **_kwargs):
+            await asyncio.sleep(latency)
+            return result
+
+        return lookup
+
+    return [
+        patch.object(handler, method, side_effect=delayed(result))
+        for provider in providers
+        for handler, method, result in lookups[provider]
+    ]
+
+
+class _SocketManager:
+    async def emit(self, *_args, **_kwargs) -> None:
+        pass
+
+
+def run_benchmark(
+    args: argparse.Namespace, platform_slugs: list[str], roms: int
+) -> None:
+    # Backend modules read the environment on import, so they are imported here
+    import alembic.config
+    from endpoints.sockets.scan import scan_platforms
+    from handler.database import db_platform_handler
+    from handler.database.base_handler import sync_engine
+    from handler.scan_handler import ScanType
+    from sqlalchemy import event
+
+    alembic.config.main(argv=["-q", "upgrade", "head"])
+
+    # Start from an empty library, so the first run adds every rom
+    for slug in platform_slugs:
+        platform = db_platform_handler.get_platform_by_fs_slug(slug)
+        if platform:
+            db_platform_handler.delete_platform(platform.id)
+
+    queries = 0
+
+    def count_query(*_args, **_kwargs) -> None:
+        nonlocal queries
+        queries += 1
+
+    event.listen(sync_engine, "before_cursor_execute", count_query)
+
+    results = []
+    patches = [
+        patch(
+            "endpoints.sockets.scan._get_socket_manager",
+            return_value=_SocketManager(),
+        ),
+        *_mock_providers(args.providers, args.latency),
+    ]
+    for active_patch in patches:
+        active_patch.start()
+
+    try:
+        for run in range(1, args.runs + 1):
+            queries = 0
+            profiler = None
+            if args.profile:
+                from pyinstrument import Profiler  # type: ignore[import-not-found]
+
+                profiler = Profiler(async_mode="enabled")
+                profiler.start()
+
+            start = time.perf_counter()
+            asyncio.run(
+                scan_platforms(
+                    [],
+                    scan_type=ScanType[args.scan_type.upper()],
+                    metadata_sources=args.providers,
+                )
+            )
+            wall_time = time.perf_counter() - start
+
+            if profiler:
+                profiler.stop()
+                report_path = os.path.abspath(f"scan_benchmark_run_{run}.html")
+                profiler.write_html(report_path)
+                print(f"Profile saved to {report_path}")
+
+            # ru_maxrss is the largest RSS since the process started, in kilobytes
+            # on Linux, so a run can't report less than the runs before it
+            result = BenchmarkResult(
+                run=run,
+                roms=roms,
+                wall_time=wall_time,
+                roms_per_second=roms / wall_time if wall_time else 0.0,
+                queries=queries,
+                queries_per_rom=queries / roms if roms else 0.0,
+                max_rss_mb=resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+                max_children_rss_mb=resource.getrusage(
+                    resource.RUSAGE_CHILDREN
+                ).ru_maxrss
+                / 1024,
+            )
+            results.append(result)
+            print(result.summary())
+    finally:
+        for active_patch in patches:
+            active_patch.stop()
+        event.remove(sync_engine, "before_cursor_execute", count_query)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump([asdict(result) for result in results], f, indent=2)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Benchmark library scans against a synthetic library"
+    )
+    parser.add_argument(
+        "--platforms",
+        type=int,
+        default=2,
+        choices=range(1, len(PLATFORM_SLUGS) + 1),
+        metavar=f"[1-{len(PLATFORM_SLUGS)}]",
+        help="Number of platforms to generate",
+    )
+    parser.add_argument(
+        "--roms", type=int, default=200, help="Number of roms per platform"
+    )
+    parser.add_argument(
+        "--shapes",
+        type=lambda value: value.split(","),
+        default=list(ROM_SHAPES),
+        help=f"Comma-separated rom shapes to cycle through ({','.join(ROM_SHAPES)})",
+    )
+    parser.add_argument(
+        "--file-size",
+        type=int,
+        default=64 * 1024,
+        help="Size of each rom file in bytes",
+    )
+    parser.add_argument(
+        "--discs", type=int, default=2, help="Number of discs of multi-disc roms"
+    )
+    parser.add_argument(
+        "--providers",
+        type=lambda value: value.split(","),
+        default=["igdb", "lb"],
+        help=f"Comma-separated metadata providers to mock ({','.join(PROVIDERS)})",
+    )
+    parser.add_argument(
+        "--latency",
+        type=float,
+        default=0.05,
+        help="Latency of each mocked provider lookup in seconds",
+    )
+    parser.add_argument(
+        "--scan-type",
+        default="quick",
+        help="Scan type of every run (quick, complete...)",
+    )
+    parser.add_argument(
+        "--runs", type=int, default=1, help="Number of scans of the same library"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Library generation seed")
+    parser.add_argument(
+        "--db-name", default="romm_benchmark", help="Database to run the scans against"
+    )
+    parser.add_argument(
+        "--library",
+        help="Folder to generate the library in, or reuse if it exists. "
+        "A temporary folder is used and removed afterwards if not given",
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="Save a pyinstrument report of each run"
+    )
+    parser.add_argument("--output", help="Save the results of every run as JSON")
+
+    args = parser.parse_args()
+    if unknown_shapes := set(args.shapes) - set(ROM_SHAPES):
+        parser.error(f"Unknown rom shapes: {', '.join(sorted(unknown_shapes))}")
+    if unknown_providers := set(args.providers) - set(PROVIDERS):
+        parser.error(f"Unknown providers: {', '.join(sorted(unknown_providers))}")
+
+    return args
+
+
+def main() -> None:
+    args = parse_args()
+
+    base_path = args.library or tempfile.mkdtemp(prefix="romm_benchmark_")
+    library_path = os.path.join(base_path, "library")
+
+    # Point the backend at the synthetic library and the benchmark database
+    os.environ["ROMM_BASE_PATH"] = base_path
+    os.environ["DB_NAME"] = args.db_name
+
+    try:
+        if os.path.isdir(library_path):
+            platform_slugs = sorted(os.listdir(library_path))
+            print(f"Reusing the library in {library_path}")
+        else:
+            start = time.perf_counter()
+            platform_slugs = generate_library(
+                library_path,
+                platforms=args.platforms,
+                roms_per_platform=args.roms,
+                shapes=args.shapes,
+                file_size=args.file_size,
+                discs=args.discs,
+                seed=args.seed,
+            )
+            print(
+                f"Generated {args.platforms * args.roms} roms in {library_path} "
+                f"in {time.perf_counter() - start:.2f}s"
+            )
+
+        # A reused library may not match --platforms and --roms, so count what the
+        # scans will actually find
+        run_benchmark(args, platform_slugs, count_roms(library_path, platform_slugs))
+    finally:
+        if not args.library:
+            shutil.rmtree(base_path, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -5,7 +5,13 @@ from typing import TypeVar
 
 import aiohttp
 import httpx
+from config import METRICS_ENABLED
 from fastapi import Request, Response
+from utils.metrics import (
+    REGISTRY,
+    aiohttp_metrics_trace_config,
+    httpx_metrics_event_hooks,
+)
 
 _T = TypeVar("_T")
 
@@ -25,12 +31,20 @@ async def set_context_var(var: ContextVar[_T], value: _T) -> AsyncGenerator[Toke
 async def initialize_context() -> AsyncGenerator[None]:
     """Initialize context variables."""
     async with (
-        aiohttp.ClientSession() as aiohttp_session,
-        httpx.AsyncClient() as httpx_client,
+        aiohttp.ClientSession(
+            trace_configs=[aiohttp_metrics_trace_config()] if METRICS_ENABLED else None
+        ) as aiohttp_session,
+        httpx.AsyncClient(
+            event_hooks=httpx_metrics_event_hooks() if METRICS_ENABLED else None
+        ) as httpx_client,
         set_context_var(ctx_aiohttp_session, aiohttp_session),
         set_context_var(ctx_httpx_client, httpx_client),
     ):
-        yield
+        try:
+            yield
+        finally:
+            # Jobs run in short-lived processes, so don't wait for the next flush
+            REGISTRY.flush()
 
 
 async def set_context_middleware(
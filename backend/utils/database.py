@@ -2,6 +2,7 @@ import json
 from typing import Any
 
 import sqlalchemy as sa
+from sqlalchemy.dialects import mysql as sa_mysql
 from sqlalchemy.dialects import postgresql as sa_pg
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import ColumnElement, func
@@ -39,6 +40,28 @@ def json_array_contains_value(
     return func.json_contains(column, value)
 
 
+def upsert(
+    table: sa.Table,
+    rows: list[dict[str, Any]],
+    *,
+    index_elements: list[str],
+    session: Session,
+) -> sa.Insert:
+    """Build a multi-row INSERT that updates the existing rows on key conflicts."""
+    update_columns = [key for key in rows[0] if key not in index_elements]
+    if is_postgresql(session.connection()):
+        pg_stmt = sa_pg.insert(table).values(rows)
+        return pg_stmt.on_conflict_do_update(
+            index_elements=index_elements,
+            set_={key: pg_stmt.excluded[key] for key in update_columns},
+        )
+
+    mysql_stmt = sa_mysql.insert(table).values(rows)
+    return mysql_stmt.on_duplicate_key_update(
+        {key: mysql_stmt.inserted[key] for key in update_columns}
+    )
+
+
 def safe_float(value: Any, default: float = 0.0) -> float:
     """Safely convert a value to float, returning default if conversion fails."""
     try:
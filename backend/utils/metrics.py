@@ -0,0 +1,294 @@
+import re
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Iterator, Sequence
+from contextlib import contextmanager
+from typing import Any, Final, cast
+
+import aiohttp
+import httpx
+from config import METRICS_ENABLED
+from fastapi import Request, Response
+from handler.redis_handler import sync_cache
+from logger.logger import log
+
+METRICS_KEY: Final = "romm:metrics"
+# How often each process pushes its samples to Redis
+METRICS_FLUSH_INTERVAL: Final = 5.0
+
+DEFAULT_BUCKETS: Final = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+BUCKET_BOUND_REGEX: Final = re.compile(r',?le="([^"]+)"')
+
+
+def _escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+
+    return (
+        "{"
+        + ",".join(
+            f'{name}="{_escape_label_value(value)}"'
+            for name, value in sorted(labels.items())
+        )
+        + "}"
+    )
+
+
+def _sample_order(sample: str) -> tuple[str, float]:
+    """Sort samples by labels, and histogram buckets by their upper bound"""
+    match = BUCKET_BOUND_REGEX.search(sample)
+    if not match:
+        return sample, 0.0
+
+    bound = match.group(1)
+    return (
+        sample[: match.start()] + sample[match.end() :],
+        float("inf") if bound == "+Inf" else float(bound),
+    )
+
+
+class MetricsRegistry:
+    """Collects samples in memory and aggregates them in Redis.
+
+    The web, worker and watcher processes all record samples, so each one buffers its
+    increments and pushes them to a shared Redis hash every few seconds. The hash is
+    keyed by sample line, which makes rendering the Prometheus text format a matter
+    of sorting it.
+    """
+
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+        self._pending: defaultdict[str, float] = defaultdict(float)
+        self._lock = threading.Lock()
+        self._flushed_at = time.monotonic()
+
+    def register(self, metric: "Metric") -> None:
+        self.metrics[metric.name] = metric
+
+    def add(self, samples: Sequence[tuple[str, float]]) -> None:
+        with self._lock:
+            for sample, value in samples:
+                self._pending[sample] += value
+
+        if time.monotonic() - self._flushed_at >= METRICS_FLUSH_INTERVAL:
+            self.flush()
+
+    def flush(self) -> None:
+        """Push the samples recorded by this process to Redis"""
+        with self._lock:
+            pending, self._pending = self._pending, defaultdict(float)
+            self._flushed_at = time.monotonic()
+
+        if not pending:
+            return
+
+        try:
+            with sync_cache.pipeline(transaction=False) as pipe:
+                for sample, value in pending.items():
+                    pipe.hincrbyfloat(METRICS_KEY, sample, value)
+                pipe.execute()
+        except Exception as exc:
+            log.warning(f"Unable to store metrics: {exc}")
+            # Keep the samples for the next flush
+            with self._lock:
+                for sample, value in pending.items():
+                    self._pending[sample] += value
+
+    def render(self) -> str:
+        """All the samples, in the Prometheus text exposition format"""
+        self.flush()
+        stored = cast(dict[Any, Any], sync_cache.hgetall(METRICS_KEY))
+
+        samples_by_metric: defaultdict[str, list[tuple[str, str]]] = defaultdict(list)
+        for sample, value in stored.items():
+            sample = sample.decode() if isinstance(sample, bytes) else sample
+            value = value.decode() if isinstance(value, bytes) else value
+            samples_by_metric[sample.split("{", 1)[0]].append((sample, value))
+
+        lines = []
+        for metric in sorted(self.metrics.values(), key=lambda m: m.name):
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for suffix in metric.suffixes:
+                lines.extend(
+                    f"{sample} {value}"
+                    for sample, value in sorted(
+                        samples_by_metric[f"{metric.name}{suffix}"],
+                        key=lambda s: _sample_order(s[0]),
+                    )
+                )
+
+        return "\n".join(lines) + "\n"
+
+
+class Metric:
+    type: str = "untyped"
+    suffixes: tuple[str, ...] = ("",)
+
+    def __init__(
+        self, name: str, description: str, registry: MetricsRegistry | None = None
+    ) -> None:
+        self.name = name
+        self.description = description
+        self.registry = registry or REGISTRY
+        self.registry.register(self)
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+
+        self.registry.add([(f"{self.name}{_format_labels(labels)}", amount)])
+
+
+class Histogram(Metric):
+    type = "histogram"
+    suffixes = ("_bucket", "_sum", "_count")
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+        registry: MetricsRegistry | None = None,
+    ) -> None:
+        super().__init__(name, description, registry)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: str) -> None:
+        if not METRICS_ENABLED:
+            return
+
+        # Buckets are cumulative, so the observation counts in every bucket above it
+        samples = [
+            (f"{self.name}_bucket{_format_labels({**labels, 'le': str(bound)})}", 1.0)
+            for bound in self.buckets
+            if value <= bound
+        ]
+        samples.extend(
+            [
+                (f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})}", 1.0),
+                (f"{self.name}_sum{_format_labels(labels)}", value),
+                (f"{self.name}_count{_format_labels(labels)}", 1.0),
+            ]
+        )
+        self.registry.add(samples)
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+REGISTRY: Final = MetricsRegistry()
+
+HTTP_REQUEST_DURATION: Final = Histogram(
+    "romm_http_request_duration_seconds", "Time spent serving API requests"
+)
+DB_QUERY_DURATION: Final = Histogram(
+    "romm_db_query_duration_seconds", "Time spent running database queries"
+)
+DB_POOL_CHECKOUT_WAIT: Final = Histogram(
+    "romm_db_pool_checkout_wait_seconds",
+    "Time spent waiting for a database connection from the pool",
+)
+DB_POOL_CHECKOUT_TIMEOUTS: Final = Counter(
+    "romm_db_pool_checkout_timeouts_total",
+    "Checkouts that timed out with every connection of the pool in use",
+)
+PROVIDER_REQUEST_DURATION: Final = Histogram(
+    "romm_provider_request_duration_seconds",
+    "Time spent on requests to metadata providers and other external services",
+)
+PROVIDER_REQUEST_ERRORS: Final = Counter(
+    "romm_provider_request_errors_total",
+    "Requests to external services that failed or returned an error status",
+)
+PROVIDER_RATE_LIMIT_WAIT: Final = Counter(
+    "romm_provider_rate_limit_wait_seconds_total",
+    "Time spent waiting on the rate limit of each metadata provider",
+)
+SCANNED_ROMS: Final = Counter("romm_scan_roms_total", "Roms scanned")
+HASHED_BYTES: Final = Counter("romm_scan_hashed_bytes_total", "Bytes of roms hashed")
+
+
+async def metrics_middleware(
+    request: Request, call_next: Callable[[Request], Awaitable[Response]]
+) -> Response:
+    """Record the latency of API requests, by route"""
+    if not METRICS_ENABLED:
+        return await call_next(request)
+
+    start = time.perf_counter()
+    response = await call_next(request)
+
+    # Label by route template, so paths with ids don't create a series each
+    route = request.scope.get("route")
+    HTTP_REQUEST_DURATION.observe(
+        time.perf_counter() - start,
+        method=request.method,
+        route=getattr(route, "path", "unmatched"),
+        status=str(response.status_code),
+    )
+    return response
+
+
+def httpx_metrics_event_hooks() -> dict[str, list[Callable[..., Any]]]:
+    """httpx event hooks recording the latency and errors of requests, by host
+
+    Hooks leave the client's transport alone, so proxies from the environment
+    still apply.
+    """
+
+    async def on_request(request: httpx.Request) -> None:
+        request.extensions["metrics_start"] = time.perf_counter()
+
+    async def on_response(response: httpx.Response) -> None:
+        request = response.request
+        host = request.url.host
+        PROVIDER_REQUEST_DURATION.observe(
+            time.perf_counter() - request.extensions["metrics_start"], host=host
+        )
+        if response.status_code >= 400:
+            PROVIDER_REQUEST_ERRORS.inc(host=host)
+
+    return {"request": [on_request], "response": [on_response]}
+
+
+def aiohttp_metrics_trace_config() -> aiohttp.TraceConfig:
+    """aiohttp trace config recording the latency and errors of requests, by host"""
+
+    async def on_request_start(_session, context, params) -> None:
+        context.start = time.perf_counter()
+
+    async def on_request_end(_session, context, params) -> None:
+        host = params.url.host or ""
+        PROVIDER_REQUEST_DURATION.observe(
+            time.perf_counter() - context.start, host=host
+        )
+        if params.response.status >= 400:
+            PROVIDER_REQUEST_ERRORS.inc(host=host)
+
+    async def on_request_exception(_session, context, params) -> None:
+        host = params.url.host or ""
+        PROVIDER_REQUEST_DURATION.observe(
+            time.perf_counter() - context.start, host=host
+        )
+        PROVIDER_REQUEST_ERRORS.inc(host=host)
+
+    trace_config = aiohttp.TraceConfig()
+    trace_config.on_request_start.append(on_request_start)
+    trace_config.on_request_end.append(on_request_end)
+    trace_config.on_request_exception.append(on_request_exception)
+    return trace_config
@@ -0,0 +1,73 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+_T = TypeVar("_T")
+
+
+@dataclass(frozen=True)
+class PipelineStage(Generic[_T]):
+    """A step of a pipeline, run by at most `concurrency` items at once.
+
+    Items enter `ordered` stages strictly in input order, which keeps side effects like
+    database writes and socket events deterministic while other stages run concurrently.
+    """
+
+    name: str
+    func: Callable[[_T], Awaitable[_T]]
+    concurrency: int = 1
+    ordered: bool = False
+
+
+async def run_pipeline(
+    items: Sequence[_T],
+    stages: Sequence[PipelineStage[_T]],
+    max_in_flight: int,
+) -> list[_T]:
+    """Run every item through the stages, with several items moving at once.
+
+    At most `max_in_flight` items are admitted into the pipeline at the same time, so
+    items waiting on a busy stage behave like a bounded queue in front of it.
+    The first exception raised by a stage cancels the remaining items and is re-raised.
+
+    Returns:
+        The output of the last stage for each item, in input order
+    """
+    in_flight = asyncio.Semaphore(max(1, max_in_flight))
+    stage_slots = [asyncio.Semaphore(max(1, stage.concurrency)) for stage in stages]
+    # For ordered stages, an event per item set once it has left that stage
+    stage_turns = {
+        index: [asyncio.Event() for _ in items]
+        for index, stage in enumerate(stages)
+        if stage.ordered
+    }
+    results: list[_T] = list(items)
+
+    async def process(seq: int, item: _T) -> None:
+        try:
+            for index, stage in enumerate(stages):
+                turns = stage_turns.get(index)
+                if turns is not None and seq > 0:
+                    await turns[seq - 1].wait()
+
+                try:
+                    async with stage_slots[index]:
+                        item = await stage.func(item)
+                finally:
+                    if turns is not None:
+                        turns[seq].set()
+
+            results[seq] = item
+        finally:
+            in_flight.release()
+
+    try:
+        async with asyncio.TaskGroup() as tg:
+            for seq, item in enumerate(items):
+                await in_flight.acquire()
+                tg.create_task(process(seq, item))
+    except ExceptionGroup as eg:
+        raise eg.exceptions[0] from None
+
+    return results
@@ -0,0 +1,262 @@
+import asyncio
+import time
+import uuid
+from collections import defaultdict
+from collections.abc import AsyncIterator, Awaitable, Callable, Mapping
+from contextlib import asynccontextmanager
+from typing import Any, cast
+
+from handler.redis_handler import async_cache
+from logger.logger import log
+from redis.exceptions import RedisError, WatchError
+from utils.metrics import PROVIDER_RATE_LIMIT_WAIT
+
+RATE_LIMIT_KEY = "romm:rate_limit"
+CONCURRENCY_LIMIT_KEY = "romm:concurrency_limit"
+
+# Seconds each provider's callers spent waiting for a token or a slot, in this process
+_waited_seconds: defaultdict[str, float] = defaultdict(float)
+
+
+def rate_limit_waits() -> dict[str, float]:
+    """Snapshot of the seconds spent waiting on each provider's limits"""
+    return dict(_waited_seconds)
+
+
+def _record_wait(name: str, seconds: float) -> None:
+    _waited_seconds[name] += seconds
+    PROVIDER_RATE_LIMIT_WAIT.inc(seconds, provider=name)
+
+
+def retry_after_seconds(
+    headers: Mapping[str, str] | None, default: float = 2.0
+) -> float:
+    """Read the delay requested by a 429 response's Retry-After header"""
+    try:
+        return float((headers or {}).get("Retry-After", default))
+    except ValueError:
+        return default
+
+
+class TokenBucket:
+    """Async token bucket allowing `rate` acquisitions per second, with bursts of up to
+    `capacity`.
+
+    Callers that find the bucket empty reserve a future token and sleep until it's
+    refilled, so concurrent callers are served in the order they arrived. No asyncio
+    primitives are held, which lets module-level handlers share a bucket across loops.
+    """
+
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+
+    def _reserve(self) -> float:
+        """Take a token, returning how long to wait before it can be used"""
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated_at) * self.rate
+        )
+        self._updated_at = now
+        self._tokens -= 1
+
+        return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    async def acquire(self) -> None:
+        delay = self._reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+
+class RedisTokenBucket(TokenBucket):
+    """Token bucket shared through Redis by every process calling a provider.
+
+    The web and worker processes reserve tokens from the same bucket, so the
+    provider's limit holds for the whole instance. If Redis can't be reached,
+    callers fall back to a bucket local to the process.
+    """
+
+    def __init__(self, name: str, rate: float, capacity: float | None = None) -> None:
+        super().__init__(rate, capacity)
+        self.name = name
+        self.key = f"{RATE_LIMIT_KEY}:{name}"
+
+    async def _update(self, take: Callable[[float], float]) -> float:
+        """Atomically refill the shared bucket and apply `take` to its tokens"""
+        async with async_cache.pipeline() as pipe:
+            while True:
+                try:
+                    await pipe.watch(self.key)
+                    tokens, updated_at = await cast(
+                        Awaitable[list[Any]],
+                        pipe.hmget(self.key, ["tokens", "updated_at"]),
+                    )
+                    seconds, microseconds = await pipe.time()
+                    now = seconds + microseconds / 1_000_000
+                    if tokens is None or updated_at is None:
+                        available = self.capacity
+                    else:
+                        available = min(
+                            self.capacity,
+                            float(tokens) + (now - float(updated_at)) * self.rate,
+                        )
+                    remaining = take(available)
+
+                    pipe.multi()
+                    pipe.hset(
+                        self.key, mapping={"tokens": remaining, "updated_at": now}
+                    )
+                    # Drop the bucket once it would be full again anyway
+                    pipe.expire(
+                        self.key, int((self.capacity - remaining) / self.rate) + 1
+                    )
+                    await pipe.execute()
+                    return remaining
+                except WatchError:
+                    # Another process updated the bucket first
+                    continue
+
+    async def acquire(self) -> None:
+        try:
+            tokens = await self._update(lambda available: available - 1)
+            delay = 0.0 if tokens >= 0 else -tokens / self.rate
+        except RedisError as exc:
+            log.warning(f"Unable to reach the {self.name} rate limiter: {exc}")
+            delay = self._reserve()
+
+        if delay > 0:
+            _record_wait(self.name, delay)
+            await asyncio.sleep(delay)
+
+    async def backoff(self, seconds: float) -> None:
+        """Hold back every caller for `seconds`, e.g. when the provider answers 429"""
+        try:
+            await self._update(lambda available: min(available, -seconds * self.rate))
+        except RedisError as exc:
+            log.warning(f"Unable to reach the {self.name} rate limiter: {exc}")
+            self._tokens = min(self._tokens, -seconds * self.rate)
+            self._updated_at = time.monotonic()
+
+
+class RedisConcurrencyLimit:
+    """Cap on the requests in flight to a provider, shared through Redis by every
+    process calling it.
+
+    Each request holds a lease in a sorted set, scored by the time it expires, so the
+    slots of a process that died mid-request free up once their leases run out.
+    Waiters block on a list that finished requests push to, and check again every
+    `release_timeout` seconds for leases that expired. If Redis can't be reached,
+    the cap only counts the requests of this process.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        limit: int,
+        lease_seconds: int = 300,
+        release_timeout: float = 1.0,
+    ) -> None:
+        self.name = name
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self.release_timeout = release_timeout
+        self.key = f"{CONCURRENCY_LIMIT_KEY}:{name}"
+        self.release_key = f"{self.key}:released"
+        self._in_flight = 0
+        # Bound to the loop it was created in, as handlers outlive the job loops
+        self._released: asyncio.Condition | None = None
+        self._released_loop: asyncio.AbstractEventLoop | None = None
+
+    def _local_released(self) -> asyncio.Condition:
+        loop = asyncio.get_running_loop()
+        if self._released is None or self._released_loop is not loop:
+            self._released = asyncio.Condition()
+            self._released_loop = loop
+        return self._released
+
+    async def _try_lease(self, lease: str) -> bool:
+        """Atomically take a slot for `lease` if one is free"""
+        async with async_cache.pipeline() as pipe:
+            while True:
+                try:
+                    await pipe.watch(self.key)
+                    seconds, microseconds = await pipe.time()
+                    now = seconds + microseconds / 1_000_000
+                    in_flight = await cast(
+                        Awaitable[int], pipe.zcount(self.key, now, "+inf")
+                    )
+                    if in_flight >= self.limit:
+                        return False
+
+                    pipe.multi()
+                    pipe.zremrangebyscore(self.key, "-inf", now)
+                    pipe.zadd(self.key, {lease: now + self.lease_seconds})
+                    pipe.expire(self.key, self.lease_seconds)
+                    await pipe.execute()
+                    return True
+                except WatchError:
+                    # Another process took or released a slot first
+                    continue
+
+    async def _lease(self, lease: str) -> bool:
+        """Take a shared slot for `lease`, returning whether it had to wait"""
+        waited = False
+        while not await self._try_lease(lease):
+            waited = True
+            await cast(
+                Awaitable[Any],
+                async_cache.blpop([self.release_key], timeout=self.release_timeout),
+            )
+        return waited
+
+    async def _release(self, lease: str) -> None:
+        async with async_cache.pipeline(transaction=True) as pipe:
+            pipe.zrem(self.key, lease)
+            pipe.lpush(self.release_key, lease)
+            # Wake up as many waiters as there are slots, not one per past release
+            pipe.ltrim(self.release_key, 0, self.limit - 1)
+            pipe.expire(self.release_key, self.lease_seconds)
+            await pipe.execute()
+
+    async def _wait_for_local_slot(self) -> bool:
+        """Wait for one of this process' slots, returning whether it had to wait"""
+        released = self._local_released()
+        async with released:
+            waited = self._in_flight >= self.limit
+            await released.wait_for(lambda: self._in_flight < self.limit)
+        return waited
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """Hold one of the provider's slots for the duration of a request"""
+        lease = uuid.uuid4().hex
+        start = time.monotonic()
+        try:
+            waited = await self._lease(lease)
+        except RedisError as exc:
+            log.warning(f"Unable to reach the {self.name} concurrency limit: {exc}")
+            waited = await self._wait_for_local_slot()
+            lease = ""
+
+        if waited:
+            _record_wait(self.name, time.monotonic() - start)
+
+        self._in_flight += 1
+        try:
+            yield
+        finally:
+            self._in_flight -= 1
+            released = self._local_released()
+            async with released:
+                released.notify()
+
+            if lease:
+                try:
+                    await self._release(lease)
+                except RedisError as exc:
+                    # The lease expires on its own
+                    log.warning(
+                        f"Unable to release the {self.name} concurrency limit: {exc}"
+                    )
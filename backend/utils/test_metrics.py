@@ -0,0 +1,98 @@
+from unittest.mock import patch
+
+import httpx
+import pytest
+from handler.redis_handler import sync_cache
+from utils.metrics import (
+    METRICS_KEY,
+    PROVIDER_REQUEST_ERRORS,
+    REGISTRY,
+    Counter,
+    Histogram,
+    MetricsRegistry,
+    httpx_metrics_event_hooks,
+)
+
+
+@pytest.fixture(autouse=True)
+def enable_metrics():
+    with patch("utils.metrics.METRICS_ENABLED", True):
+        yield
+    sync_cache.delete(METRICS_KEY)
+
+
+def test_counter_render():
+    registry = MetricsRegistry()
+    counter = Counter("test_requests_total", "Test requests", registry=registry)
+
+    counter.inc(host="example.com")
+    counter.inc(2, host="example.com")
+    counter.inc(host="other.com")
+
+    assert registry.render().splitlines() == [
+        "# HELP test_requests_total Test requests",
+        "# TYPE test_requests_total counter",
+        'test_requests_total{host="example.com"} 3',
+        'test_requests_total{host="other.com"} 1',
+    ]
+
+
+def test_histogram_render():
+    registry = MetricsRegistry()
+    histogram = Histogram(
+        "test_duration_seconds", "Test duration", buckets=(0.25, 1), registry=registry
+    )
+
+    histogram.observe(0.125, route="/api/roms")
+    histogram.observe(0.5, route="/api/roms")
+    histogram.observe(4, route="/api/roms")
+
+    assert registry.render().splitlines() == [
+        "# HELP test_duration_seconds Test duration",
+        "# TYPE test_duration_seconds histogram",
+        'test_duration_seconds_bucket{le="0.25",route="/api/roms"} 1',
+        'test_duration_seconds_bucket{le="1",route="/api/roms"} 2',
+        'test_duration_seconds_bucket{le="+Inf",route="/api/roms"} 3',
+        'test_duration_seconds_sum{route="/api/roms"} 4.625',
+        'test_duration_seconds_count{route="/api/roms"} 3',
+    ]
+
+
+def test_samples_are_shared_across_registries():
+    # Each process has its own registry, all of them flushing to the same hash
+    first = MetricsRegistry()
+    second = MetricsRegistry()
+    Counter("test_shared_total", "Test shared", registry=first).inc()
+    Counter("test_shared_total", "Test shared", registry=second).inc()
+
+    first.flush()
+    assert "test_shared_total 2" in second.render().splitlines()
+
+
+def test_disabled_metrics_are_not_recorded():
+    registry = MetricsRegistry()
+    counter = Counter("test_disabled_total", "Test disabled", registry=registry)
+
+    with patch("utils.metrics.METRICS_ENABLED", False):
+        counter.inc()
+
+    assert registry.render().splitlines() == [
+        "# HELP test_disabled_total Test disabled",
+        "# TYPE test_disabled_total counter",
+    ]
+
+
+async def test_httpx_metrics_event_hooks():
+    async with httpx.AsyncClient(
+        transport=httpx.MockTransport(lambda request: httpx.Response(503)),
+        event_hooks=httpx_metrics_event_hooks(),
+    ) as client:
+        await client.get("https://provider.example.com/games")
+
+    REGISTRY.flush()
+    lines = REGISTRY.render().splitlines()
+    assert (
+        'romm_provider_request_duration_seconds_count{host="provider.example.com"} 1'
+        in lines
+    )
+    assert f'{PROVIDER_REQUEST_ERRORS.name}{{host="provider.example.com"}} 1' in lines
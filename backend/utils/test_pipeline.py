@@ -0,0 +1,62 @@
+import asyncio
+import random
+
+import pytest
+from utils.pipeline import PipelineStage, run_pipeline
+
+
+async def test_run_pipeline_keeps_input_order():
+    processed: list[int] = []
+
+    async def slow_double(item: int) -> int:
+        await asyncio.sleep(random.uniform(0, 0.01))
+        return item * 2
+
+    async def record(item: int) -> int:
+        processed.append(item)
+        return item
+
+    results = await run_pipeline(
+        list(range(20)),
+        [
+            PipelineStage("double", slow_double, concurrency=5),
+            PipelineStage("record", record, ordered=True),
+        ],
+        max_in_flight=8,
+    )
+
+    assert results == [i * 2 for i in range(20)]
+    assert processed == results
+
+
+async def test_run_pipeline_bounds_concurrency():
+    running = 0
+    max_running = 0
+
+    async def track(item: int) -> int:
+        nonlocal running, max_running
+        running += 1
+        max_running = max(max_running, running)
+        await asyncio.sleep(0.005)
+        running -= 1
+        return item
+
+    await run_pipeline(
+        list(range(20)),
+        [PipelineStage("track", track, concurrency=3)],
+        max_in_flight=10,
+    )
+
+    assert max_running == 3
+
+
+async def test_run_pipeline_raises_stage_error():
+    async def fail(item: int) -> int:
+        if item == 3:
+            raise ValueError("boom")
+        return item
+
+    with pytest.raises(ValueError, match="boom"):
+        await run_pipeline(
+            list(range(5)), [PipelineStage("fail", fail)], max_in_flight=2
+        )
@@ -0,0 +1,99 @@
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+from handler.redis_handler import async_cache
+from redis.exceptions import ConnectionError
+from utils.rate_limiter import (
+    CONCURRENCY_LIMIT_KEY,
+    RATE_LIMIT_KEY,
+    RedisConcurrencyLimit,
+    RedisTokenBucket,
+    rate_limit_waits,
+    retry_after_seconds,
+)
+
+
+@pytest.fixture(autouse=True)
+async def clear_buckets():
+    yield
+    for pattern in (f"{RATE_LIMIT_KEY}:*", f"{CONCURRENCY_LIMIT_KEY}:*"):
+        async for key in async_cache.scan_iter(pattern):
+            await async_cache.delete(key)
+
+
+async def test_redis_token_bucket_is_shared():
+    first = RedisTokenBucket("test_shared", rate=20)
+    second = RedisTokenBucket("test_shared", rate=20)
+
+    start = time.monotonic()
+    for _ in range(20):
+        await first.acquire()
+    # The burst used up the shared bucket, so the other instance has to wait
+    await second.acquire()
+    await second.acquire()
+
+    assert time.monotonic() - start >= 0.08
+    assert rate_limit_waits()["test_shared"] > 0
+
+
+async def test_redis_token_bucket_backoff():
+    bucket = RedisTokenBucket("test_backoff", rate=10)
+
+    await bucket.backoff(0.2)
+    start = time.monotonic()
+    await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.2
+
+
+async def _hold(limit: RedisConcurrencyLimit, counts: list[int], seconds: float):
+    async with limit.slot():
+        counts.append(await async_cache.zcard(limit.key))
+        await asyncio.sleep(seconds)
+
+
+async def test_redis_concurrency_limit_is_shared():
+    first = RedisConcurrencyLimit("test_shared", limit=2)
+    second = RedisConcurrencyLimit("test_shared", limit=2)
+    counts: list[int] = []
+
+    start = time.monotonic()
+    await asyncio.gather(
+        *(_hold(limit, counts, 0.05) for limit in (first, second, first, second))
+    )
+
+    # Both instances draw from the same two slots, so the requests ran in two rounds,
+    # the second one starting as soon as the first released its slots
+    assert 0.1 <= time.monotonic() - start < first.release_timeout
+    assert max(counts) == 2
+    assert await async_cache.zcard(first.key) == 0
+    assert rate_limit_waits()["test_shared"] > 0
+
+
+async def test_redis_concurrency_limit_expired_leases():
+    limit = RedisConcurrencyLimit("test_expired", limit=1, lease_seconds=1)
+    # A lease left behind by a process that died mid-request
+    await async_cache.zadd(limit.key, {"dead": time.time() - 1})
+
+    async with limit.slot():
+        assert await async_cache.zscore(limit.key, "dead") is None
+        assert await async_cache.zcard(limit.key) == 1
+
+
+async def test_redis_concurrency_limit_without_redis():
+    limit = RedisConcurrencyLimit("test_local", limit=1)
+    counts: list[int] = []
+
+    with patch.object(limit, "_try_lease", side_effect=ConnectionError()):
+        start = time.monotonic()
+        await asyncio.gather(_hold(limit, counts, 0.05), _hold(limit, counts, 0.05))
+
+    assert time.monotonic() - start >= 0.1
+
+
+def test_retry_after_seconds():
+    assert retry_after_seconds({"Retry-After": "5"}) == 5.0
+    assert retry_after_seconds({"Retry-After": "soon"}) == 2.0
+    assert retry_after_seconds(None, default=1.0) == 1.0
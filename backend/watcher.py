@@ -1,4 +1,6 @@
 import os
+import threading
+from dataclasses import dataclass, field
 from datetime import timedelta
 
 import sentry_sdk
@@ -6,15 +8,19 @@ from config import (
     ENABLE_RESCAN_ON_FILESYSTEM_CHANGE,
     LIBRARY_BASE_PATH,
     RESCAN_ON_FILESYSTEM_CHANGE_DELAY,
+    RESCAN_ON_FILESYSTEM_CHANGE_INCREMENTAL,
+    SCAN_TIMEOUT,
     SENTRY_DSN,
 )
 from config.config_manager import config_manager as cm
-from endpoints.sockets.scan import scan_platforms
+from endpoints.sockets.scan import scan_platforms, scan_rom_changes
 from handler.database import db_platform_handler
-from handler.scan_handler import ScanType
+from handler.redis_handler import high_prio_queue
+from handler.scan_handler import ScanType, get_enabled_metadata_sources
 from logger.formatter import CYAN
 from logger.formatter import highlight as hl
 from logger.logger import log
+from models.platform import Platform
 from rq.job import Job
 from tasks.tasks import tasks_scheduler
 from utils import get_version
@@ -41,9 +47,143 @@ path = (
 )
 
 
+def get_rom_fs_name(event_src: str) -> str | None:
+    """Get the filesystem name of the rom an event path belongs to.
+
+    Args:
+        event_src: Event path, relative to the watched path.
+
+    Returns:
+        The name of the rom file or folder, or None if the path isn't inside a rom.
+    """
+    parts = event_src.strip("/").split("/")
+
+    # Roms live in <platform>/<roms folder>/ under the library base path
+    if path == LIBRARY_BASE_PATH:
+        if len(parts) < 3 or parts[1] != cm.get_config().ROMS_FOLDER_NAME:
+            return None
+        return parts[2]
+
+    # The watched path already includes the roms folder in the high priority structure
+    return parts[1] if len(parts) >= 2 else None
+
+
+@dataclass
+class PlatformChanges:
+    """Roms of a platform that changed during the debounce window"""
+
+    fs_names: set[str] = field(default_factory=set)
+    renamed_fs_names: dict[str, str] = field(default_factory=dict)
+
+    def add_rename(self, old_fs_name: str, new_fs_name: str) -> None:
+        # Follow chained renames back to the name the database knows about
+        for previous_fs_name, fs_name in self.renamed_fs_names.items():
+            if fs_name == old_fs_name:
+                old_fs_name = previous_fs_name
+                break
+
+        if old_fs_name == new_fs_name:
+            self.renamed_fs_names.pop(old_fs_name, None)
+            self.fs_names.add(new_fs_name)
+        else:
+            self.renamed_fs_names[old_fs_name] = new_fs_name
+
+
+class IncrementalChanges:
+    """Accumulates changed roms per platform and scans only those once the
+    debounce window elapses."""
+
+    def __init__(self, delay: float) -> None:
+        self.delay = delay
+        self._changes: dict[int, PlatformChanges] = {}
+        self._lock = threading.Lock()
+
+    def _get_changes(self, platform_id: int) -> PlatformChanges:
+        """Get the pending changes of a platform, starting its window on first use."""
+        if platform_id not in self._changes:
+            self._changes[platform_id] = PlatformChanges()
+
+            timer = threading.Timer(self.delay, self.flush, args=(platform_id,))
+            timer.daemon = True
+            timer.start()
+
+        return self._changes[platform_id]
+
+    def add(self, platform_id: int, fs_name: str) -> None:
+        with self._lock:
+            self._get_changes(platform_id).fs_names.add(fs_name)
+
+    def add_rename(self, platform_id: int, old_fs_name: str, new_fs_name: str) -> None:
+        with self._lock:
+            self._get_changes(platform_id).add_rename(old_fs_name, new_fs_name)
+
+    def flush(self, platform_id: int) -> None:
+        with self._lock:
+            changes = self._changes.pop(platform_id, None)
+
+        if not changes:
+            return
+
+        metadata_sources = get_enabled_metadata_sources()
+        if not metadata_sources:
+            log.warning("No metadata sources enabled, skipping changed roms")
+            return
+
+        high_prio_queue.enqueue(
+            scan_rom_changes,
+            platform_id,
+            sorted(changes.fs_names),
+            changes.renamed_fs_names,
+            metadata_sources,
+            job_timeout=SCAN_TIMEOUT,
+        )
+
+
 class EventHandler(FileSystemEventHandler):
     """Filesystem event handler"""
 
+    def __init__(self) -> None:
+        super().__init__()
+        self.incremental_changes = IncrementalChanges(
+            delay=RESCAN_ON_FILESYSTEM_CHANGE_DELAY * 60
+        )
+
+    def on_incremental_event(
+        self, event: FileSystemEvent, event_src: str, db_platform: Platform | None
+    ) -> bool:
+        """Record the roms changed by an event for an incremental scan.
+
+        Args:
+            event: The event object representing the file system event.
+            event_src: Event path, relative to the watched path.
+            db_platform: Platform the event path belongs to.
+
+        Returns:
+            Whether the event was recorded, or a platform scan is needed instead.
+        """
+        fs_name = get_rom_fs_name(event_src)
+        if not fs_name or not db_platform:
+            return False
+
+        dest_fs_name = None
+        dest_platform = None
+        if isinstance(event, FileSystemMovedEvent):
+            dest_src = os.fsdecode(event.dest_path).split(path)[-1]
+            dest_fs_name = get_rom_fs_name(dest_src)
+            dest_platform = db_platform_handler.get_platform_by_fs_slug(
+                dest_src.split("/")[1]
+            )
+
+        if dest_fs_name and dest_platform and dest_platform.id == db_platform.id:
+            self.incremental_changes.add_rename(db_platform.id, fs_name, dest_fs_name)
+        else:
+            self.incremental_changes.add(db_platform.id, fs_name)
+            if dest_fs_name and dest_platform:
+                self.incremental_changes.add(dest_platform.id, dest_fs_name)
+
+        log.info(f"Changed rom {hl(fs_name)} queued for incremental scan")
+        return True
+
     def on_any_event(self, event: FileSystemEvent) -> None:
         """Catch-all event handler.
 
@@ -65,6 +205,11 @@ class EventHandler(FileSystemEventHandler):
 
         log.info(f"Filesystem event: {event.event_type} {event_src}")
 
+        if RESCAN_ON_FILESYSTEM_CHANGE_INCREMENTAL and self.on_incremental_event(
+            event, event_src, db_platform
+        ):
+            return
+
         # Skip if a scan is already scheduled
         for job in tasks_scheduler.get_jobs():
             if isinstance(job, Job):